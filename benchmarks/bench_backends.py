@@ -0,0 +1,71 @@
+"""Times each decode backend on synthetic ItemSparse-sized payloads, scaling the worker count up to the core count.
+
+Usage: python -m benchmarks.bench_backends [payload_count]
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import struct
+
+from hotfixes.dbdefs import DBDefs
+from hotfixes.decoder import RowDecoder, DecodeBackend, decode_payloads
+
+LAYOUT_HASH = "0AB1C2D3"
+FIXED_COLUMNS = 60
+ASCII_LETTERS = string.ascii_letters.encode()
+
+DBD_TEXT = "\n".join(
+    [
+        "COLUMNS",
+        "int ID",
+        "locstring Display_lang",
+        "locstring Description_lang",
+        *[f"int Field{i}" for i in range(FIXED_COLUMNS)],
+        "float Stats",
+        "",
+        f"LAYOUT {LAYOUT_HASH}",
+        "$noninline,id$ID<32>",
+        "Display_lang",
+        "Description_lang",
+        *[f"Field{i}<32>" for i in range(FIXED_COLUMNS)],
+        "Stats[10]",
+        "",
+    ]
+)
+
+
+def make_payload(rng: random.Random) -> bytes:
+    strings = b"".join(bytes(rng.choices(ASCII_LETTERS, k=rng.randint(4, 40))) + b"\x00" for _ in range(2))
+    fixed = struct.pack(f"<{FIXED_COLUMNS}i10f", *[rng.randint(-1000, 1000) for _ in range(FIXED_COLUMNS)], *[rng.random() for _ in range(10)])
+    return strings + fixed
+
+
+def worker_counts() -> list[int]:
+    cpu_count = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpu_count:
+        counts.append(cpu_count)
+    return counts
+
+
+def main(payload_count: int):
+    decoder = RowDecoder.compile(DBDefs().parse_dbd(DBD_TEXT), LAYOUT_HASH)
+    rng = random.Random(0)
+    jobs = [(decoder, make_payload(rng)) for _ in range(payload_count)]
+
+    print(f"{payload_count} payloads, {os.cpu_count()} cores")
+    for backend in DecodeBackend:
+        for workers in [1] if backend == DecodeBackend.Serial else worker_counts():
+            start = time.perf_counter()
+            decode_payloads(jobs, backend, workers)
+            elapsed = time.perf_counter() - start
+            print(f"{backend:>10} x{workers:<3}: {elapsed:.3f}s ({payload_count / elapsed:,.0f} payloads/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,73 @@
+"""Times definition lookups by build and by layout hash on definitions shaped like ItemSparse and SpellMisc,
+which carry hundreds of build lines, against the old linear scan over every definition.
+
+Usage: python -m benchmarks.bench_build_lookup [lookup_count]
+"""
+
+import sys
+import time
+import random
+
+from hotfixes.dbdefs import DBD, Build, BuildRange, Definitions, DefinitionEntry
+
+# (table, layouts, build lines per layout)
+TABLES = (("ItemSparse", 120, 6), ("SpellMisc", 90, 5))
+
+
+def make_dbd(layout_count: int, builds_per_layout: int, rng: random.Random) -> DBD:
+    definitions = []
+    build = 20000
+    for i in range(layout_count):
+        major, minor = 7 + i // 30, (i // 8) % 4
+        builds: list = []
+        for _ in range(builds_per_layout):
+            lower = Build(major, minor, rng.randint(0, 7), build)
+            build += rng.randint(10, 400)
+            builds.append(BuildRange(lower, Build(major, minor, lower.patch, build)) if rng.random() < 0.4 else lower)
+        entries = [DefinitionEntry(f"Field{column}", 32, False, 0, "", "") for column in range(30)]
+        definitions.append(Definitions(builds, [f"{rng.getrandbits(32):08X}"], [], entries))
+
+    return DBD([], definitions)
+
+
+def linear_build(dbd: DBD, build: Build) -> list[DefinitionEntry]:
+    return [entry for definition in dbd.definitions if definition.supports_version(build) for entry in definition.entries]
+
+
+def linear_layout(dbd: DBD, layout_hash: str) -> list[DefinitionEntry]:
+    return [entry for definition in dbd.definitions if layout_hash in definition.layouts for entry in definition.entries]
+
+
+def time_lookups(func, dbd: DBD, keys: list) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        func(dbd, key)
+    return time.perf_counter() - start
+
+
+def main(lookup_count: int):
+    rng = random.Random(0)
+    for tbl_name, layout_count, builds_per_layout in TABLES:
+        dbd = make_dbd(layout_count, builds_per_layout, rng)
+        all_builds = [build for definition in dbd.definitions for build in definition.builds]
+        builds = [build if isinstance(build, Build) else build.upper for build in rng.choices(all_builds, k=lookup_count)]
+        layouts = [rng.choice(definition.layouts) for definition in rng.choices(dbd.definitions, k=lookup_count)]
+
+        start = time.perf_counter()
+        dbd.get_index()
+        index_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{tbl_name}: {layout_count} layouts, {len(all_builds)} build lines, index built in {index_ms:.2f}ms")
+        runs = (
+            ("build linear", linear_build, builds),
+            ("build index", DBD.get_definitions_for_build, builds),
+            ("layout linear", linear_layout, layouts),
+            ("layout index", DBD.get_definitions_for_layout, layouts),
+        )
+        for name, func, keys in runs:
+            elapsed = time_lookups(func, dbd, keys)
+            print(f"{name:>14}: {elapsed:.3f}s ({lookup_count / elapsed:,.0f} lookups/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,105 @@
+"""Compares the buffer-backed ByteList with the old list-of-ints one on ItemSparse-sized hotfix payloads:
+wrapping a payload, slicing it into fields, and reading ints, floats, strings and hex back out.
+
+Usage: python -m benchmarks.bench_bytelist [payload_count]
+"""
+
+import sys
+import time
+import random
+
+from hotfixes.bytelist import ByteList
+
+# roughly an ItemSparse record: ~100 fixed-width fields plus a few strings
+INT_FIELDS = 110
+FLOAT_FIELDS = 12
+STRING_FIELDS = 5
+
+
+class ListByteList:
+    """The previous ByteList, kept here as the baseline."""
+
+    def __init__(self, *args, byteorder="little", encoding="ascii"):
+        self.__index = 0
+        self.__data = [*args]
+        self.__byteorder = byteorder
+        self.__encoding = encoding
+
+    def __iter__(self):
+        self.__index = 0
+        return self
+
+    def __next__(self):
+        if self.__index < len(self.__data):
+            result = self.__data[self.__index]
+            self.__index += 1
+            return result
+        raise StopIteration
+
+    def __getitem__(self, index: slice):
+        start, stop, step = index.indices(len(self.__data))
+        return ListByteList(*[self.__data[i] for i in range(start, stop, step)])
+
+    def to_hex(self) -> str:
+        hex_bytes = ""
+        for number in self:
+            number_hex = hex(number)[2:]
+            if len(number_hex) % 2 != 0:
+                number_hex = "0" + number_hex
+            hex_bytes += number_hex
+        return hex_bytes
+
+    def to_int(self, unsigned: bool = True) -> int:
+        return int.from_bytes(bytes.fromhex(self.to_hex()), byteorder=self.__byteorder, signed=not unsigned)
+
+    def to_float(self) -> float:
+        return float.fromhex(self.to_hex())
+
+    def to_str(self) -> str:
+        return bytes.fromhex(self.to_hex()).decode(self.__encoding)
+
+
+def make_payload(rng: random.Random) -> tuple[bytes, list[int]]:
+    # returns the payload and the length of each string field, which sit in front of the fixed fields
+    lengths = [rng.randint(0, 60) for _ in range(STRING_FIELDS)]
+    strings = b"".join(bytes(rng.choices(range(0x41, 0x5B), k=length)) + b"\x00" for length in lengths)
+    return strings + rng.randbytes((INT_FIELDS + FLOAT_FIELDS) * 4), lengths
+
+
+def read_fields(byte_list, lengths: list[int]):
+    offset = 0
+    for length in lengths:
+        byte_list[offset : offset + length].to_str()
+        offset += length + 1
+
+    for _ in range(INT_FIELDS):
+        byte_list[offset : offset + 4].to_int()
+        offset += 4
+
+    for _ in range(FLOAT_FIELDS):
+        byte_list[offset : offset + 4].to_float()
+        offset += 4
+
+    byte_list.to_hex()
+
+
+def main(payload_count: int):
+    rng = random.Random(0)
+    payloads = [make_payload(rng) for _ in range(payload_count)]
+    average_size = sum(len(payload) for payload, _ in payloads) / payload_count
+
+    print(f"{payload_count} payloads, {average_size:.0f} bytes on average")
+    runs = (
+        ("list", lambda payload: ListByteList(*payload)),
+        ("buffer", lambda payload: ByteList.from_bytes(payload)),
+    )
+    for name, wrap in runs:
+        start = time.perf_counter()
+        for payload, lengths in payloads:
+            read_fields(wrap(payload), lengths)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>7}: {elapsed:.3f}s ({payload_count / elapsed:,.0f} payloads/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
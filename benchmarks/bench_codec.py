@@ -0,0 +1,81 @@
+"""Microbenchmarks for the primitive codecs against the old hex-string round trips and per-element loops.
+
+Usage: python -m benchmarks.bench_codec [iterations]
+"""
+
+import sys
+import time
+import random
+import struct
+
+from hotfixes.codec import decode_array, decode_value, split_strings
+
+
+def old_bytes_to_hex(data: list[int]) -> str:
+    hex_bytes = ""
+    for number in data:
+        number_hex = hex(number)[2:]
+        if len(number_hex) % 2 != 0:
+            number_hex = "0" + number_hex
+        hex_bytes += number_hex
+    return hex_bytes
+
+
+def old_bytes_to_int(data: list[int]) -> int:
+    return int.from_bytes(bytes(data), byteorder="little", signed=False)
+
+
+def old_bytes_to_str(data: list[int]) -> str:
+    return bytes.fromhex(old_bytes_to_hex(data)).decode("utf8")
+
+
+def old_split_strings(data: bytes, count: int) -> list[str]:
+    strings = []
+    offset = 0
+    for _ in range(count):
+        end = data.find(0, offset)
+        if end == -1:
+            end = len(data)
+        strings.append(data[offset:end].decode("utf8"))
+        offset = end + 1
+    return strings
+
+
+def time_it(iterations: int, func, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(*args)
+    return time.perf_counter() - start
+
+
+def main(iterations: int):
+    rng = random.Random(0)
+    int_list = list(rng.randbytes(4))
+    int_bytes = bytes(int_list)
+    array_bytes = rng.randbytes(4 * 16)
+    string_list = list(b"Thunderfury, Blessed Blade of the Windseeker")
+    strings = b"\x00".join(rng.choice([b"", b"Azeroth", b"Dalaran", b"Stormwind City"]) for _ in range(8)) + b"\x00"
+
+    runs = (
+        ("u32 via list", old_bytes_to_int, (int_list,)),
+        ("u32 via struct", decode_value, (int_bytes, "int", 32, True)),
+        ("str via hex", old_bytes_to_str, (string_list,)),
+        ("str via decode", bytes.decode, (bytes(string_list),)),
+        ("int[16] per element", lambda: [decode_value(array_bytes, "int", 32, False, i * 4) for i in range(16)], ()),
+        ("int[16] one struct", decode_array, (array_bytes, "int", 32, False, 16)),
+        ("8 strings find loop", old_split_strings, (strings, 8)),
+        ("8 strings split", split_strings, (strings, 8)),
+    )
+
+    print(f"{iterations} iterations each")
+    for name, func, args in runs:
+        elapsed = time_it(iterations, func, *args)
+        print(f"{name:>20}: {elapsed * 1e9 / iterations:,.0f}ns per call")
+
+    # the old float decode read the hex digits as a hex float, not the IEEE bits
+    data = list(struct.pack("<f", 1.5))
+    print(f"old bytes_to_float({data}) = {float.fromhex(old_bytes_to_hex(data))}, codec = {decode_value(bytes(data), 'float')}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
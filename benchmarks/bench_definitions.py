@@ -0,0 +1,86 @@
+"""Compares startup on a full definitions checkout: reading every .dbd up front, listing it and reading on demand,
+and a compiled schema store (cold and warm). Each run then parses the handful of tables a DBCache usually touches.
+
+Only the definitions providers are timed. The HTTP client and the parser are built once outside the timings and
+shared by every run, the local providers never touch the network.
+
+Usage: python -m benchmarks.bench_definitions [table_count] [touched_tables]
+"""
+
+import os
+import sys
+import time
+import httpx
+import tempfile
+
+from hotfixes.dbdefs import DBDefs
+from hotfixes.localdefs import LocalDefinitions
+from hotfixes.schemastore import SCHEMA_STORES, open_schema_store
+
+from tests.synthetic import write_definitions_checkout
+
+
+def reset():
+    for store in SCHEMA_STORES.values():
+        store.close()
+    SCHEMA_STORES.clear()
+
+
+def load_eager(client: httpx.Client, dbdefs: DBDefs, dbdefs_path: str, touched: list[str]):
+    # what DBDefs used to do: read every definition into memory before anything is asked for
+    definitions: dict[str, str] = {}
+    definitions_dir = os.path.join(dbdefs_path, "definitions")
+    for file in os.listdir(definitions_dir):
+        with open(os.path.join(definitions_dir, file), "r") as f:
+            definitions[file.removesuffix(".dbd")] = f.read()
+
+    for tbl_name in touched:
+        dbdefs.parse_dbd(definitions[tbl_name])
+
+
+def load_lazy(client: httpx.Client, dbdefs: DBDefs, dbdefs_path: str, touched: list[str]):
+    local = LocalDefinitions(dbdefs_path)
+    for tbl_name in touched:
+        url = f"/definitions/{tbl_name}.dbd"
+        dbdefs.parse_dbd(local.get(client, url, url).decode("utf8"))
+
+
+def load_schema_store(client: httpx.Client, dbdefs: DBDefs, dbdefs_path: str, touched: list[str], store_path: str):
+    store = open_schema_store(dbdefs_path, dbdefs.parse_dbd, store_path)
+    for tbl_name in touched:
+        store.get(tbl_name)
+
+
+def time_it(func, *args) -> float:
+    reset()
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(table_count: int, touched_count: int):
+    with tempfile.TemporaryDirectory() as tmp, httpx.Client() as client:
+        dbdefs_path = os.path.join(tmp, "WoWDBDefs")
+        tbl_names = write_definitions_checkout(dbdefs_path, table_count)
+        touched = tbl_names[:: max(table_count // touched_count, 1)][:touched_count]
+        store_path = os.path.join(tmp, "schema.bin")
+        dbdefs = DBDefs(client)
+
+        print(f"{table_count} definitions, {len(touched)} tables touched")
+        runs = (
+            ("eager", load_eager, (client, dbdefs, dbdefs_path, touched)),
+            ("lazy", load_lazy, (client, dbdefs, dbdefs_path, touched)),
+            ("store cold", load_schema_store, (client, dbdefs, dbdefs_path, touched, store_path)),
+            ("store warm", load_schema_store, (client, dbdefs, dbdefs_path, touched, store_path)),
+        )
+        for name, func, args in runs:
+            print(f"{name:>10}: {time_it(func, *args) * 1000:.1f}ms")
+
+        reset()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 12,
+    )
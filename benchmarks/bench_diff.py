@@ -0,0 +1,62 @@
+"""Times diffing two synthetic DBCache.bin files against just reading both of them front to back.
+
+Usage: python -m benchmarks.bench_diff [entry_count] [changed_ratio]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import dataclasses
+
+from hotfixes.diff import diff_dbcache
+
+from tests.synthetic import iter_random_entries, write_dbcache
+
+TABLE_HASHES = [0x919BE54E, 0xDF2F53CF, 0xC37D5E66, 0x7A2D2A86]
+READ_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def read_sequential(*paths: str):
+    for path in paths:
+        with open(path, "rb") as f:
+            while f.read(READ_CHUNK_SIZE):
+                pass
+
+
+def main(entry_count: int, changed_ratio: float):
+    rng = random.Random(1)
+    old = list(iter_random_entries(entry_count, TABLE_HASHES, max_data_size=512))
+    new = []
+    for entry in old:
+        roll = rng.random()
+        if roll < changed_ratio:
+            new.append(dataclasses.replace(entry, data=rng.randbytes(len(entry.data))))
+        elif roll < changed_ratio * 2:
+            continue  # removed
+        else:
+            new.append(entry)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path, new_path = os.path.join(tmp, "old.bin"), os.path.join(tmp, "new.bin")
+        write_dbcache(old_path, old)
+        write_dbcache(new_path, new)
+        size_mb = (os.path.getsize(old_path) + os.path.getsize(new_path)) / 1024 / 1024
+
+        start = time.perf_counter()
+        read_sequential(old_path, new_path)
+        read_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        diff = diff_dbcache(old_path, new_path)
+        diff_elapsed = time.perf_counter() - start
+
+    print(f"{entry_count} entries per file, {size_mb:.1f} MB in total")
+    print(f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed, {diff.unchanged} unchanged")
+    print(f"      read: {read_elapsed:.3f}s ({size_mb / read_elapsed:.1f} MB/s)")
+    print(f"      diff: {diff_elapsed:.3f}s ({size_mb / diff_elapsed:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000, float(sys.argv[2]) if len(sys.argv) > 2 else 0.01)
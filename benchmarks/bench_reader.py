@@ -0,0 +1,43 @@
+"""Compares the construct DBCache parse with the mmap reader on a synthetic DBCache.bin.
+
+Usage: python -m benchmarks.bench_reader [entry_count]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from hotfixes.reader import read_dbcache_mmap
+from hotfixes.structures import DBCACHE_V9
+
+from tests.synthetic import random_entries, write_dbcache
+
+TABLE_HASHES = [0x919BE54E, 0xDF2F53CF, 0xC37D5E66, 0x7A2D2A86]
+
+
+def time_it(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def read_construct(path: str):
+    with open(path, "rb") as f:
+        return DBCACHE_V9.STRUCT_DBCACHE_FILE.parse(f.read())
+
+
+def main(entry_count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "DBCache.bin")
+        write_dbcache(path, random_entries(entry_count, TABLE_HASHES))
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        print(f"{entry_count} entries, {size_mb:.1f} MB")
+        for name, func in (("construct", read_construct), ("mmap", read_dbcache_mmap)):
+            elapsed = time_it(func, path)
+            print(f"{name:>10}: {elapsed:.3f}s ({entry_count / elapsed:,.0f} entries/s, {size_mb / elapsed:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
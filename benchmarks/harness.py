@@ -0,0 +1,256 @@
+"""End-to-end benchmark harness. Generates a DBCache.bin with a configurable size and table mix, matching .dbd files,
+a manifest and a fake CASC, then times every stage of getting hotfixes out of it.
+
+Each stage records its time, throughput in entries/s and MB/s of DBCache, and the peak RSS growth while it ran.
+Results are written as JSON, and `--compare` prints the change against an earlier run.
+
+Usage: python -m benchmarks.harness [--entries N] [--tables N] [--output results.json] [--compare baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import platform
+import threading
+import subprocess
+
+from typing import Any, Callable, Optional
+
+# keep the layouts, schema store and manifest index a run creates out of the real cache
+TEMP_CACHE_PATH: Optional[str] = None
+if "HOTFIXES_CACHE_PATH" not in os.environ:
+    TEMP_CACHE_PATH = tempfile.mkdtemp(prefix="hotfixes-bench-cache-")
+    os.environ["HOTFIXES_CACHE_PATH"] = TEMP_CACHE_PATH
+
+import psutil  # noqa: E402
+
+from hotfixes.decoder import DecodeBackend, decode_payloads  # noqa: E402
+from hotfixes.parser import HotfixParser, HotfixCollection, Flavor  # noqa: E402
+from hotfixes.reader import map_dbcache, read_dbcache_header, iter_dbcache_entries  # noqa: E402
+from hotfixes.structures import DBCACHE_V9  # noqa: E402
+
+from tests.synthetic import (  # noqa: E402
+    FakeCasc,
+    iter_table_entries,
+    make_tables,
+    write_game_install,
+    write_table_checkout,
+)
+
+RSS_SAMPLE_INTERVAL = 0.005  # seconds
+
+
+class PeakMemory:
+    """Samples this process's RSS on a background thread and keeps the highest value seen."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start = 0
+        self.peak = 0
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def __sample(self):
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __run(self):
+        while not self.__stop.wait(self.interval):
+            self.__sample()
+
+    def __enter__(self) -> "PeakMemory":
+        self.start = self.peak = self.process.memory_info().rss
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.__stop.set()
+        self.__thread.join()  # type: ignore
+        self.__sample()
+
+    @property
+    def growth(self) -> int:
+        return self.peak - self.start
+
+
+def run_stage(results: dict[str, Any], name: str, func: Callable[[], Any], entries: int, size: int) -> Any:
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+
+    elapsed = max(elapsed, 1e-9)
+    results[name] = {
+        "seconds": elapsed,
+        "entries_per_second": entries / elapsed,
+        "mb_per_second": size / 1024 / 1024 / elapsed,
+        "peak_rss_growth_bytes": memory.growth,
+    }
+    print(f"{name:>24}: {elapsed:8.3f}s {entries / elapsed:>14,.0f} entries/s {memory.growth / 1024 / 1024:8.1f} MB peak", file=sys.stderr)
+    return result
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_pipeline_stages(
+    stages: dict[str, Any],
+    parser: HotfixParser,
+    dbcache_path: str,
+    backend: DecodeBackend,
+    workers: Optional[int],
+    count: int,
+    size: int,
+):
+    """Runs what `get_hotfixes` does one stage at a time. Everything a stage produced is dropped on return."""
+    entry_filter = parser.build_entry_filter()
+
+    def read():
+        buffer = map_dbcache(dbcache_path)
+        read_dbcache_header(buffer)
+        return buffer
+
+    buffer = run_stage(stages, "read", read, count, size)
+    dbcache_entries = run_stage(
+        stages, "header_walk", lambda: list(iter_dbcache_entries(buffer, entry_filter=entry_filter)), count, size
+    )
+
+    def resolve_schemas():
+        selected = [(entry, *parser.resolve_table(entry)) for entry in dbcache_entries]
+        return selected, parser.resolve_decoders(selected)
+
+    selected, decoders = run_stage(stages, "schema_resolution", resolve_schemas, count, size)
+
+    jobs = [(decoders.get(tbl_hash), entry.data) for entry, tbl_hash, _ in selected]
+    all_data = run_stage(stages, "decode", lambda: decode_payloads(jobs, backend, workers), count, size)
+
+    def build_collection():
+        hotfixes = [
+            parser.new_hotfix(entry, tbl_hash, tbl_name, data)
+            for (entry, tbl_hash, tbl_name), data in zip(selected, all_data)
+        ]
+        return HotfixCollection(9, "XFTH", hotfixes, 0)
+
+    run_stage(stages, "collection_build", build_collection, count, size)
+
+
+def run(args: argparse.Namespace, work_dir: str) -> dict[str, Any]:
+    tables = make_tables(args.tables, args.string_ratio, seed=args.seed)
+    checkout = os.path.join(work_dir, "WoWDBDefs")
+    write_table_checkout(checkout, tables)
+
+    game_path = os.path.join(work_dir, "World of Warcraft")
+    entries = iter_table_entries(tables, args.entries, args.skew, args.valid_ratio, seed=args.seed)
+    dbcache_path = write_game_install(game_path, entries)
+
+    size = os.path.getsize(dbcache_path)
+    count = args.entries
+    backend = DecodeBackend(args.backend)
+    stages: dict[str, Any] = {}
+
+    parser = run_stage(
+        stages,
+        "setup",
+        lambda: HotfixParser(
+            game_path,
+            Flavor.Live,
+            DBCACHE_V9,
+            dbdefs_path=checkout,
+            max_threads=args.workers,
+            use_mmap=True,
+            backend=backend,
+            offline=True,
+            casc_handle=FakeCasc(tables),  # type: ignore
+        ),
+        count,
+        size,
+    )
+    run_pipeline_stages(stages, parser, dbcache_path, backend, args.workers, count, size)
+
+    # end to end, with schemas and decoders already resolved by the stages above
+    run_stage(stages, "get_hotfixes", parser.get_hotfixes, count, size)
+    run_stage(stages, "get_hotfixes_lazy", lambda: parser.get_hotfixes(lazy=True), count, size)
+    run_stage(stages, "get_compact_hotfixes", parser.get_compact_hotfixes, count, size)
+    if args.project:
+        # the first column of every table, so everything after it is never read
+        columns = {table.name: [table.columns[0].name] for table in tables if table.columns}
+        run_stage(stages, "get_hotfixes_projected", lambda: parser.get_hotfixes(columns=columns), count, size)
+    if args.sqlite:
+        sqlite_path = os.path.join(work_dir, "hotfixes.db")
+        run_stage(stages, "export_sqlite", lambda: parser.export_sqlite(sqlite_path), count, size)
+        run_stage(stages, "export_sqlite_again", lambda: parser.export_sqlite(sqlite_path), count, size)
+    if args.construct:
+        parser.use_mmap = False
+        run_stage(stages, "get_hotfixes_construct", parser.get_hotfixes, count, size)
+
+    return {
+        "meta": {
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.time(),
+        },
+        "config": vars(args),
+        "dbcache": {"entries": count, "bytes": size},
+        "stages": stages,
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]):
+    print(f"{'stage':>24} {'baseline':>10} {'current':>10} {'change':>8}", file=sys.stderr)
+    for name, stage in results["stages"].items():
+        old = baseline["stages"].get(name)
+        if old is None:
+            continue
+        change = stage["seconds"] / old["seconds"] - 1
+        print(f"{name:>24} {old['seconds']:>9.3f}s {stage['seconds']:>9.3f}s {change:>+8.1%}", file=sys.stderr)
+
+
+def main(argv: Optional[list[str]] = None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--entries", type=int, default=100_000)
+    arg_parser.add_argument("--tables", type=int, default=40)
+    arg_parser.add_argument("--skew", type=float, default=1.0, help="how strongly a few tables dominate the entries")
+    arg_parser.add_argument("--string-ratio", type=float, default=0.5, help="share of tables with string columns")
+    arg_parser.add_argument("--valid-ratio", type=float, default=0.9, help="share of entries that carry data")
+    arg_parser.add_argument("--backend", choices=list(DecodeBackend), default=DecodeBackend.Threads)
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--construct", action="store_true", help="also time the construct reader")
+    arg_parser.add_argument("--sqlite", action="store_true", help="also time exporting to SQLite, fresh and again on top")
+    arg_parser.add_argument("--project", action="store_true", help="also time decoding one column per table")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="write the results here instead of stdout")
+    arg_parser.add_argument("--compare", help="a previous results file to compare against")
+    args = arg_parser.parse_args(argv)
+
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run(args, work_dir)
+    finally:
+        if TEMP_CACHE_PATH is not None:
+            shutil.rmtree(TEMP_CACHE_PATH, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
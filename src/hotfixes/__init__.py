@@ -1,7 +1,8 @@
 import os
 
 SELF_PATH = os.path.dirname(os.path.realpath(__file__))
-CACHE_PATH = os.path.join(SELF_PATH, "cache")
+# HOTFIXES_CACHE_PATH moves everything cached on disk, e.g. to keep benchmark runs out of the real cache
+CACHE_PATH = os.environ.get("HOTFIXES_CACHE_PATH", os.path.join(SELF_PATH, "cache"))
 
 if not os.path.exists(CACHE_PATH):
     os.makedirs(CACHE_PATH, exist_ok=True)
@@ -1,6 +1,8 @@
+import struct
+
 from typing import Literal, Optional, get_args, TypeAlias, Union
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 
 HOTFIXES_DEFAULT_STR_ENCODING = "ascii"
 HOTFIXES_DEFAULT_ENDIANNESS = "little"
@@ -8,18 +10,26 @@ HOTFIXES_DEFAULT_ENDIANNESS = "little"
 
 ByteOrder: TypeAlias = Literal["little", "big"]
 
+BytesLike: TypeAlias = Union[bytes, bytearray, memoryview]
+
+FLOAT_FORMATS = {4: "f", 8: "d"}
+
 
 class ByteList(Iterable[int]):
-    """A list of little-endian `uint8` values."""
+    """A read-only run of `uint8` values over a `bytes`-like buffer. Slicing returns views, nothing is copied."""
 
-    __data: list[int]
+    __data: memoryview
     __encoding: str
     __byteorder: ByteOrder
 
     def __init__(self, *args, **kwargs) -> None:
-        self.__index = 0
+        data = kwargs["data"] if "data" in kwargs else args
+        if isinstance(data, ByteList):
+            data = data.__data
+        elif not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
 
-        self.__data = kwargs["data"] if "data" in kwargs else [*args]
+        self.__data = memoryview(data).cast("B") if isinstance(data, memoryview) else memoryview(data)
         self.__encoding = kwargs["encoding"] if "encoding" in kwargs else HOTFIXES_DEFAULT_STR_ENCODING
         byteorder = kwargs["byteorder"] if "byteorder" in kwargs else HOTFIXES_DEFAULT_ENDIANNESS
 
@@ -28,67 +38,80 @@ class ByteList(Iterable[int]):
 
         self.__byteorder = byteorder
 
-    def __iter__(self):
-        self.__index = 0
-        return self
-
-    def __next__(self):
-        if self.__index < len(self.__data):
-            result = self.__data[self.__index]
-            self.__index += 1
-            return result
-        else:
-            raise StopIteration
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.__data)
 
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, ByteList) and not isinstance(other, Iterable):
+        if isinstance(other, ByteList):
+            return self.__data == other.__data
+        if isinstance(other, (bytes, bytearray, memoryview)):
+            return self.__data == other
+        if not isinstance(other, Iterable):
             return NotImplemented
 
-        return self.__data == other
+        return self.__data.tolist() == list(other)
+
+    __hash__ = None  # type: ignore
 
     def __repr__(self) -> str:
-        return str(self.__data)
+        return str(self.__data.tolist())
 
     def __getitem__(self, index: Union[int, slice]):
         if isinstance(index, slice):
-            start, stop, step = index.indices(len(self.__data))
-            return [self.__data[i] for i in range(start, stop, step)]
+            # skip __init__, the view and settings are already known to be valid
+            view = object.__new__(ByteList)
+            view.__data = self.__data[index]
+            view.__encoding = self.__encoding
+            view.__byteorder = self.__byteorder
+            return view
         elif isinstance(index, int):
             return self.__data[index]
 
     def __len__(self):
         return len(self.__data)
 
+    def __bytes__(self) -> bytes:
+        return self.__data.tobytes()
+
+    @property
+    def view(self) -> memoryview:
+        return self.__data
+
     # in methods
 
     @classmethod
     def from_str(cls, input: str, encoding: str = HOTFIXES_DEFAULT_STR_ENCODING, **kwargs):
-        return cls(*list(input.encode(encoding)), encoding=encoding, **kwargs)
+        return cls(data=input.encode(encoding), encoding=encoding, **kwargs)
 
     @classmethod
     def from_list(cls, input: list[int], **kwargs):
-        return cls(*input, **kwargs)
+        return cls(data=bytes(input), **kwargs)
+
+    @classmethod
+    def from_bytes(cls, input: BytesLike, **kwargs):
+        return cls(data=input, **kwargs)
 
     # out methods
 
-    def to_hex(self) -> str:
-        hex_bytes = ""
-        for number in self:
-            number_hex = hex(number)[2:]
-            if len(number_hex) % 2 != 0:
-                number_hex = "0" + number_hex
-            hex_bytes += number_hex
+    def to_bytes(self) -> bytes:
+        return self.__data.tobytes()
 
-        return hex_bytes
+    def to_hex(self) -> str:
+        return self.__data.hex()
 
     def to_int(self, unsigned: bool = True) -> int:
-        return int.from_bytes(bytes.fromhex(self.to_hex()), byteorder=self.__byteorder, signed=not unsigned)
+        return int.from_bytes(self.__data, byteorder=self.__byteorder, signed=not unsigned)
 
     def to_float(self) -> float:
-        return float.fromhex(self.to_hex())
+        if len(self.__data) not in FLOAT_FORMATS:
+            raise ValueError(f"can't read a float from {len(self.__data)} bytes")
+
+        prefix = "<" if self.__byteorder == "little" else ">"
+        value: float = struct.unpack(prefix + FLOAT_FORMATS[len(self.__data)], self.__data)[0]
+        return value
 
     def to_str(self, encoding: Optional[str] = None) -> str:
         if encoding is None:
             encoding = self.__encoding
 
-        return bytes.fromhex(self.to_hex()).decode(encoding=encoding)
+        return str(self.__data, encoding=encoding)
@@ -0,0 +1,99 @@
+import struct
+
+from functools import lru_cache
+from typing import Any, Union
+
+# column types are keyed by their ColumnDataType values, which compare and hash like these strings
+FIXED_INT_TYPES = {"u8": 8, "u16": 16, "u32": 32, "u64": 64}
+FLOAT_TYPE = "float"
+STRING_TYPES = ("string", "locstring")
+
+INT_FORMATS = {8: "b", 16: "h", 32: "i", 64: "q"}
+FLOAT_FORMAT = "f"
+
+INT_STRUCTS = {
+    (width, is_unsigned): struct.Struct("<" + (code.upper() if is_unsigned else code))
+    for width, code in INT_FORMATS.items()
+    for is_unsigned in (False, True)
+}
+FLOAT_STRUCT = struct.Struct("<" + FLOAT_FORMAT)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def get_format_code(column_type: str, int_width: int = 32, is_unsigned: bool = False) -> str:
+    """The struct format character for one element of a fixed-width column."""
+    if column_type == FLOAT_TYPE:
+        return FLOAT_FORMAT
+
+    if column_type in FIXED_INT_TYPES:
+        int_width, is_unsigned = FIXED_INT_TYPES[column_type], True
+
+    if int_width not in INT_FORMATS:
+        raise ValueError(f"unsupported int width {int_width}")
+
+    code = INT_FORMATS[int_width]
+    return code.upper() if is_unsigned else code
+
+
+def get_struct(column_type: str, int_width: int = 32, is_unsigned: bool = False) -> struct.Struct:
+    if column_type == FLOAT_TYPE:
+        return FLOAT_STRUCT
+
+    if column_type in FIXED_INT_TYPES:
+        return INT_STRUCTS[(FIXED_INT_TYPES[column_type], True)]
+
+    if (int_width, is_unsigned) not in INT_STRUCTS:
+        raise ValueError(f"unsupported int width {int_width}")
+
+    return INT_STRUCTS[(int_width, is_unsigned)]
+
+
+@lru_cache(maxsize=1024)
+def get_array_struct(column_type: str, int_width: int, is_unsigned: bool, array_size: int) -> struct.Struct:
+    """A struct that unpacks `array_size` elements of a column in one call."""
+    return struct.Struct(f"<{array_size}{get_format_code(column_type, int_width, is_unsigned)}")
+
+
+def decode_value(data: Buffer, column_type: str, int_width: int = 32, is_unsigned: bool = False, offset: int = 0) -> Any:
+    return get_struct(column_type, int_width, is_unsigned).unpack_from(data, offset)[0]
+
+
+def decode_array(
+    data: Buffer, column_type: str, int_width: int, is_unsigned: bool, array_size: int, offset: int = 0
+) -> list[Any]:
+    return list(get_array_struct(column_type, int_width, is_unsigned, array_size).unpack_from(data, offset))
+
+
+def split_strings(data: Buffer, count: int, offset: int = 0, encoding: str = "utf8") -> tuple[list[str], int]:
+    """Reads `count` NUL-terminated strings starting at `offset`, returning them and the offset just past the last one.
+
+    A string without a terminator runs to the end of `data`, any missing after that are empty.
+    """
+    if not isinstance(data, bytes):
+        data = bytes(data)
+
+    if count == 1:
+        end = data.find(0, offset)
+        if end == -1:
+            end = len(data)
+        return [data[offset:end].decode(encoding)], end + 1
+
+    parts = data[offset:].split(b"\x00", count)[:count]
+    strings = [part.decode(encoding) for part in parts]
+    strings.extend([""] * (count - len(strings)))
+    return strings, min(offset + sum(len(part) + 1 for part in parts), len(data) + 1)
+
+
+def skip_strings(data: Buffer, count: int, offset: int = 0) -> int:
+    """The offset just past `count` NUL-terminated strings starting at `offset`, found without decoding them."""
+    if not isinstance(data, bytes):
+        data = bytes(data)
+
+    for _ in range(count):
+        end = data.find(0, offset)
+        if end == -1:
+            return len(data) + 1
+        offset = end + 1
+
+    return offset
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for columnar decoding
+    np = None  # type: ignore
+
+from hotfixes.decoder import RowDecoder, FixedRun, StringColumn, STRUCT_FORMAT_FIELD_PATTERN, as_buffer, try_decode
+
+NUMPY_TYPES = {
+    "b": "i1",
+    "B": "u1",
+    "h": "<i2",
+    "H": "<u2",
+    "i": "<i4",
+    "I": "<u4",
+    "q": "<i8",
+    "Q": "<u8",
+    "f": "<f4",
+}
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("columnar decoding needs numpy, install hotfixes[numpy]")
+
+
+@dataclass
+class ColumnarTable:
+    """Every decoded hotfix for one table, one array per column. Rows line up across all arrays."""
+
+    table_hash: str
+    table_name: str
+    push_ids: Any
+    unique_ids: Any
+    record_ids: Any
+    columns: dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+
+def get_row_dtype(decoder: RowDecoder, itemsize: Optional[int] = None) -> Optional["np.dtype[Any]"]:
+    """Builds a packed structured dtype for a layout, or None if it isn't fixed-width or rows of `itemsize` can't hold it.
+
+    `itemsize` lets rows carry trailing bytes past the last column.
+    """
+    require_numpy()
+    if decoder.has_strings:
+        return None
+
+    names, formats, offsets = [], [], []
+    offset = 0
+    for step in decoder.steps:
+        assert isinstance(step, FixedRun)
+        codes = STRUCT_FORMAT_FIELD_PATTERN.findall(step.struct.format[1:])
+        for (column, array_size), (count, code) in zip(step.fields, codes):
+            numpy_type = np.dtype(NUMPY_TYPES[code])
+            names.append(column)
+            formats.append((numpy_type, (array_size,)) if array_size else numpy_type)
+            offsets.append(offset)
+            offset += numpy_type.itemsize * int(count)
+
+    if itemsize is not None and itemsize < offset:
+        return None
+
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": itemsize or offset})
+
+
+def decode_fixed_group(decoder: RowDecoder, payloads: Sequence[Any]) -> Optional[dict[str, Any]]:
+    """Decodes equally sized payloads of one fixed-width layout with a single `np.frombuffer`."""
+    dtype = get_row_dtype(decoder, len(payloads[0]))
+    if dtype is None:
+        return None
+
+    rows = np.frombuffer(b"".join(as_buffer(payload) for payload in payloads), dtype=dtype)
+    return {column: rows[column] for column in dtype.names}  # type: ignore
+
+
+def decode_rows(decoder: RowDecoder, entries: Sequence[Any]) -> tuple[dict[str, Any], list[Any]]:
+    """Row-by-row fallback, returning the columns and the entries that actually decoded."""
+    decoded_entries = []
+    values: dict[str, list[Any]] = {}
+    for entry in entries:
+        row = try_decode(decoder, entry.data)
+        if row is None:
+            continue
+
+        decoded_entries.append(entry)
+        for column, value in row.items():
+            values.setdefault(column, []).append(value)
+
+    string_columns = {step.column for step in decoder.steps if isinstance(step, StringColumn)}
+    columns = {}
+    for column, column_values in values.items():
+        columns[column] = np.array(column_values, dtype=object if column in string_columns else None)
+
+    return columns, decoded_entries
+
+
+def build_columnar_table(
+    table_hash: str, table_name: str, decoder: RowDecoder, entries: Sequence[Any]
+) -> ColumnarTable:
+    """Decodes a table's entries into columns, one `np.frombuffer` per payload size for fixed-width layouts.
+
+    Layouts with strings, or payloads too short for the layout, go through the row decoder instead.
+    """
+    require_numpy()
+
+    groups: dict[int, list[Any]] = {}
+    for entry in entries:
+        if len(entry.data) > 0:
+            groups.setdefault(len(entry.data), []).append(entry)
+
+    decoded_entries = []
+    column_parts: dict[str, list[Any]] = {}
+    for group in groups.values():
+        payloads = [entry.data for entry in group]
+        columns = None if decoder.has_strings else decode_fixed_group(decoder, payloads)
+
+        if columns is None:
+            columns, group = decode_rows(decoder, group)
+
+        decoded_entries.extend(group)
+        for column, values in columns.items():
+            column_parts.setdefault(column, []).append(values)
+
+    return ColumnarTable(
+        table_hash,
+        table_name,
+        np.array([entry.push_id for entry in decoded_entries], dtype=np.int32),
+        np.array([entry.unique_id for entry in decoded_entries], dtype=np.uint32),
+        np.array([entry.record_id for entry in decoded_entries], dtype=np.uint32),
+        {column: np.concatenate(parts) for column, parts in column_parts.items()},
+    )
@@ -0,0 +1,528 @@
+import sys
+import mmap
+import bisect
+import struct
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence, Union
+
+from hotfixes.codec import FLOAT_STRUCT, FLOAT_TYPE, STRING_TYPES, FIXED_INT_TYPES, get_array_struct
+from hotfixes.resolver import HotfixResolver
+from hotfixes.structures import FieldCompression, RecordState
+from hotfixes.utils import convert_table_hash
+
+if TYPE_CHECKING:
+    from hotfixes.dbdefs import DBD
+
+WDC5_MAGIC = b"WDC5"
+
+# these extend WDC5 in structures.py past layout_hash, and are decoded with struct instead of construct
+STRUCT_WDC5_HEADER = struct.Struct("<4sI128s9I2H7I")
+STRUCT_SECTION_HEADER = struct.Struct("<Q8I")
+STRUCT_FIELD_STRUCTURE = struct.Struct("<hH")
+STRUCT_FIELD_STORAGE_INFO = struct.Struct("<2H5I")
+STRUCT_OFFSET_MAP_ENTRY = struct.Struct("<IH")
+STRUCT_COPY_TABLE_ENTRY = struct.Struct("<II")
+UINT32_STRUCT = struct.Struct("<I")
+
+DB2_FLAG_SPARSE = 0x1
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+@dataclass
+class WDC5Header:
+    record_count: int
+    field_count: int
+    record_size: int
+    string_table_size: int
+    table_hash: int
+    layout_hash: int
+    min_id: int
+    max_id: int
+    locale: int
+    flags: int
+    id_index: int
+    total_field_count: int
+    bitpacked_data_offset: int
+    lookup_column_count: int
+    field_storage_info_size: int
+    common_data_size: int
+    pallet_data_size: int
+    section_count: int
+
+
+@dataclass
+class SectionHeader:
+    tact_key_hash: int
+    file_offset: int
+    record_count: int
+    string_table_size: int
+    offset_records_end: int
+    id_list_size: int
+    relationship_data_size: int
+    offset_map_id_count: int
+    copy_table_count: int
+
+
+@dataclass
+class FieldStorageInfo:
+    offset_bits: int
+    size_bits: int
+    additional_data_size: int
+    compression: int
+    val1: int  # bitpacking offset in bits, or the default value of common data
+    val2: int  # bitpacking size in bits
+    val3: int  # flags, or the array size of an indexed array
+
+
+@dataclass
+class Section:
+    """Where each block of a section starts, worked out from the headers without reading any of them."""
+
+    header: SectionHeader
+    record_count: int
+    first_record: int  # the index of this section's first record across every section
+    string_table_start: int  # where this section's string table starts in every section's string tables back to back
+    records_offset: int
+    string_table_offset: int
+    id_list_offset: int
+    copy_table_offset: int
+    offset_map_offset: int
+    offset_map_id_list_offset: int
+
+
+@dataclass
+class DB2Column:
+    """A column of a layout and the field it's stored in."""
+
+    name: str
+    type: str
+    int_width: int
+    is_unsigned: bool
+    array_size: int
+    field_index: int
+    struct: struct.Struct  # reads the column uncompressed, strings as their table offsets
+
+    @classmethod
+    def create(cls, name: str, type: str, int_width: int, is_unsigned: bool, array_size: int, field_index: int) -> "DB2Column":
+        count = max(array_size, 1)
+        if type in STRING_TYPES:
+            column_struct = struct.Struct(f"<{count}I")
+        else:
+            column_struct = get_array_struct(type, int_width, is_unsigned, count)
+
+        return cls(name, type, int_width, is_unsigned, array_size, field_index, column_struct)
+
+    def convert(self, raw: int) -> Any:
+        """Turns a raw value from bitpacked, pallet or common data into this column's type."""
+        if self.type == FLOAT_TYPE:
+            return FLOAT_STRUCT.unpack(UINT32_STRUCT.pack(raw & 0xFFFFFFFF))[0]
+
+        width = FIXED_INT_TYPES.get(self.type, self.int_width or 32)
+        is_unsigned = self.is_unsigned or self.type in FIXED_INT_TYPES
+        raw &= (1 << width) - 1
+        if not is_unsigned and raw >> (width - 1):
+            raw -= 1 << width
+
+        return raw
+
+
+def get_db2_columns(dbd: "DBD", layout_hash: str) -> list[DB2Column]:
+    """The stored columns of a layout in field order, the same ones `RowDecoder` decodes from hotfixes."""
+    columns = {column.name: column for column in dbd.columns}
+
+    db2_columns = []
+    field_index = 0
+    for def_entry in dbd.get_definitions_for_layout(layout_hash):
+        if "noninline" in def_entry.annotation:
+            continue
+
+        column = columns.get(def_entry.column)
+        if column is not None:
+            db2_columns.append(
+                DB2Column.create(
+                    def_entry.column, column.type, def_entry.int_width, def_entry.is_unsigned, def_entry.array_size, field_index
+                )
+            )
+        field_index += 1
+
+    return db2_columns
+
+
+def read_bits(data: Any, bit_offset: int, bit_count: int, signed: bool = False) -> int:
+    start = bit_offset >> 3
+    value = int.from_bytes(data[start : (bit_offset + bit_count + 7) >> 3], "little") >> (bit_offset & 7)
+    value &= (1 << bit_count) - 1
+    if signed and value >> (bit_count - 1):
+        value -= 1 << bit_count
+
+    return value
+
+
+def read_uint32s(data: Any) -> "array[int]":
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values
+
+
+class WDC5Reader:
+    """A WDC5 DB2 read in place from a map or its bytes.
+
+    Only the headers are parsed up front. The record ID index, common data and strings are read the first time
+    something needs them, and rows are only decoded one at a time by `read_row`.
+    """
+
+    def __init__(self, buffer: Buffer):
+        if len(buffer) < STRUCT_WDC5_HEADER.size:
+            raise ValueError(f"DB2 is too small to hold a header ({len(buffer)} bytes)")
+
+        magic, _, _, *header = STRUCT_WDC5_HEADER.unpack_from(buffer, 0)
+        if magic != WDC5_MAGIC:
+            raise ValueError(f"not a WDC5 DB2 (magic {magic!r})")
+
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.header = WDC5Header(*header)
+
+        offset = STRUCT_WDC5_HEADER.size
+        section_headers = []
+        for _ in range(self.header.section_count):
+            section_headers.append(SectionHeader(*STRUCT_SECTION_HEADER.unpack_from(buffer, offset)))
+            offset += STRUCT_SECTION_HEADER.size
+
+        offset += STRUCT_FIELD_STRUCTURE.size * self.header.field_count
+
+        self.fields: list[FieldStorageInfo] = []
+        for _ in range(self.header.field_storage_info_size // STRUCT_FIELD_STORAGE_INFO.size):
+            self.fields.append(FieldStorageInfo(*STRUCT_FIELD_STORAGE_INFO.unpack_from(buffer, offset)))
+            offset += STRUCT_FIELD_STORAGE_INFO.size
+
+        # each field's pallet and common data follow each other in field order
+        self.field_data_offsets: list[int] = []
+        pallet_offset = offset
+        common_offset = offset + self.header.pallet_data_size
+        for info in self.fields:
+            if info.compression == FieldCompression.CommonData:
+                self.field_data_offsets.append(common_offset)
+                common_offset += info.additional_data_size
+            elif info.compression in (FieldCompression.BitpackedIndexed, FieldCompression.BitpackedIndexedArray):
+                self.field_data_offsets.append(pallet_offset)
+                pallet_offset += info.additional_data_size
+            else:
+                self.field_data_offsets.append(0)
+
+        self.sections = self.__layout_sections(section_headers)
+        self.__section_starts = [section.first_record for section in self.sections]
+        self.__string_starts = [section.string_table_start for section in self.sections]
+        self.__records_size = sum(section.record_count for section in self.sections) * self.header.record_size
+
+        self.__index: Optional[dict[int, int]] = None
+        self.__copies: dict[int, int] = {}
+        self.__common_data: dict[int, dict[int, int]] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "WDC5Reader":
+        with open(path, "rb") as f:
+            # the map keeps its own handle to the file, so it outlives this `with` block
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @property
+    def is_sparse(self) -> bool:
+        return bool(self.header.flags & DB2_FLAG_SPARSE)
+
+    @property
+    def layout_hash(self) -> str:
+        return convert_table_hash(self.header.layout_hash)
+
+    def __layout_sections(self, section_headers: list[SectionHeader]) -> list[Section]:
+        sections = []
+        first_record = 0
+        string_table_start = 0
+        for header in section_headers:
+            if self.is_sparse:
+                record_count = header.offset_map_id_count
+                string_table_offset = records_end = header.offset_records_end
+            else:
+                record_count = header.record_count
+                string_table_offset = header.file_offset + record_count * self.header.record_size
+                records_end = string_table_offset + header.string_table_size
+
+            copy_table_offset = records_end + header.id_list_size
+            offset_map_offset = copy_table_offset + header.copy_table_count * STRUCT_COPY_TABLE_ENTRY.size
+            relationship_offset = offset_map_offset + header.offset_map_id_count * STRUCT_OFFSET_MAP_ENTRY.size
+            sections.append(
+                Section(
+                    header,
+                    record_count,
+                    first_record,
+                    string_table_start,
+                    header.file_offset,
+                    string_table_offset,
+                    records_end,
+                    copy_table_offset,
+                    offset_map_offset,
+                    relationship_offset + header.relationship_data_size,
+                )
+            )
+            first_record += record_count
+            string_table_start += header.string_table_size
+
+        return sections
+
+    def is_section_readable(self, section: Section) -> bool:
+        """Encrypted sections come out of CASC zeroed when the key isn't known, those have to be skipped."""
+        if section.header.tact_key_hash == 0:
+            return True
+
+        if self.is_sparse:
+            end = section.header.offset_records_end
+        else:
+            end = section.records_offset + section.record_count * self.header.record_size
+        records = self.view[section.records_offset : end]
+        return records.tobytes().count(0) != len(records)
+
+    def get_section_ids(self, section: Section) -> Sequence[int]:
+        if section.header.id_list_size:
+            return read_uint32s(self.view[section.id_list_offset : section.copy_table_offset])
+
+        if self.is_sparse:
+            end = section.offset_map_id_list_offset + section.record_count * UINT32_STRUCT.size
+            return read_uint32s(self.view[section.offset_map_id_list_offset : end])
+
+        # the ID is one of the record's own fields
+        id_column = DB2Column.create("ID", "int", 32, True, 0, self.header.id_index)
+        return [
+            self.read_field(self.get_record(i), i, 0, id_column)
+            for i in range(section.first_record, section.first_record + section.record_count)
+        ]
+
+    def __build_index(self):
+        index: dict[int, int] = {}
+        copy_entries: list[tuple[int, int]] = []
+        for section in self.sections:
+            if not self.is_section_readable(section):
+                continue
+
+            first = section.first_record
+            index.update(zip(self.get_section_ids(section), range(first, first + section.record_count)))
+            copy_table = self.view[section.copy_table_offset : section.offset_map_offset]
+            copy_entries.extend(STRUCT_COPY_TABLE_ENTRY.iter_unpack(copy_table))
+
+        copies: dict[int, int] = {}
+        for new_id, copied_id in copy_entries:
+            if copied_id in index:
+                index[new_id] = index[copied_id]
+                copies[new_id] = copies.get(copied_id, copied_id)
+
+        self.__index, self.__copies = index, copies
+
+    @property
+    def index(self) -> dict[int, int]:
+        """Record ID -> record index, built on first use. Copied records point at the record they copy."""
+        if self.__index is None:
+            self.__build_index()
+
+        return self.__index  # type: ignore
+
+    @property
+    def copies(self) -> dict[int, int]:
+        """Record ID -> the ID of the record it copies, for every copied record."""
+        if self.__index is None:
+            self.__build_index()
+
+        return self.__copies
+
+    def locate(self, record_index: int) -> tuple[Section, int]:
+        section = self.sections[bisect.bisect_right(self.__section_starts, record_index) - 1]
+        return section, record_index - section.first_record
+
+    def get_record(self, record_index: int) -> memoryview:
+        section, i = self.locate(record_index)
+        if self.is_sparse:
+            offset, size = STRUCT_OFFSET_MAP_ENTRY.unpack_from(self.view, section.offset_map_offset + i * STRUCT_OFFSET_MAP_ENTRY.size)
+            return self.view[offset : offset + size]
+
+        offset = section.records_offset + i * self.header.record_size
+        return self.view[offset : offset + self.header.record_size]
+
+    def read_cstring(self, offset: int) -> tuple[str, int]:
+        end = self.buffer.find(b"\x00", offset)
+        if end == -1:
+            end = len(self.buffer)
+
+        return self.view[offset:end].tobytes().decode("utf8"), end + 1
+
+    def get_string(self, position: int) -> str:
+        """The string at `position` in every section's string table back to back."""
+        section = self.sections[bisect.bisect_right(self.__string_starts, position) - 1]
+        return self.read_cstring(section.string_table_offset + position - section.string_table_start)[0]
+
+    def get_common_data(self, field_index: int) -> dict[int, int]:
+        common_data = self.__common_data.get(field_index)
+        if common_data is None:
+            offset = self.field_data_offsets[field_index]
+            values = read_uint32s(self.view[offset : offset + self.fields[field_index].additional_data_size])
+            common_data = self.__common_data[field_index] = dict(zip(values[0::2], values[1::2]))
+
+        return common_data
+
+    def get_pallet_values(self, field_index: int, pallet_index: int, count: int) -> "array[int]":
+        offset = self.field_data_offsets[field_index] + pallet_index * count * UINT32_STRUCT.size
+        return read_uint32s(self.view[offset : offset + count * UINT32_STRUCT.size])
+
+    def read_field(self, record: memoryview, record_index: int, record_id: int, column: DB2Column) -> Any:
+        info = self.fields[column.field_index]
+        compression = info.compression
+
+        if compression == FieldCompression.NoCompression:
+            byte_offset = info.offset_bits >> 3
+            values: Sequence[Any] = column.struct.unpack_from(record, byte_offset)
+            if column.type in STRING_TYPES:
+                # string offsets are relative to where they're stored, with every record ahead of every string table
+                position = record_index * self.header.record_size + byte_offset - self.__records_size
+                values = [self.get_string(position + i * 4 + value) for i, value in enumerate(values)]
+        elif compression in (FieldCompression.Bitpacked, FieldCompression.BitpackedSigned):
+            signed = compression == FieldCompression.BitpackedSigned
+            values = [column.convert(read_bits(record, info.offset_bits, info.val2, signed))]
+        elif compression == FieldCompression.CommonData:
+            values = [column.convert(self.get_common_data(column.field_index).get(record_id, info.val1))]
+        elif compression == FieldCompression.BitpackedIndexed:
+            pallet_index = read_bits(record, info.offset_bits, info.val2)
+            values = [column.convert(value) for value in self.get_pallet_values(column.field_index, pallet_index, 1)]
+        elif compression == FieldCompression.BitpackedIndexedArray:
+            pallet_index = read_bits(record, info.offset_bits, info.val2)
+            values = [column.convert(value) for value in self.get_pallet_values(column.field_index, pallet_index, info.val3)]
+        else:
+            raise ValueError(f"unsupported field compression {compression} for column {column.name}")
+
+        return list(values) if column.array_size else values[0]
+
+    def read_sparse_row(self, record: memoryview, columns: list[DB2Column]) -> dict[str, Any]:
+        # sparse records are stored uncompressed with their strings inline, so each field starts where the last ended
+        row: dict[str, Any] = {}
+        record_bytes = record.tobytes()
+        offset = 0
+        for column in columns:
+            if column.type in STRING_TYPES:
+                strings = []
+                for _ in range(max(column.array_size, 1)):
+                    end = record_bytes.find(b"\x00", offset)
+                    if end == -1:
+                        end = len(record_bytes)
+                    strings.append(record_bytes[offset:end].decode("utf8"))
+                    offset = end + 1
+                row[column.name] = strings if column.array_size else strings[0]
+            else:
+                values = column.struct.unpack_from(record_bytes, offset)
+                offset += column.struct.size
+                row[column.name] = list(values) if column.array_size else values[0]
+
+        return row
+
+    def read_row(self, record_index: int, record_id: int, columns: list[DB2Column]) -> dict[str, Any]:
+        record = self.get_record(record_index)
+        if self.is_sparse:
+            return self.read_sparse_row(record, columns)
+
+        # a copy has the common data of the record it copies
+        record_id = self.copies.get(record_id, record_id)
+        return {column.name: self.read_field(record, record_index, record_id, column) for column in columns}
+
+
+class DB2Table:
+    """A DB2's rows by record ID, each decoded when it's accessed."""
+
+    def __init__(self, reader: WDC5Reader, columns: list[DB2Column]):
+        self.reader = reader
+        self.columns = columns
+
+    def get(self, record_id: int) -> Optional[dict[str, Any]]:
+        record_index = self.reader.index.get(record_id)
+        if record_index is None:
+            return None
+
+        return self.reader.read_row(record_index, record_id, self.columns)
+
+    def __getitem__(self, record_id: int) -> dict[str, Any]:
+        row = self.get(record_id)
+        if row is None:
+            raise KeyError(record_id)
+
+        return row
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self.reader.index
+
+    def __len__(self) -> int:
+        return len(self.reader.index)
+
+    def record_ids(self) -> Iterator[int]:
+        return iter(self.reader.index)
+
+
+class MergedTable:
+    """A table's base DB2 rows with the hotfixes in effect applied on top, resolved per row as it's accessed.
+
+    A Valid hotfix replaces or adds a row, a Delete removes it, and anything else leaves the base row as it is.
+    `base` can be None when there's no DB2 for the table, leaving just the hotfixed rows.
+    """
+
+    def __init__(self, base: Optional[DB2Table], hotfixes: HotfixResolver, table: str):
+        self.base = base
+        self.hotfixes = hotfixes
+        self.table = table
+
+    def get(self, record_id: int) -> Optional[dict[str, Any]]:
+        hotfix = self.hotfixes.lookup(self.table, record_id)
+        if hotfix is not None:
+            return hotfix.Data if hotfix.Status == RecordState.Valid else None
+
+        return self.base.get(record_id) if self.base is not None else None
+
+    def __getitem__(self, record_id: int) -> dict[str, Any]:
+        row = self.get(record_id)
+        if row is None:
+            raise KeyError(record_id)
+
+        return row
+
+    def __contains__(self, record_id: int) -> bool:
+        hotfix = self.hotfixes.lookup(self.table, record_id)
+        if hotfix is not None:
+            return hotfix.Status == RecordState.Valid
+
+        return self.base is not None and record_id in self.base
+
+    def is_hotfixed(self, record_id: int) -> bool:
+        return self.hotfixes.lookup(self.table, record_id) is not None
+
+    def record_ids(self) -> Iterator[int]:
+        """Base records that weren't deleted in file order, then the records only hotfixes add."""
+        if self.base is not None:
+            for record_id in self.base.record_ids():
+                if record_id in self:
+                    yield record_id
+
+        for hotfix in self.hotfixes.iter_table(self.table):
+            if hotfix.Status == RecordState.Valid and (self.base is None or hotfix.RecordID not in self.base):
+                yield hotfix.RecordID
+
+    def items(self) -> Iterator[tuple[int, dict[str, Any]]]:
+        for record_id in self.record_ids():
+            yield record_id, self[record_id]
+
+    def __len__(self) -> int:
+        count = len(self.base) if self.base is not None else 0
+        for hotfix in self.hotfixes.iter_table(self.table):
+            in_base = self.base is not None and hotfix.RecordID in self.base
+            if hotfix.Status == RecordState.Valid and not in_base:
+                count += 1
+            elif hotfix.Status == RecordState.Delete and in_base:
+                count -= 1
+
+        return count
@@ -1,26 +1,36 @@
 import os
 import re
-import json
 import httpx
+import bisect
+import asyncio
+import concurrent.futures
 
 from enum import StrEnum
-from typing import Optional
-from dataclasses import dataclass
+from typing import Iterable, Optional
+from dataclasses import dataclass, field
 
 from pycasclib.core import CascLibException, FileOpenFlags
 
-from hotfixes.structures import DBStructures
-from hotfixes.utils import Singleton, flatten_matches, convert_table_hash
+from hotfixes.layouts import LayoutCache, LAYOUT_CACHE_FILE
+from hotfixes.prefetch import DEFAULT_CONCURRENCY, prefetch_definitions
+from hotfixes.httpcache import DiskCache
+from hotfixes.localdefs import DefinitionsSource, LocalDefinitions
+from hotfixes.manifestindex import ManifestIndex, load_manifest_index
+from hotfixes.schemastore import SchemaStore, open_schema_store
+from hotfixes.utils import Singleton, LRUCache, flatten_matches
 
 DB2_EXPORT_PATH = "T:/Data/dbcs/"
 
 DBD_URL = "https://raw.githubusercontent.com/wowdev/WoWDBDefs/master"
-DBD_CACHE = {}
+DBD_CACHE: dict[str, str] = {}
 
-LAYOUT_HEADER_PATTERN = r"^LAYOUT\s+(.+)(?:,\s*(.+))*"
+PARSED_DBD_CACHE_SIZE = 256
+PARSED_DBD_CACHE: LRUCache[str, "DBD"] = LRUCache(PARSED_DBD_CACHE_SIZE)
+
+LAYOUT_HEADER_PATTERN = r"^LAYOUT\s+(.+)"
 LAYOUT_BUILD_PATTERN = r"BUILD\s+(\d+(\.\d+)+\-\d+(\.\d+)+)*"  # ty Cloudy
 
-LAYOUT_COLUMN_PATTERN = r"(?>\$(.+)\$)?([^<]+)(<.+>)?+(?>\[(.+)\])?"
+LAYOUT_COLUMN_PATTERN = r"(?>\$(.+)\$)?([^<\[]+)(<.+>)?+(?>\[(.+)\])?"
 LAYOUT_COLUMN_RE = re.compile(LAYOUT_COLUMN_PATTERN)
 
 
@@ -50,6 +60,9 @@ class Column:
     comment: Optional[str]
 
 
+BuildKey = tuple[int, int, int, int]
+
+
 @dataclass
 class Build:
     major: int
@@ -60,6 +73,9 @@ class Build:
     def to_string(self) -> str:
         return f"{self.major}.{self.minor}.{self.patch}.{self.build}"
 
+    def to_tuple(self) -> BuildKey:
+        return (self.major, self.minor, self.patch, self.build)
+
     @classmethod
     def from_version_str(cls, version: str):
         if "-" in version:
@@ -70,28 +86,19 @@ class Build:
     def is_equal(self, other):
         if other is None:
             return False
-        return (
-            self.major == other.major
-            and self.minor == other.minor
-            and self.patch == other.patch
-            and self.build == other.build
-        )
+        return self.to_tuple() == other.to_tuple()
 
     def __lt__(self, other):
-        return (
-            self.major < other.major
-            or self.minor < other.minor
-            or self.patch < other.patch
-            or self.build < other.build
-        )
+        return self.to_tuple() < other.to_tuple()
 
     def __gt__(self, other):
-        return (
-            self.major > other.major
-            or self.minor > other.minor
-            or self.patch > other.patch
-            or self.build > other.build
-        )
+        return self.to_tuple() > other.to_tuple()
+
+    def __le__(self, other):
+        return self.to_tuple() <= other.to_tuple()
+
+    def __ge__(self, other):
+        return self.to_tuple() >= other.to_tuple()
 
 
 @dataclass
@@ -134,30 +141,89 @@ class Definitions:
                 if build.is_equal(version):
                     return True
             elif isinstance(build, BuildRange):
-                if version > build.lower and version < build.upper:
+                if build.lower <= version <= build.upper:
                     return True
 
         return False
 
 
+@dataclass
+class DefinitionsIndex:
+    """Lookup tables over a DBD's definitions, by layout hash and by build.
+
+    Build ranges are cut into non-overlapping segments at every range boundary, so finding the definitions for a
+    build is one dict lookup for exact builds plus one bisect over the segment starts.
+    """
+
+    layouts: dict[str, list[int]]
+    builds: dict[BuildKey, list[int]]
+    boundaries: list[BuildKey]  # sorted segment starts
+    segments: list[list[int]]  # definitions covering [boundaries[i], boundaries[i + 1])
+
+    @classmethod
+    def from_definitions(cls, definitions: list[Definitions]) -> "DefinitionsIndex":
+        layouts: dict[str, list[int]] = {}
+        builds: dict[BuildKey, list[int]] = {}
+        ranges: list[tuple[BuildKey, BuildKey, int]] = []
+
+        for i, definition in enumerate(definitions):
+            for layout_hash in definition.layouts:
+                layouts.setdefault(layout_hash, []).append(i)
+
+            for build in definition.builds:
+                if isinstance(build, Build):
+                    builds.setdefault(build.to_tuple(), []).append(i)
+                elif isinstance(build, BuildRange):
+                    lower = build.lower.to_tuple()
+                    # ranges are inclusive, so the segment ends right after the upper build
+                    upper = build.upper.to_tuple()
+                    ranges.append((lower, upper[:3] + (upper[3] + 1,), i))
+
+        boundaries = sorted({lower for lower, _, _ in ranges} | {end for _, end, _ in ranges})
+        segments: list[list[int]] = [[] for _ in boundaries]
+        for lower, end, i in ranges:
+            for segment in range(bisect.bisect_left(boundaries, lower), bisect.bisect_left(boundaries, end)):
+                segments[segment].append(i)
+
+        return cls(layouts, builds, boundaries, segments)
+
+    def find_build(self, build: Build) -> list[int]:
+        key = build.to_tuple()
+        found = set(self.builds.get(key, ()))
+
+        segment = bisect.bisect_right(self.boundaries, key) - 1
+        if segment >= 0:
+            found.update(self.segments[segment])
+
+        return sorted(found)
+
+    def find_layout(self, layout_hash: str) -> list[int]:
+        return self.layouts.get(layout_hash, [])
+
+
 @dataclass
 class DBD:
     columns: list[Column]
     definitions: list[Definitions]
+    index: Optional[DefinitionsIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    def get_index(self) -> DefinitionsIndex:
+        if self.index is None:
+            self.index = DefinitionsIndex.from_definitions(self.definitions)
+
+        return self.index
 
     def get_definitions_for_build(self, build: Build) -> list[DefinitionEntry]:
         entries = []
-        for definition in self.definitions:
-            if definition.supports_version(build):
-                entries.extend(definition.entries)
+        for i in self.get_index().find_build(build):
+            entries.extend(self.definitions[i].entries)
 
         return entries
 
     def get_definitions_for_layout(self, layout_hash: str) -> list[DefinitionEntry]:
         entries = []
-        for definition in self.definitions:
-            if layout_hash in definition.layouts:
-                entries.extend(definition.entries)
+        for i in self.get_index().find_layout(layout_hash):
+            entries.extend(self.definitions[i].entries)
 
         return entries
 
@@ -175,6 +241,10 @@ class DBDefs:
         client: Optional[httpx.Client] = None,
         dbdefs_path: Optional[str] = None,
         casc_handle=None,
+        product: str = "",
+        build: Optional[Build] = None,
+        http_cache: Optional[DiskCache] = None,
+        use_schema_store: bool = False,
     ):
         if client is not None:
             self.__client = client
@@ -182,19 +252,28 @@ class DBDefs:
             self.__client = httpx.Client(http2=True)
 
         self.__client.base_url = httpx.URL(DBD_URL)
+        http_cache = http_cache if http_cache is not None else DiskCache()
 
+        # a local checkout is only listed here, each table is read on first use and anything missing from it
+        # still comes over HTTP. The schema store is opt-in: compiling it parses the whole checkout, which only
+        # pays off when the same checkout is reused across many runs
+        self.__definitions: DefinitionsSource = http_cache
+        self.schema_store: Optional[SchemaStore] = None
         if dbdefs_path is not None and os.path.exists(dbdefs_path):
-            self.__dbdefs_path = dbdefs_path
-
-            definitions_dir = os.path.join(self.__dbdefs_path, "definitions")
-            for file in os.listdir(definitions_dir):
-                if file.endswith(".dbd"):
-                    tbl_name = file.replace(".dbd", "")
-                    with open(os.path.join(definitions_dir, file), "r") as f:
-                        DBD_CACHE[tbl_name] = f.read()
+            self.__definitions = LocalDefinitions(dbdefs_path, http_cache)
+            if use_schema_store:
+                self.schema_store = open_schema_store(dbdefs_path, self.parse_dbd)
 
         self.__casc = casc_handle
 
+        # without a known build there's nothing to key the on-disk cache by, so keep it in memory
+        self.__layouts = LayoutCache(
+            product,
+            build.to_string() if build is not None else "",
+            self.read_db2_header,
+            LAYOUT_CACHE_FILE if build is not None else None,
+        )
+
     def parse_column_line(self, column: str):
         elements = column.split(" ")
 
@@ -241,8 +320,9 @@ class DBDefs:
         return columns
 
     def parse_layout(self, section: list[str]):
+        # a layout hash can start with a letter, so these can't go through flatten_matches like the builds do
         matches = re.findall(LAYOUT_HEADER_PATTERN, section[0])
-        layout_hashes = flatten_matches(matches, False)
+        layout_hashes = [layout_hash.strip() for match in matches for layout_hash in match.split(",") if layout_hash.strip()]
 
         # get all supported builds
         i = 0
@@ -309,79 +389,128 @@ class DBDefs:
             return DBD_CACHE[tbl_name]
 
         url = f"/definitions/{tbl_name}.dbd"
-        response = self.__client.get(url)
-        response.raise_for_status()
-
-        definitions = response.text
+        definitions = self.__definitions.get(self.__client, url, url).decode("utf8")
         DBD_CACHE[tbl_name] = definitions
         return definitions
 
+    def prefetch_definitions(self, tbl_names: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY):
+        """Fetches every missing definition at once, instead of one blocking request per table on first use."""
+        store = self.schema_store
+        missing = {
+            tbl_name
+            for tbl_name in tbl_names
+            if tbl_name not in DBD_CACHE and tbl_name != UNK_TBL and (store is None or tbl_name not in store)
+        }
+        if not missing:
+            return
+
+        prefetch = prefetch_definitions(DBD_URL, missing, concurrency, self.__definitions)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            DBD_CACHE.update(asyncio.run(prefetch))
+            return
+
+        # asyncio.run can't be nested in a running loop (async services, notebooks), so the prefetch gets its own thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            DBD_CACHE.update(executor.submit(asyncio.run, prefetch).result())
+
     def get_definitions_for_table_by_hash(self, tbl_hash: str):
         tbl_name = Manifest().get_table_name_from_hash(tbl_hash)
         return self.get_definitions_for_table(tbl_name)
 
+    def __load_parsed_definitions(self, tbl_name: str) -> DBD:
+        if self.schema_store is not None and tbl_name in self.schema_store:
+            return self.schema_store.get(tbl_name)  # type: ignore
+
+        return self.parse_dbd(self.get_definitions_for_table(tbl_name))
+
+    def get_parsed_definitions(self, tbl_name: str) -> DBD:
+        return PARSED_DBD_CACHE.get_or_load(tbl_name, lambda: self.__load_parsed_definitions(tbl_name))
+
     def get_parsed_definitions_by_hash(self, tbl_hash: str) -> DBD:
-        defs = self.get_definitions_for_table_by_hash(tbl_hash)
-        return self.parse_dbd(defs)
+        tbl_name = Manifest().get_table_name_from_hash(tbl_hash)
+        return self.get_parsed_definitions(tbl_name)
 
-    def get_layout_for_table(self, tbl_name: str) -> Optional[str]:
-        db2_fdid = Manifest().get_fdid_from_table_name(tbl_name)
+    def read_db2(self, db2_fdid: int) -> Optional[bytes]:
+        """The whole DB2 from CASC, None if it can't be read."""
         flags = (
             FileOpenFlags.CASC_OPEN_BY_FILEID | FileOpenFlags.CASC_OVERCOME_ENCRYPTED
         )
         try:
             db2 = self.__casc.read_file_by_id(db2_fdid, flags)  # type: ignore
-            db2_header = DBStructures.DB2[5].STRUCT_DB2_HEADER.parse(db2.data)
-            return convert_table_hash(db2_header.layout_hash)  # type: ignore
+            data: bytes = db2.data
+            return data
         except CascLibException:
             return None
 
+    def read_db2_header(self, db2_fdid: int) -> Optional[bytes]:
+        # pycasclib only hands back whole files, LayoutCache slices the header off
+        return self.read_db2(db2_fdid)
+
+    def get_layout_for_table(self, tbl_name: str) -> Optional[str]:
+        db2_fdid = Manifest().get_fdid_from_table_name(tbl_name)
+        return self.__layouts.get(db2_fdid)
+
+    def prefetch_layouts(self, tbl_names: Iterable[str]):
+        manifest = Manifest()
+        self.__layouts.prefetch(manifest.get_fdid_from_table_name(tbl_name) for tbl_name in tbl_names)
+
 
 UNK_TBL = "Unknown"
 
 
 class Manifest(Singleton):
-    __hash_name_lookup: dict[str, str] = {}
-    __name_hash_lookup: dict[str, str] = {}
-    __manifest: Optional[dict[str, str]] = None
+    __index: Optional[ManifestIndex] = None
 
     def __init__(
-        self, client: Optional[httpx.Client] = None, dbdefs_path: Optional[str] = None
+        self,
+        client: Optional[httpx.Client] = None,
+        dbdefs_path: Optional[str] = None,
+        http_cache: Optional[DiskCache] = None,
+        schema_store: Optional[SchemaStore] = None,
     ):
-        self.load_manifest(client, dbdefs_path)
+        self.load_manifest(client, dbdefs_path, http_cache, schema_store)
 
     def load_manifest(
-        self, client: Optional[httpx.Client] = None, dbdefs_path: Optional[str] = None
+        self,
+        client: Optional[httpx.Client] = None,
+        dbdefs_path: Optional[str] = None,
+        http_cache: Optional[DiskCache] = None,
+        schema_store: Optional[SchemaStore] = None,
     ):
-        if self.__manifest is not None:
+        if self.__index is not None:
+            return
+
+        if schema_store is not None:
+            self.__index = schema_store.manifest_index
             return
 
         if dbdefs_path is not None:
-            with open(os.path.join(dbdefs_path, "manifest.json"), "r") as f:
-                manifest = json.load(f)
+            with open(os.path.join(dbdefs_path, "manifest.json"), "rb") as f:
+                raw_manifest = f.read()
         else:
             manifest_url = DBD_URL + "/manifest.json"
             _client = client if client is not None else httpx.Client()
-            response = _client.get(manifest_url)
-            response.raise_for_status()
-            manifest = response.json()
+            _http_cache = http_cache if http_cache is not None else DiskCache()
+            raw_manifest = _http_cache.get(_client, manifest_url, "manifest.json")
 
-        for tbl in manifest:
-            self.__hash_name_lookup[tbl["tableHash"]] = tbl["tableName"]
-            self.__name_hash_lookup[tbl["tableName"]] = tbl["tableHash"]
+        self.__index = load_manifest_index(raw_manifest)
 
-        self.__manifest = manifest
+    @property
+    def index(self) -> ManifestIndex:
+        assert self.__index is not None, "the manifest hasn't been loaded"
+        return self.__index
 
     def get_table_name_from_hash(self, tbl_hash: str) -> str:
-        tbl_hash = tbl_hash.upper()
+        # TODO: probably also send an alert somewhere idk
+        return self.index.hash_to_name.get(tbl_hash.upper(), UNK_TBL)
 
-        if tbl_hash in self.__hash_name_lookup:
-            return self.__hash_name_lookup[tbl_hash]
-        else:
-            return UNK_TBL  # TODO: probably also send an alert somewhere idk
+    def get_table_hash_from_name(self, tbl_name: str) -> Optional[str]:
+        return self.index.name_to_hash.get(tbl_name.lower())
 
     def get_fdid_from_table_name(self, tbl_name: str) -> int:
-        for tbl in self.__manifest:
-            if tbl["tableName"].lower() == tbl_name.lower():
-                return tbl["db2FileDataID"]
-        return 0
+        return self.index.name_to_fdid.get(tbl_name.lower(), 0)
+
+    def get_table_name_from_fdid(self, db2_fdid: int) -> Optional[str]:
+        return self.index.fdid_to_name.get(db2_fdid)
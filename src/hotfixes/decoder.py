@@ -0,0 +1,318 @@
+import re
+import struct
+import concurrent.futures
+
+from enum import StrEnum
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Sequence, Union
+
+from hotfixes.bytelist import ByteList
+from hotfixes.codec import get_format_code, skip_strings, split_strings
+from hotfixes.dbdefs import DBD, ColumnDataType, DefinitionEntry
+
+STRING_TYPES = (ColumnDataType.String, ColumnDataType.Locstring)
+
+# keyed by (table hash, layout hash, projected columns), the columns are None for a full decoder
+DECODER_CACHE: dict[tuple[str, str, Optional[frozenset[str]]], "RowDecoder"] = {}
+
+STRUCT_FORMAT_FIELD_PATTERN = re.compile(r"(\d+)(\D)")
+
+# payloads per task when decoding on a pool
+THREAD_BATCH_SIZE = 512
+PROCESS_BATCH_SIZE = 4096
+
+
+class DecodeBackend(StrEnum):
+    Serial = "serial"
+    Threads = "threads"
+    Processes = "processes"
+
+
+@dataclass
+class FixedRun:
+    """A run of consecutive fixed-width columns, decoded with a single `struct.Struct`.
+
+    Columns left out of a projection are pad bytes in the struct, a run without any fields is skipped by its size.
+    """
+
+    struct: struct.Struct
+    fields: list[tuple[str, int]]  # (column name, array size), array size is 0 for scalars
+
+
+@dataclass
+class StringColumn:
+    """A NUL-terminated string column, or `array_size` of them back to back.
+
+    With `skip`, the strings are only stepped over to find the columns after them.
+    """
+
+    column: str
+    array_size: int
+    skip: bool = False
+
+
+Step = Union[FixedRun, StringColumn]
+
+# a picklable form of a Step: (struct format, fields) for fixed runs, (None, (column, array size, skip)) for strings
+PlanStep = tuple[Optional[str], Any]
+
+
+def get_struct_format(def_entry: DefinitionEntry, column_type: ColumnDataType) -> str:
+    try:
+        return get_format_code(column_type, def_entry.int_width, def_entry.is_unsigned)
+    except ValueError as e:
+        raise ValueError(f"{e} for column {def_entry.column}") from None
+
+
+class RowDecoder:
+    """A column plan for one table layout, compiled once and reused for every hotfix of that layout."""
+
+    def __init__(self, steps: list[Step]):
+        self.steps = steps
+        self.has_strings = any(isinstance(step, StringColumn) for step in steps)
+
+    @classmethod
+    def compile(cls, dbd: DBD, layout_hash: str) -> "RowDecoder":
+        columns = {column.name: column for column in dbd.columns}
+
+        steps: list[Step] = []
+        run_format: list[str] = []
+        run_fields: list[tuple[str, int]] = []
+
+        def close_run():
+            if run_fields:
+                steps.append(FixedRun(struct.Struct("<" + "".join(run_format)), list(run_fields)))
+                run_format.clear()
+                run_fields.clear()
+
+        for def_entry in dbd.get_definitions_for_layout(layout_hash):
+            if "noninline" in def_entry.annotation:
+                continue
+
+            column = columns.get(def_entry.column)
+            if column is None:
+                continue
+
+            if column.type in STRING_TYPES:
+                close_run()
+                steps.append(StringColumn(def_entry.column, def_entry.array_size))
+                continue
+
+            count = max(def_entry.array_size, 1)
+            run_format.append(f"{count}{get_struct_format(def_entry, column.type)}")
+            run_fields.append((def_entry.column, def_entry.array_size))
+
+        close_run()
+        return cls(steps)
+
+    def to_plan(self) -> list[PlanStep]:
+        plan: list[PlanStep] = []
+        for step in self.steps:
+            if isinstance(step, FixedRun):
+                plan.append((step.struct.format, step.fields))
+            else:
+                plan.append((None, (step.column, step.array_size, step.skip)))
+
+        return plan
+
+    @classmethod
+    def from_plan(cls, plan: list[PlanStep]) -> "RowDecoder":
+        steps: list[Step] = []
+        for struct_format, fields in plan:
+            if struct_format is None:
+                steps.append(StringColumn(*fields))
+            else:
+                steps.append(FixedRun(struct.Struct(struct_format), fields))
+
+        return cls(steps)
+
+    def project(self, columns: Iterable[str]) -> "RowDecoder":
+        """A decoder for only `columns` of this layout.
+
+        Offsets within fixed runs are worked out here once, so unwanted fixed-width columns cost nothing at decode time.
+        Strings are still scanned when a wanted column comes after them, and nothing past the last wanted column is read.
+        """
+        wanted = set(columns)
+
+        last = -1
+        for i, step in enumerate(self.steps):
+            if isinstance(step, StringColumn):
+                if step.column in wanted:
+                    last = i
+            elif any(column in wanted for column, _ in step.fields):
+                last = i
+
+        steps: list[Step] = []
+        for i, step in enumerate(self.steps[: last + 1]):
+            if isinstance(step, StringColumn):
+                steps.append(step if step.column in wanted else StringColumn(step.column, step.array_size, skip=True))
+                continue
+
+            run_format: list[str] = []
+            run_fields: list[tuple[str, int]] = []
+            pad = 0
+            for (column, array_size), (count, code) in zip(step.fields, STRUCT_FORMAT_FIELD_PATTERN.findall(step.struct.format[1:])):
+                field_format = f"{count}{code}"
+                if column not in wanted:
+                    pad += struct.calcsize("<" + field_format)
+                    continue
+
+                if pad:
+                    run_format.append(f"{pad}x")
+                    pad = 0
+                run_format.append(field_format)
+                run_fields.append((column, array_size))
+
+            # trailing pad bytes only matter when something is read after this run
+            if pad and i < last:
+                run_format.append(f"{pad}x")
+
+            steps.append(FixedRun(struct.Struct("<" + "".join(run_format)), run_fields))
+
+        return RowDecoder(steps)
+
+    def __reduce__(self):
+        # struct.Struct can't be pickled, so process pools get the plan and rebuild it
+        return (RowDecoder.from_plan, (self.to_plan(),))
+
+    def decode(self, data: Any) -> dict[str, Any]:
+        """Decodes one record in a single pass. Raises `struct.error` if `data` is shorter than the layout."""
+        data = bytes(data) if self.has_strings else as_buffer(data)
+
+        offset = 0
+        parsed_data: dict[str, Any] = {}
+        for step in self.steps:
+            if isinstance(step, FixedRun):
+                if not step.fields:
+                    offset += step.struct.size
+                    continue
+
+                values = step.struct.unpack_from(data, offset)
+                offset += step.struct.size
+
+                i = 0
+                for column, array_size in step.fields:
+                    if array_size == 0:
+                        parsed_data[column] = values[i]
+                        i += 1
+                    else:
+                        parsed_data[column] = list(values[i : i + array_size])
+                        i += array_size
+            elif step.skip:
+                offset = skip_strings(data, max(step.array_size, 1), offset)
+            else:
+                strings, offset = split_strings(data, max(step.array_size, 1), offset)
+                parsed_data[step.column] = strings if step.array_size else strings[0]
+
+        return parsed_data
+
+
+def get_row_decoder(
+    table_hash: str, layout_hash: str, load_dbd: Callable[[], DBD], columns: Optional[Iterable[str]] = None
+) -> RowDecoder:
+    """Returns the cached decoder for a table layout, compiling it from `load_dbd()` on first use.
+
+    With `columns`, the decoder only decodes those, see `RowDecoder.project`.
+    """
+    projection = frozenset(columns) if columns is not None else None
+    key = (table_hash, layout_hash, projection)
+    decoder: Optional[RowDecoder] = DECODER_CACHE.get(key)
+    if decoder is None:
+        if projection is None:
+            decoder = RowDecoder.compile(load_dbd(), layout_hash)
+        else:
+            decoder = get_row_decoder(table_hash, layout_hash, load_dbd).project(projection)
+        DECODER_CACHE[key] = decoder
+
+    return decoder
+
+
+def as_buffer(data: Any) -> Union[bytes, bytearray, memoryview]:
+    # the construct reader hands out lists of ints, the mmap reader memoryviews
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+
+    if isinstance(data, ByteList):
+        return data.view
+
+    return bytes(data)
+
+
+def try_decode(decoder: Optional[RowDecoder], data: Any) -> Optional[dict[str, Any]]:
+    if decoder is None or len(data) == 0:
+        return None
+
+    try:
+        return decoder.decode(data)
+    except (struct.error, UnicodeDecodeError):
+        return None
+
+
+def decode_batch(decoder: RowDecoder, blob: bytes, sizes: list[int]) -> list[Optional[dict[str, Any]]]:
+    """Decodes a batch of payloads packed back to back into `blob`. Runs inside process pool workers."""
+    view = memoryview(blob)
+    results = []
+    offset = 0
+    for size in sizes:
+        results.append(try_decode(decoder, view[offset : offset + size]))
+        offset += size
+
+    return results
+
+
+def create_executor(backend: DecodeBackend, max_workers: Optional[int] = None) -> Optional[concurrent.futures.Executor]:
+    """The pool `decode_payloads` would create for `backend`, None for Serial.
+
+    Pass it to several `decode_payloads` calls to share one pool between them.
+    """
+    if backend == DecodeBackend.Threads:
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    if backend == DecodeBackend.Processes:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    return None
+
+
+def decode_payloads(
+    jobs: Sequence[tuple[Optional[RowDecoder], Any]],
+    backend: DecodeBackend = DecodeBackend.Threads,
+    max_workers: Optional[int] = None,
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> list[Optional[dict[str, Any]]]:
+    """Decodes each (decoder, payload) job, returning the results in the same order as `jobs`.
+
+    Without an `executor` from `create_executor`, a pool is created for this call and shut down before it returns.
+    """
+    if backend == DecodeBackend.Serial:
+        return [try_decode(decoder, data) for decoder, data in jobs]
+
+    if executor is None:
+        with create_executor(backend, max_workers) as executor:  # type: ignore
+            return decode_payloads(jobs, backend, max_workers, executor)
+
+    if backend == DecodeBackend.Threads:
+        chunks = [jobs[start : start + THREAD_BATCH_SIZE] for start in range(0, len(jobs), THREAD_BATCH_SIZE)]
+        decoded = executor.map(lambda chunk: [try_decode(decoder, data) for decoder, data in chunk], chunks)
+        return [result for chunk_results in decoded for result in chunk_results]
+
+    # group payloads by decoder so each task ships one schema and one packed blob
+    groups: dict[int, tuple[RowDecoder, list[int]]] = {}
+    for i, (decoder, data) in enumerate(jobs):
+        if decoder is None or len(data) == 0:
+            continue
+        groups.setdefault(id(decoder), (decoder, []))[1].append(i)
+
+    results: list[Optional[dict[str, Any]]] = [None] * len(jobs)
+    futures = {}
+    for decoder, indices in groups.values():
+        for start in range(0, len(indices), PROCESS_BATCH_SIZE):
+            batch = indices[start : start + PROCESS_BATCH_SIZE]
+            payloads = [jobs[i][1] for i in batch]
+            blob = b"".join(as_buffer(payload) for payload in payloads)
+            sizes = [len(p) for p in payloads]
+            futures[executor.submit(decode_batch, decoder, blob, sizes)] = batch
+
+    for future in concurrent.futures.as_completed(futures):
+        for i, result in zip(futures[future], future.result()):
+            results[i] = result
+
+    return results
@@ -0,0 +1,152 @@
+import hashlib
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from hotfixes.reader import (
+    Buffer,
+    DBCacheFilter,
+    DBCACHE_HEADER,
+    DBCACHE_ENTRY_HEADER,
+    RELEASE_INTERVAL,
+    map_dbcache,
+    read_dbcache_header,
+    release_pages,
+    iter_dbcache_entries,
+)
+from hotfixes.t_structs import DBCacheHeader, DBCacheEntry
+
+if TYPE_CHECKING:
+    from hotfixes.parser import Hotfix
+
+# (table hash, record ID, push ID, unique ID)
+EntryKey = tuple[int, int, int, int]
+
+# (status, payload digest, offset of the entry header)
+EntrySummary = tuple[int, bytes, int]
+
+PAYLOAD_DIGEST_SIZE = 16
+
+
+def hash_payload(data: Any) -> bytes:
+    return hashlib.blake2b(data, digest_size=PAYLOAD_DIGEST_SIZE).digest()
+
+
+@dataclass
+class DBCacheSnapshot:
+    """Every entry of a DBCache by key, reduced to its status and a hash of its payload.
+
+    Payloads aren't kept, `get_entry` reads an entry back from the map when it's needed.
+    """
+
+    buffer: Buffer
+    header: DBCacheHeader
+    entries: dict[EntryKey, EntrySummary]
+
+    @classmethod
+    def read(cls, path: str, entry_filter: Optional[DBCacheFilter] = None) -> "DBCacheSnapshot":
+        """Walks the file once, front to back, releasing pages behind the cursor.
+
+        This only unpacks the entry headers and hashes payloads in place, without building a `DBCacheEntry` per entry.
+        Like `iter_dbcache_entries`, it stops at the first entry that's cut short.
+        """
+        buffer = map_dbcache(path)
+        header = read_dbcache_header(buffer)
+
+        view = memoryview(buffer)
+        buffer_size = len(view)
+        header_size = DBCACHE_ENTRY_HEADER.size
+        unpack_header = DBCACHE_ENTRY_HEADER.unpack_from
+
+        entries: dict[EntryKey, EntrySummary] = {}
+        offset = DBCACHE_HEADER.size
+        released = 0
+        while offset + header_size <= buffer_size:
+            if offset - released >= RELEASE_INTERVAL:
+                released = release_pages(buffer, released, offset)
+
+            _, _, push_id, unique_id, table_hash, record_id, data_size, status, _ = unpack_header(view, offset)
+            data_start = offset + header_size
+            data_end = data_start + data_size
+            if data_end > buffer_size:
+                break
+
+            if entry_filter is None or entry_filter.matches(table_hash, push_id, record_id, status):
+                key = (table_hash, record_id, push_id, unique_id)
+                entries[key] = (status, hash_payload(view[data_start:data_end]), offset)
+
+            offset = data_end
+
+        return cls(buffer, header, entries)
+
+    def get_entry(self, key: EntryKey) -> DBCacheEntry:
+        return next(iter_dbcache_entries(self.buffer, self.entries[key][2]))
+
+
+@dataclass
+class DBCacheDiff:
+    """The keys of the entries added, removed or changed between two snapshots, each in its file's order.
+
+    A changed entry kept its key but got a different status or payload.
+    """
+
+    old: DBCacheSnapshot
+    new: DBCacheSnapshot
+    added: list[EntryKey] = field(default_factory=list)
+    removed: list[EntryKey] = field(default_factory=list)
+    changed: list[EntryKey] = field(default_factory=list)
+
+    @property
+    def unchanged(self) -> int:
+        return len(self.new.entries) - len(self.added) - len(self.changed)
+
+
+def diff_snapshots(old: DBCacheSnapshot, new: DBCacheSnapshot) -> DBCacheDiff:
+    diff = DBCacheDiff(old, new)
+    old_entries = old.entries
+    for key, (status, digest, _) in new.entries.items():
+        old_entry = old_entries.get(key)
+        if old_entry is None:
+            diff.added.append(key)
+        elif old_entry[0] != status or old_entry[1] != digest:
+            diff.changed.append(key)
+
+    new_entries = new.entries
+    diff.removed = [key for key in old_entries if key not in new_entries]
+    return diff
+
+
+def diff_dbcache(old_path: str, new_path: str, entry_filter: Optional[DBCacheFilter] = None) -> DBCacheDiff:
+    """Diffs two DBCache files by entry key and payload hash, without decoding anything."""
+    return diff_snapshots(DBCacheSnapshot.read(old_path, entry_filter), DBCacheSnapshot.read(new_path, entry_filter))
+
+
+def diff_fields(old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]) -> dict[str, tuple[Any, Any]]:
+    """(old value, new value) for every column whose value differs, a column missing on one side is None there."""
+    old = old or {}
+    new = new or {}
+
+    fields = {}
+    for column in {**old, **new}:
+        old_value, new_value = old.get(column), new.get(column)
+        if old_value != new_value:
+            fields[column] = (old_value, new_value)
+
+    return fields
+
+
+@dataclass(slots=True)
+class HotfixChange:
+    old: "Hotfix"
+    new: "Hotfix"
+    fields: dict[str, tuple[Any, Any]]  # column -> (old value, new value)
+
+
+@dataclass
+class HotfixDiff:
+    """The decoded result of a `DBCacheDiff`."""
+
+    added: list["Hotfix"]
+    removed: list["Hotfix"]
+    changed: list[HotfixChange]
+    unchanged: int
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import httpx
+import tempfile
+
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from hotfixes import CACHE_PATH
+
+DEFINITIONS_CACHE_PATH = os.path.join(CACHE_PATH, "dbdefs")
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+META_SUFFIX = ".meta.json"
+
+
+@dataclass
+class CacheMeta:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class DiskCache:
+    """Keeps downloaded files on disk with their HTTP validators, mirroring the remote layout under `path`.
+
+    Entries younger than `ttl` are served without touching the network, older ones are revalidated with a conditional GET.
+    In `offline` mode only what's already on disk is served.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFINITIONS_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        offline: bool = False,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+
+    def get_file_path(self, key: str) -> str:
+        return os.path.join(self.path, *key.strip("/").split("/"))
+
+    def __write(self, file_path: str, data: bytes):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+
+    def load(self, key: str) -> tuple[Optional[bytes], Optional[CacheMeta]]:
+        file_path = self.get_file_path(key)
+        try:
+            with open(file_path + META_SUFFIX, "r") as f:
+                meta = CacheMeta(**json.load(f))
+            with open(file_path, "rb") as f:
+                return f.read(), meta
+        except (OSError, TypeError, json.JSONDecodeError):
+            return None, None
+
+    def store(self, key: str, body: bytes, response: httpx.Response):
+        meta = CacheMeta(
+            str(response.url),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            time.time(),
+        )
+        file_path = self.get_file_path(key)
+        self.__write(file_path, body)
+        self.__write(file_path + META_SUFFIX, json.dumps(asdict(meta)).encode())
+
+    def touch(self, key: str, meta: CacheMeta):
+        meta.fetched_at = time.time()
+        self.__write(self.get_file_path(key) + META_SUFFIX, json.dumps(asdict(meta)).encode())
+
+    def is_fresh(self, meta: CacheMeta) -> bool:
+        return time.time() - meta.fetched_at < self.ttl
+
+    def get_conditional_headers(self, meta: Optional[CacheMeta]) -> dict[str, str]:
+        headers = {}
+        if meta is not None:
+            if meta.etag:
+                headers["If-None-Match"] = meta.etag
+            if meta.last_modified:
+                headers["If-Modified-Since"] = meta.last_modified
+
+        return headers
+
+    def __lookup(self, key: str) -> tuple[Optional[bytes], Optional[CacheMeta], bool]:
+        # returns (cached body, its meta, whether it can be served without asking the server)
+        body, meta = self.load(key)
+        if body is not None and (self.offline or self.is_fresh(meta)):  # type: ignore
+            return body, meta, True
+
+        if self.offline:
+            raise FileNotFoundError(f"{key} isn't cached and offline mode is on")
+
+        return body, meta, False
+
+    def __handle_response(self, key: str, response: httpx.Response, body: Optional[bytes], meta: Optional[CacheMeta]) -> bytes:
+        if response.status_code == 304 and body is not None:
+            self.touch(key, meta)  # type: ignore
+            return body
+
+        response.raise_for_status()
+        self.store(key, response.content, response)
+        return response.content
+
+    def get(self, client: httpx.Client, url: str, key: str) -> bytes:
+        body, meta, served = self.__lookup(key)
+        if served:
+            return body  # type: ignore
+
+        try:
+            response = client.get(url, headers=self.get_conditional_headers(meta))
+        except httpx.TransportError:
+            if body is not None:
+                return body  # stale beats nothing when the network is down
+            raise
+
+        return self.__handle_response(key, response, body, meta)
+
+    async def aget(self, client: httpx.AsyncClient, url: str, key: str) -> bytes:
+        body, meta, served = self.__lookup(key)
+        if served:
+            return body  # type: ignore
+
+        try:
+            response = await client.get(url, headers=self.get_conditional_headers(meta))
+        except httpx.TransportError:
+            if body is not None:
+                return body
+            raise
+
+        return self.__handle_response(key, response, body, meta)
@@ -0,0 +1,122 @@
+import os
+import json
+import tempfile
+import threading
+
+from typing import Callable, Iterable, Optional
+
+from hotfixes import CACHE_PATH
+from hotfixes.structures import DBStructures
+from hotfixes.utils import convert_table_hash
+
+LAYOUT_CACHE_FILE = os.path.join(CACHE_PATH, "layouts.json")
+
+STRUCT_DB2_HEADER = DBStructures.DB2[5].STRUCT_DB2_HEADER
+DB2_HEADER_SIZE = STRUCT_DB2_HEADER.sizeof()
+
+# takes a DB2 FDID and returns at least its header bytes, or None if it can't be opened
+HeaderReader = Callable[[int], Optional[bytes]]
+
+
+def parse_layout_hash(db2_data: bytes) -> str:
+    db2_header = STRUCT_DB2_HEADER.parse(memoryview(db2_data)[:DB2_HEADER_SIZE])
+    return convert_table_hash(db2_header.layout_hash)  # type: ignore
+
+
+class LayoutCache:
+    """DB2 layout hashes keyed by (product, build, FDID), persisted to `path` so each DB2 is only opened once per build.
+
+    DB2s that can't be read are only remembered for this process, so a failed CASC read is retried on the next run.
+    """
+
+    def __init__(
+        self,
+        product: str,
+        build: str,
+        read_header: HeaderReader,
+        path: Optional[str] = LAYOUT_CACHE_FILE,
+    ):
+        self.product = product
+        self.build = build
+        self.path = path
+
+        self.__read_header = read_header
+        self.__lock = threading.Lock()
+        self.__all_layouts = self.__load()
+        self.__layouts: dict[str, Optional[str]] = self.__all_layouts.setdefault(product, {}).setdefault(build, {})
+        self.__unreadable: set[int] = set()
+
+    def __load(self) -> dict[str, dict[str, dict[str, Optional[str]]]]:
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "r") as f:
+                layouts: dict[str, dict[str, dict[str, Optional[str]]]] = json.load(f)
+                return layouts
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        if self.path is None:
+            return
+
+        with self.__lock:
+            # other processes may have saved other builds, or other tables of this one, since we loaded the file
+            all_layouts = self.__load()
+            on_disk = all_layouts.setdefault(self.product, {}).setdefault(self.build, {})
+            for key, layout_hash in on_disk.items():
+                if layout_hash is not None:
+                    self.__layouts.setdefault(key, layout_hash)
+            all_layouts[self.product][self.build] = self.__layouts
+            self.__all_layouts = all_layouts
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, "w") as f:
+                json.dump(all_layouts, f)
+            os.replace(tmp_path, self.path)
+
+    def __read_layout(self, fdid: int) -> Optional[str]:
+        db2_data = self.__read_header(fdid)
+        if db2_data is None or len(db2_data) < DB2_HEADER_SIZE:
+            return None
+
+        return parse_layout_hash(db2_data)
+
+    def __find_missing(self, fdids: Iterable[int]) -> list[int]:
+        # must hold self.__lock. Older caches also stored failed reads as null, those are read again
+        return [
+            fdid
+            for fdid in set(fdids)
+            if fdid != 0 and fdid not in self.__unreadable and self.__layouts.get(str(fdid)) is None
+        ]
+
+    def get(self, fdid: int) -> Optional[str]:
+        self.prefetch([fdid])
+        with self.__lock:
+            return self.__layouts.get(str(fdid))
+
+    def prefetch(self, fdids: Iterable[int]):
+        """Fills the cache for every FDID in one pass, saving once at the end.
+
+        The lock is only held to find what's missing and to insert the results, never across a CASC read.
+        """
+        with self.__lock:
+            missing = self.__find_missing(fdids)
+
+        if not missing:
+            return
+
+        read = {fdid: self.__read_layout(fdid) for fdid in missing}
+
+        opened_any = False
+        with self.__lock:
+            for fdid, layout_hash in read.items():
+                if layout_hash is None:
+                    self.__unreadable.add(fdid)
+                else:
+                    self.__layouts[str(fdid)] = layout_hash
+                    opened_any = True
+
+        if opened_any:
+            self.save()
@@ -0,0 +1,63 @@
+import os
+import httpx
+
+from typing import Optional, Union
+
+from hotfixes.httpcache import DiskCache
+
+
+class LocalDefinitions:
+    """Serves a local WoWDBDefs checkout through the same `get`/`aget` interface as `DiskCache`.
+
+    Only the directory listing is taken at startup, a file is read the first time its key is asked for.
+    Keys missing from the checkout are handed to `fallback`, if there is one.
+    """
+
+    def __init__(self, dbdefs_path: str, fallback: Optional[DiskCache] = None):
+        self.path = dbdefs_path
+        self.fallback = fallback
+
+        self.files: dict[str, str] = {}
+        definitions_dir = os.path.join(dbdefs_path, "definitions")
+        with os.scandir(definitions_dir) as files:
+            for file in files:
+                if file.name.endswith(".dbd"):
+                    self.files[f"definitions/{file.name}"] = file.path
+
+        manifest_path = os.path.join(dbdefs_path, "manifest.json")
+        if os.path.exists(manifest_path):
+            self.files["manifest.json"] = manifest_path
+
+    def __contains__(self, key: str) -> bool:
+        return key.strip("/") in self.files
+
+    def load(self, key: str) -> Optional[bytes]:
+        file_path = self.files.get(key.strip("/"))
+        if file_path is None:
+            return None
+
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    def get(self, client: httpx.Client, url: str, key: str) -> bytes:
+        body = self.load(key)
+        if body is not None:
+            return body
+
+        if self.fallback is None:
+            raise FileNotFoundError(f"{key} isn't in {self.path}")
+
+        return self.fallback.get(client, url, key)
+
+    async def aget(self, client: httpx.AsyncClient, url: str, key: str) -> bytes:
+        body = self.load(key)
+        if body is not None:
+            return body
+
+        if self.fallback is None:
+            raise FileNotFoundError(f"{key} isn't in {self.path}")
+
+        return await self.fallback.aget(client, url, key)
+
+
+DefinitionsSource = Union[DiskCache, LocalDefinitions]
@@ -0,0 +1,96 @@
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+
+from types import MappingProxyType
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+from hotfixes import CACHE_PATH
+
+MANIFEST_INDEX_FILE = os.path.join(CACHE_PATH, "manifest-index.pickle")
+MANIFEST_INDEX_VERSION = 1
+
+# (table hash, table name, db2 fdid)
+ManifestRow = tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class ManifestIndex:
+    """Read-only lookups over the manifest, built once at load so any thread can use them without locking."""
+
+    hash_to_name: Mapping[str, str]  # upper-case hash -> name
+    name_to_hash: Mapping[str, str]  # lower-case name -> hash
+    name_to_fdid: Mapping[str, int]  # lower-case name -> fdid
+    fdid_to_name: Mapping[int, str]
+    rows: tuple[ManifestRow, ...]
+
+    def __reduce__(self):
+        # mapping proxies can't be pickled, the plain dicts behind them can
+        return (
+            ManifestIndex.from_maps,
+            (dict(self.hash_to_name), dict(self.name_to_hash), dict(self.name_to_fdid), dict(self.fdid_to_name), self.rows),
+        )
+
+    @classmethod
+    def from_maps(
+        cls,
+        hash_to_name: dict[str, str],
+        name_to_hash: dict[str, str],
+        name_to_fdid: dict[str, int],
+        fdid_to_name: dict[int, str],
+        rows: tuple[ManifestRow, ...],
+    ) -> "ManifestIndex":
+        return cls(
+            MappingProxyType(hash_to_name),
+            MappingProxyType(name_to_hash),
+            MappingProxyType(name_to_fdid),
+            MappingProxyType(fdid_to_name),
+            rows,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: tuple[ManifestRow, ...]) -> "ManifestIndex":
+        hash_to_name, name_to_hash, name_to_fdid, fdid_to_name = {}, {}, {}, {}
+        for tbl_hash, tbl_name, db2_fdid in rows:
+            lower_name = tbl_name.lower()
+            hash_to_name[tbl_hash.upper()] = tbl_name
+            name_to_hash[lower_name] = tbl_hash
+            if db2_fdid:
+                name_to_fdid[lower_name] = db2_fdid
+                fdid_to_name[db2_fdid] = tbl_name
+
+        return cls.from_maps(hash_to_name, name_to_hash, name_to_fdid, fdid_to_name, rows)
+
+    @classmethod
+    def from_manifest(cls, manifest: list[dict[str, Any]]) -> "ManifestIndex":
+        return cls.from_rows(
+            tuple((tbl["tableHash"], tbl["tableName"], tbl.get("db2FileDataID") or 0) for tbl in manifest)
+        )
+
+
+def load_manifest_index(raw_manifest: bytes, path: Optional[str] = MANIFEST_INDEX_FILE) -> ManifestIndex:
+    """Builds the index for a raw `manifest.json`, reusing the one saved at `path` if it was built from the same bytes."""
+    digest = hashlib.sha256(raw_manifest).digest()
+
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                version, saved_digest, rows = pickle.load(f)
+            if version == MANIFEST_INDEX_VERSION and saved_digest == digest:
+                return ManifestIndex.from_rows(rows)
+        except (OSError, ValueError, TypeError, EOFError, pickle.UnpicklingError):
+            pass
+
+    index = ManifestIndex.from_manifest(json.loads(raw_manifest))
+
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((MANIFEST_INDEX_VERSION, digest, index.rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    return index
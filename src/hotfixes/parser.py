@@ -1,16 +1,43 @@
 import os
+import sys
 import httpx
+import functools
 import concurrent.futures
 
 from enum import StrEnum
-from dataclasses import dataclass
-from typing import Optional, Any
+from array import array
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, Iterator, Optional, Any, Union
 
 from pycasclib.core import CascHandler, LocaleFlags
 
-from hotfixes.dbdefs import DBDefs, Manifest, Build, ColumnDataType
+from hotfixes.dbdefs import DBDefs, Manifest, Build, ColumnDataType, DB2_EXPORT_PATH, UNK_TBL
 from hotfixes.structures import RecordState
 from hotfixes.t_structs import DBCacheFile, DBCacheEntry
+from hotfixes.reader import (
+    DBCacheFilter,
+    DBCacheCheckpoint,
+    map_dbcache,
+    read_dbcache_header,
+    read_dbcache_mmap,
+    read_dbcache_since,
+    iter_dbcache_entries,
+)
+from hotfixes.decoder import (
+    RowDecoder,
+    DecodeBackend,
+    get_row_decoder,
+    try_decode,
+    create_executor,
+    decode_payloads,
+)
+from hotfixes.httpcache import DiskCache
+from hotfixes.sqlitesink import SQLiteSink, SQLITE_BATCH_SIZE
+from hotfixes.resolver import HotfixResolver
+from hotfixes.db2 import WDC5Reader, DB2Table, MergedTable, get_db2_columns
+from hotfixes.diff import HotfixChange, HotfixDiff, diff_dbcache, diff_fields
+from hotfixes.columnar import ColumnarTable, build_columnar_table
 from hotfixes.bytelist import ByteList
 from hotfixes.utils import (
     convert_table_hash,
@@ -29,6 +56,15 @@ class Flavor(StrEnum):
     XPTR = "_xptr_"
 
 
+# a single table name or several of them
+TableFilter = Union[str, Iterable[str]]
+
+# table name -> the columns to decode for that table, tables left out are decoded in full
+ColumnProjection = dict[str, Iterable[str]]
+
+# entries decoded at a time when building a ColumnarHotfixCollection
+COMPACT_BATCH_SIZE = 16384
+
 BRANCH_NAMES = {
     Flavor.Live: "wow",
     Flavor.Beta: "wow_beta",
@@ -37,7 +73,7 @@ BRANCH_NAMES = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Hotfix:
     PushID: int
     UniqueID: int
@@ -48,7 +84,60 @@ class Hotfix:
     Data: Optional[dict[str, Any]]
 
 
-@dataclass
+class LazyHotfix(Hotfix):
+    """A `Hotfix` that keeps its raw payload and only decodes `Data` the first time it's read.
+
+    The payload may be a view into the mapped DBCache, which stays mapped until every such hotfix is gone.
+    """
+
+    __slots__ = ("__payload", "__load_decoder", "__data")
+
+    def __init__(
+        self,
+        PushID: int,
+        UniqueID: int,
+        TableHash: str,
+        TableName: str,
+        Status: RecordState,
+        RecordID: int,
+        payload: Any,
+        load_decoder: Callable[[], Optional[RowDecoder]],
+    ):
+        self.PushID = PushID
+        self.UniqueID = UniqueID
+        self.TableHash = TableHash
+        self.TableName = TableName
+        self.Status = Status
+        self.RecordID = RecordID
+
+        self.__payload = payload
+        self.__load_decoder: Optional[Callable[[], Optional[RowDecoder]]] = load_decoder
+        self.__data: Optional[dict[str, Any]] = None
+
+    @property  # type: ignore[override]
+    def Data(self) -> Optional[dict[str, Any]]:
+        if self.__load_decoder is not None:
+            if len(self.__payload) > 0:
+                self.__data = try_decode(self.__load_decoder(), self.__payload)
+
+            # drop the payload so it doesn't pin the DBCache map once decoded
+            self.__payload = None
+            self.__load_decoder = None
+
+        return self.__data
+
+    @Data.setter
+    def Data(self, value: Optional[dict[str, Any]]):
+        self.__data = value
+        self.__payload = None
+        self.__load_decoder = None
+
+    @property
+    def is_decoded(self) -> bool:
+        return self.__load_decoder is None
+
+
+@dataclass(slots=True)
 class HotfixCollection:
     DBCacheVersion: int
     HeaderMagic: str
@@ -56,8 +145,187 @@ class HotfixCollection:
     BuildId: int
 
 
+@dataclass(slots=True)
+class TableColumns:
+    """The decoded data of one table in a `ColumnarHotfixCollection`, one list per column."""
+
+    TableHash: str
+    TableName: str
+    columns: dict[str, list[Any]]
+    row_count: int = 0
+
+    def append(self, data: dict[str, Any]) -> int:
+        for column, value in data.items():
+            values = self.columns.get(column)
+            if values is None:
+                # a column this table hasn't seen yet, earlier rows didn't have it
+                values = self.columns[column] = [None] * self.row_count
+            values.append(value)
+
+        self.row_count += 1
+        for values in self.columns.values():
+            if len(values) < self.row_count:
+                values.append(None)
+
+        return self.row_count - 1
+
+    def get_row(self, row: int) -> dict[str, Any]:
+        return {column: values[row] for column, values in self.columns.items()}
+
+
+class HotfixView:
+    """A read-only, `Hotfix`-shaped view of one row of a `ColumnarHotfixCollection`."""
+
+    __slots__ = ("__collection", "__index")
+
+    def __init__(self, collection: "ColumnarHotfixCollection", index: int):
+        self.__collection = collection
+        self.__index = index
+
+    @property
+    def PushID(self) -> int:
+        return self.__collection.push_ids[self.__index]
+
+    @property
+    def UniqueID(self) -> int:
+        return self.__collection.unique_ids[self.__index]
+
+    @property
+    def TableHash(self) -> str:
+        return self.__collection.tables[self.__collection.table_slots[self.__index]].TableHash
+
+    @property
+    def TableName(self) -> str:
+        return self.__collection.tables[self.__collection.table_slots[self.__index]].TableName
+
+    @property
+    def Status(self) -> RecordState:
+        return RecordState(self.__collection.statuses[self.__index])
+
+    @property
+    def RecordID(self) -> int:
+        return self.__collection.record_ids[self.__index]
+
+    @property
+    def Data(self) -> Optional[dict[str, Any]]:
+        row = self.__collection.data_rows[self.__index]
+        if row < 0:
+            return None
+
+        return self.__collection.tables[self.__collection.table_slots[self.__index]].get_row(row)
+
+    def to_hotfix(self) -> Hotfix:
+        return Hotfix(self.PushID, self.UniqueID, self.TableHash, self.TableName, self.Status, self.RecordID, self.Data)
+
+    def __repr__(self) -> str:
+        return repr(self.to_hotfix())
+
+
+class ColumnarHotfixCollection:
+    """A `HotfixCollection` stored as columns: entry headers in `array` buffers, decoded data grouped per table.
+
+    Iterating or indexing yields `HotfixView`s, which read like `Hotfix` objects.
+    """
+
+    def __init__(self, DBCacheVersion: int, HeaderMagic: str, BuildId: int):
+        self.DBCacheVersion = DBCacheVersion
+        self.HeaderMagic = HeaderMagic
+        self.BuildId = BuildId
+
+        self.push_ids = array("i")
+        self.unique_ids = array("I")
+        self.record_ids = array("I")
+        self.statuses = array("B")
+        self.table_slots = array("H")
+        self.data_rows = array("i")  # row in the table's columns, -1 without data
+
+        self.tables: list[TableColumns] = []
+        self.__table_slots: dict[str, int] = {}
+
+    def get_table(self, tbl_hash: str, tbl_name: str) -> int:
+        slot = self.__table_slots.get(tbl_hash)
+        if slot is None:
+            slot = self.__table_slots[tbl_hash] = len(self.tables)
+            self.tables.append(TableColumns(tbl_hash, tbl_name, {}))
+
+        return slot
+
+    def append(self, hotfix: Union[Hotfix, HotfixView]):
+        self.add(
+            hotfix.PushID,
+            hotfix.UniqueID,
+            hotfix.TableHash,
+            hotfix.TableName,
+            hotfix.Status,
+            hotfix.RecordID,
+            hotfix.Data,
+        )
+
+    def add(
+        self,
+        push_id: int,
+        unique_id: int,
+        tbl_hash: str,
+        tbl_name: str,
+        status: RecordState,
+        record_id: int,
+        data: Optional[dict[str, Any]],
+    ):
+        slot = self.get_table(tbl_hash, tbl_name)
+
+        self.push_ids.append(push_id)
+        self.unique_ids.append(unique_id)
+        self.record_ids.append(record_id)
+        self.statuses.append(status)
+        self.table_slots.append(slot)
+        self.data_rows.append(self.tables[slot].append(data) if data is not None else -1)
+
+    @classmethod
+    def from_hotfixes(cls, collection: HotfixCollection) -> "ColumnarHotfixCollection":
+        columnar = cls(collection.DBCacheVersion, collection.HeaderMagic, collection.BuildId)
+        for hotfix in collection.Hotfixes:
+            columnar.append(hotfix)
+
+        return columnar
+
+    def __len__(self) -> int:
+        return len(self.push_ids)
+
+    def __getitem__(self, index: int) -> HotfixView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("hotfix index out of range")
+
+        return HotfixView(self, index)
+
+    def __iter__(self) -> Iterator[HotfixView]:
+        for index in range(len(self)):
+            yield HotfixView(self, index)
+
+    @property
+    def Hotfixes(self) -> list[HotfixView]:
+        return list(self)
+
+
+def freeze_projection(columns: Optional[ColumnProjection]) -> Optional[ColumnProjection]:
+    # frozen once per call, so per-entry decoder lookups don't rebuild the column sets
+    if columns is None:
+        return None
+
+    return {tbl_name: frozenset(tbl_columns) for tbl_name, tbl_columns in columns.items()}
+
+
+def get_projected_columns(columns: Optional[ColumnProjection], tbl_name: str) -> Optional[Iterable[str]]:
+    if columns is None:
+        return None
+
+    return columns.get(tbl_name)
+
+
 class HotfixParser:
     current_version: Build
+    __owns_casc: bool = False
 
     def __init__(
         self,
@@ -67,14 +335,21 @@ class HotfixParser:
         http_client: Optional[httpx.Client] = None,
         dbdefs_path: Optional[str] = None,
         max_threads: Optional[int] = None,
+        use_mmap: bool = False,
+        backend: DecodeBackend = DecodeBackend.Threads,
+        offline: bool = False,
+        casc_handle: Optional[CascHandler] = None,
+        use_schema_store: bool = False,
     ):
         self.game_path = game_path
         self.flavor = flavor
 
-        self.casc = CascHandler(game_path, LocaleFlags.CASC_LOCALE_ENUS, product=BRANCH_NAMES[self.flavor])  # type: ignore
-
-        self.dbdefs = DBDefs(http_client, dbdefs_path, self.casc)
-        self.manifest = Manifest(http_client, dbdefs_path)
+        # an injected handle belongs to the caller, only one we opened ourselves is closed with the parser
+        self.__owns_casc = casc_handle is None
+        if casc_handle is not None:
+            self.casc = casc_handle
+        else:
+            self.casc = CascHandler(game_path, LocaleFlags.CASC_LOCALE_ENUS, product=BRANCH_NAMES[self.flavor])  # type: ignore
 
         self.dbcache_path = os.path.join(
             game_path, flavor, "Cache", "ADB", "enUS", "DBCache.bin"
@@ -85,17 +360,79 @@ class HotfixParser:
 
         self.cache_game_versions()
 
+        # definitions and the manifest are kept on disk and only revalidated once they're stale
+        self.http_cache = DiskCache(offline=offline)
+
+        self.dbdefs = DBDefs(
+            http_client,
+            dbdefs_path,
+            self.casc,
+            BRANCH_NAMES[self.flavor],
+            self.current_version,
+            self.http_cache,
+            use_schema_store,
+        )
+        self.manifest = Manifest(http_client, dbdefs_path, self.http_cache, self.dbdefs.schema_store)
+
         self.max_threads = max_threads or os.cpu_count()
+        self.use_mmap = use_mmap
+        self.backend = backend
+        self.checkpoint: Optional[DBCacheCheckpoint] = None
+        self.__tables: dict[int, tuple[str, str]] = {}
 
     def __del__(self):
-        self.casc.close()
+        if self.__owns_casc:
+            self.casc.close()
+
+    def read_dbcache(self, entry_filter: Optional[DBCacheFilter] = None) -> DBCacheFile:
+        if self.use_mmap:
+            return read_dbcache_mmap(self.dbcache_path, entry_filter)
 
-    def read_dbcache(self) -> DBCacheFile:
         with open(self.dbcache_path, "rb") as f:
             dbcache = self.struct_dbcache_file.parse(f.read())
 
+        if entry_filter is not None:
+            dbcache.entries = [entry for entry in dbcache.entries if entry_filter.matches_entry(entry)]
+
         return dbcache  # type: ignore
 
+    def build_entry_filter(
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+    ) -> DBCacheFilter:
+        """Folds the table name filter and `show_cached_entries` into a `DBCacheFilter` the reader can apply to entry headers.
+
+        UNK_TBL in the filter selects the entries of every table that isn't in the manifest.
+        """
+        entry_filter = replace(entry_filter) if entry_filter is not None else DBCacheFilter()
+        entry_filter.skip_cached = not show_cached_entries
+
+        if filter:
+            tbl_names = [filter] if isinstance(filter, str) else filter
+            tbl_hashes = set()
+            unknown_tables = False
+            for tbl_name in tbl_names:
+                if tbl_name == UNK_TBL:
+                    unknown_tables = True
+                    continue
+
+                tbl_hash = self.manifest.get_table_hash_from_name(tbl_name)
+                if tbl_hash is not None:
+                    tbl_hashes.add(int(tbl_hash, 16))
+
+            known_tbl_hashes = {int(tbl_hash, 16) for tbl_hash in self.manifest.index.hash_to_name} if unknown_tables else None
+            if entry_filter.table_hashes is not None:
+                if known_tbl_hashes is not None:
+                    tbl_hashes |= entry_filter.table_hashes - known_tbl_hashes
+                    known_tbl_hashes = None
+                tbl_hashes &= entry_filter.table_hashes
+            entry_filter.table_hashes = tbl_hashes
+            entry_filter.known_table_hashes = known_tbl_hashes
+
+        return entry_filter
+
     def convert_chunk(self, data: list[int], type: ColumnDataType, is_unsigned: bool):
         match type:
             case (
@@ -103,6 +440,7 @@ class HotfixParser:
                 | ColumnDataType.U8
                 | ColumnDataType.U16
                 | ColumnDataType.U32
+                | ColumnDataType.U64
             ):
                 return bytes_to_int(data, is_unsigned)
             case ColumnDataType.Float:
@@ -116,113 +454,396 @@ class HotfixParser:
         data = bytes_to_hex([hex_data])
         return f"0x{data}"
 
+    def get_decoder(
+        self, table_hash: str, table_name: str, columns: Optional[Iterable[str]] = None
+    ) -> Optional[RowDecoder]:
+        tbl_layout_hash = self.dbdefs.get_layout_for_table(table_name)
+        if not tbl_layout_hash:
+            return None
+
+        try:
+            return get_row_decoder(
+                table_hash,
+                tbl_layout_hash,
+                lambda: self.dbdefs.get_parsed_definitions_by_hash(table_hash),
+                columns,
+            )
+        except (httpx.HTTPError, FileNotFoundError):
+            # no definitions upstream for this table, or they can't be fetched and aren't cached
+            return None
+
     def parse_hotfix_data(
-        self, table_hash: str, table_name: str, hotfix_data: ByteList
+        self,
+        table_hash: str,
+        table_name: str,
+        hotfix_data: Union[ByteList, memoryview],
+        columns: Optional[Iterable[str]] = None,
     ) -> Optional[dict[str, Any]]:
         if len(hotfix_data) == 0:
             return None
 
-        defs = self.dbdefs.get_parsed_definitions_by_hash(table_hash)
-        tbl_layout_hash = self.dbdefs.get_layout_for_table(table_name)
-        if not tbl_layout_hash:
-            return None
+        return try_decode(self.get_decoder(table_hash, table_name, columns), hotfix_data)
 
-        def_entries = defs.get_definitions_for_layout(tbl_layout_hash)
+    def resolve_table(self, entry: DBCacheEntry) -> tuple[str, str]:
+        # every hotfix of a table shares one interned hash and name string
+        table = self.__tables.get(entry.table_hash)
+        if table is None:
+            tbl_hash = sys.intern(convert_table_hash(entry.table_hash))
+            table = (tbl_hash, sys.intern(self.manifest.get_table_name_from_hash(tbl_hash)))
+            self.__tables[entry.table_hash] = table
 
-        data = list(hotfix_data)
-        parsed_data = {}
-        for def_entry in def_entries:
-            chunk_name = def_entry.column
-            if "noninline" in def_entry.annotation:
-                continue
+        return table
 
-            chunk_width = int(def_entry.int_width / 8)
+    def new_hotfix(
+        self,
+        entry: DBCacheEntry,
+        tbl_hash: str,
+        tbl_name: str,
+        hotfix_data: Optional[dict[str, Any]],
+    ) -> Hotfix:
+        return Hotfix(
+            entry.push_id,
+            entry.unique_id,
+            tbl_hash,
+            tbl_name,
+            self.get_status(entry),
+            entry.record_id,
+            hotfix_data,
+        )
 
-            column = defs.get_column_from_def_entry(def_entry)
-            if column is None:
-                continue
+    def new_lazy_hotfix(
+        self,
+        entry: DBCacheEntry,
+        tbl_hash: str,
+        tbl_name: str,
+        load_decoder: Callable[[], Optional[RowDecoder]],
+    ) -> LazyHotfix:
+        return LazyHotfix(
+            entry.push_id,
+            entry.unique_id,
+            tbl_hash,
+            tbl_name,
+            self.get_status(entry),
+            entry.record_id,
+            entry.data,
+            load_decoder,
+        )
 
-            chunk_type = column.type
-            if (
-                chunk_type == ColumnDataType.String
-                or chunk_type == ColumnDataType.Locstring
-            ):
-                try:
-                    null_index = data.index(0)
-                    chunk_width = null_index + 1  # add one to hold the null character
-                except ValueError:
-                    pass
-
-            if def_entry.array_size == 0:
-                chunk_data = data[:chunk_width]
-                chunk = self.convert_chunk(
-                    chunk_data, chunk_type, def_entry.is_unsigned
-                )
-                data = data[chunk_width:]
-            else:
-                chunk = []
-                for _ in range(def_entry.array_size):
-                    chunk_data = data[:chunk_width]
-                    value = self.convert_chunk(
-                        chunk_data, chunk_type, def_entry.is_unsigned
-                    )
-                    chunk.append(value)  # type: ignore
-                    data = data[chunk_width:]
+    def get_status(self, entry: DBCacheEntry) -> RecordState:
+        if isinstance(entry.status, RecordState):
+            return entry.status
 
-            if isinstance(chunk, str):
-                chunk = chunk[:-1]
+        return RecordState[entry.status]
 
-            parsed_data[chunk_name] = chunk
+    def get_decoder_loader(
+        self, tbl_hash: str, tbl_name: str, columns: Optional[ColumnProjection] = None
+    ) -> Callable[[], Optional[RowDecoder]]:
+        return functools.partial(self.get_decoder, tbl_hash, tbl_name, get_projected_columns(columns, tbl_name))
 
-        return parsed_data
+    def build_hotfix(self, entry: DBCacheEntry, columns: Optional[ColumnProjection] = None) -> Hotfix:
+        tbl_hash, tbl_name = self.resolve_table(entry)
+        hotfix_data = self.parse_hotfix_data(tbl_hash, tbl_name, entry.data, get_projected_columns(columns, tbl_name))
+        return self.new_hotfix(entry, tbl_hash, tbl_name, hotfix_data)
 
     def get_hotfixes(
-        self, filter: Optional[str] = None, show_cached_entries: Optional[bool] = False
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+        lazy: bool = False,
+        columns: Optional[ColumnProjection] = None,
     ) -> HotfixCollection:
-        dbcache = self.read_dbcache()
+        """Reads and decodes DBCache.bin.
+
+        `filter` takes a table name or several, `entry_filter` narrows by push ID, record ID or status.
+        In mmap mode both are applied to the entry headers, so rejected payloads are never read.
+        With `lazy`, nothing is decoded up front and each hotfix decodes its `Data` when it's first read.
+        `columns` maps table names to the only columns to decode for them, e.g. `{"ItemSparse": ["Display_lang"]}`.
+        """
+        entry_filter = self.build_entry_filter(filter, show_cached_entries, entry_filter)
+        return self.collect_hotfixes(self.read_dbcache(entry_filter), lazy, columns)
+
+    def poll_hotfixes(
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        checkpoint_path: Optional[str] = None,
+        entry_filter: Optional[DBCacheFilter] = None,
+        lazy: bool = False,
+        columns: Optional[ColumnProjection] = None,
+    ) -> HotfixCollection:
+        """Returns only the hotfixes appended to DBCache.bin since the last poll.
+
+        The first poll, and any poll after the client rewrote or truncated the file, returns everything.
+        So does a poll with a different filter than the last one, since the checkpoint only covers the entries that
+        filter matched. With `checkpoint_path`, the checkpoint is persisted so polling can pick up where a previous process stopped.
+        """
+        if self.checkpoint is None and checkpoint_path is not None:
+            self.checkpoint = DBCacheCheckpoint.load(checkpoint_path)
+
+        entry_filter = self.build_entry_filter(filter, show_cached_entries, entry_filter)
+        dbcache, checkpoint, _ = read_dbcache_since(self.dbcache_path, self.checkpoint, entry_filter)
+        hotfixes = self.collect_hotfixes(dbcache, lazy, columns)
+
+        self.checkpoint = checkpoint
+        if checkpoint_path is not None:
+            checkpoint.save(checkpoint_path)
+
+        return hotfixes
+
+    def collect_hotfixes(
+        self, dbcache: DBCacheFile, lazy: bool = False, columns: Optional[ColumnProjection] = None
+    ) -> HotfixCollection:
+        columns = freeze_projection(columns)
         header_magic = dec_to_ascii(dbcache.header.magic)
         dbcache_version = dbcache.header.version
         build_id = dbcache.header.build_id
 
-        all_hotfixes = []
+        selected = [(entry, *self.resolve_table(entry)) for entry in dbcache.entries]
 
-        def handle_hotfix(entry: DBCacheEntry):
-            if entry.push_id == -1 and not show_cached_entries:
-                return
+        if lazy:
+            # one loader per table, the layout and definitions are only looked up once something reads Data
+            loaders: dict[str, Callable[[], Optional[RowDecoder]]] = {}
+            lazy_hotfixes: list[Hotfix] = []
+            for entry, tbl_hash, tbl_name in selected:
+                if tbl_hash not in loaders:
+                    loaders[tbl_hash] = self.get_decoder_loader(tbl_hash, tbl_name, columns)
+                lazy_hotfixes.append(self.new_lazy_hotfix(entry, tbl_hash, tbl_name, loaders[tbl_hash]))
 
-            tbl_hash = convert_table_hash(entry.table_hash)
-            tbl_name = self.manifest.get_table_name_from_hash(tbl_hash)
+            return HotfixCollection(dbcache_version, header_magic, lazy_hotfixes, build_id)
 
-            if filter and tbl_name != filter:
-                return
+        return HotfixCollection(dbcache_version, header_magic, self.decode_selected(selected, columns), build_id)
 
-            hotfix_data = self.parse_hotfix_data(tbl_hash, tbl_name, entry.data)
-            if entry.status == RecordState.Valid:
-                print(hotfix_data)
+    def decode_selected(
+        self, selected: list[tuple[DBCacheEntry, str, str]], columns: Optional[ColumnProjection] = None
+    ) -> list[Hotfix]:
+        decoders = self.resolve_decoders(selected, columns)
+        jobs = [(decoders.get(tbl_hash), entry.data) for entry, tbl_hash, _ in selected]
 
-            hotfix = Hotfix(
-                entry.push_id,
-                entry.unique_id,
-                tbl_hash,
-                tbl_name,
-                RecordState[entry.status],  # type: ignore
-                entry.record_id,
-                hotfix_data,
-            )
-            all_hotfixes.append(hotfix)
+        all_data = decode_payloads(jobs, self.backend, self.max_threads)
+        return [
+            self.new_hotfix(entry, tbl_hash, tbl_name, hotfix_data)
+            for (entry, tbl_hash, tbl_name), hotfix_data in zip(selected, all_data)
+        ]
+
+    def resolve_decoders(
+        self, selected: list[tuple[DBCacheEntry, str, str]], columns: Optional[ColumnProjection] = None
+    ) -> dict[str, Optional[RowDecoder]]:
+        """Resolves every table's schema up front, so decode workers only see (decoder, payload) pairs."""
+        self.dbdefs.prefetch_layouts({tbl_name for _, _, tbl_name in selected})
+        self.dbdefs.prefetch_definitions({tbl_name for entry, _, tbl_name in selected if len(entry.data) > 0})
+
+        decoders: dict[str, Optional[RowDecoder]] = {}
+        for entry, tbl_hash, tbl_name in selected:
+            if len(entry.data) > 0 and tbl_hash not in decoders:
+                decoders[tbl_hash] = self.get_decoder(tbl_hash, tbl_name, get_projected_columns(columns, tbl_name))
+
+        return decoders
+
+    def get_compact_hotfixes(
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+        columns: Optional[ColumnProjection] = None,
+    ) -> ColumnarHotfixCollection:
+        """Like `get_hotfixes`, but decodes in batches straight into a `ColumnarHotfixCollection`.
+
+        No per-entry `Hotfix` objects are kept, which keeps memory down on large caches.
+        """
+        entry_filter = self.build_entry_filter(filter, show_cached_entries, entry_filter)
+        dbcache = self.read_dbcache(entry_filter)
+        columns = freeze_projection(columns)
+
+        collection = ColumnarHotfixCollection(
+            dbcache.header.version, dec_to_ascii(dbcache.header.magic), dbcache.header.build_id
+        )
 
-        max_threads = self.max_threads
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = [
-                executor.submit(handle_hotfix, entry) for entry in dbcache.entries
-            ]
+        selected = [(entry, *self.resolve_table(entry)) for entry in dbcache.entries]
+        decoders = self.resolve_decoders(selected, columns)
+
+        # one pool for every batch, starting worker processes per batch would cost more than decoding them
+        executor = create_executor(self.backend, self.max_threads)
+        try:
+            for start in range(0, len(selected), COMPACT_BATCH_SIZE):
+                batch = selected[start : start + COMPACT_BATCH_SIZE]
+                jobs = [(decoders.get(tbl_hash), entry.data) for entry, tbl_hash, _ in batch]
+                all_data = decode_payloads(jobs, self.backend, self.max_threads, executor)
+                for (entry, tbl_hash, tbl_name), hotfix_data in zip(batch, all_data):
+                    collection.add(
+                        entry.push_id,
+                        entry.unique_id,
+                        tbl_hash,
+                        tbl_name,
+                        self.get_status(entry),
+                        entry.record_id,
+                        hotfix_data,
+                    )
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-        results = concurrent.futures.wait(futures)
-        for result in results:
-            if isinstance(result, Exception):
-                print(str(result))
+        return collection
 
-        return HotfixCollection(dbcache_version, header_magic, all_hotfixes, build_id)
+    def get_columnar_hotfixes(
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+    ) -> dict[str, ColumnarTable]:
+        """Decodes hotfixes into one `ColumnarTable` per table name, vectorized with numpy where the layout allows."""
+        entry_filter = self.build_entry_filter(filter, show_cached_entries, entry_filter)
+        dbcache = self.read_dbcache(entry_filter)
+
+        tables: dict[str, tuple[str, list[DBCacheEntry]]] = {}
+        for entry in dbcache.entries:
+            tbl_hash, tbl_name = self.resolve_table(entry)
+            tables.setdefault(tbl_hash, (tbl_name, []))[1].append(entry)
+
+        tbl_names = {tbl_name for tbl_name, _ in tables.values()}
+        self.dbdefs.prefetch_layouts(tbl_names)
+        self.dbdefs.prefetch_definitions(tbl_names)
+
+        columnar_tables = {}
+        for tbl_hash, (tbl_name, entries) in tables.items():
+            decoder = self.get_decoder(tbl_hash, tbl_name)
+            if decoder is not None:
+                columnar_tables[tbl_name] = build_columnar_table(tbl_hash, tbl_name, decoder, entries)
+
+        return columnar_tables
+
+    def iter_hotfixes(
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        window: int = 0,
+        entry_filter: Optional[DBCacheFilter] = None,
+        lazy: bool = False,
+        columns: Optional[ColumnProjection] = None,
+    ) -> Iterator[Hotfix]:
+        """Yields hotfixes in file order as they're read, without holding the whole DBCache in memory.
+
+        With `window` > 0, up to that many entries are decoded ahead on a thread pool.
+        With `lazy`, hotfixes are yielded undecoded and `window` is ignored.
+        """
+        entry_filter = self.build_entry_filter(filter, show_cached_entries, entry_filter)
+        columns = freeze_projection(columns)
+
+        buffer = map_dbcache(self.dbcache_path)
+        read_dbcache_header(buffer)
+        entries = iter_dbcache_entries(buffer, release_consumed=True, entry_filter=entry_filter)
+
+        if lazy:
+            loaders: dict[str, Callable[[], Optional[RowDecoder]]] = {}
+            for entry in entries:
+                tbl_hash, tbl_name = self.resolve_table(entry)
+                if tbl_hash not in loaders:
+                    loaders[tbl_hash] = self.get_decoder_loader(tbl_hash, tbl_name, columns)
+                yield self.new_lazy_hotfix(entry, tbl_hash, tbl_name, loaders[tbl_hash])
+            return
+
+        if window <= 0:
+            for entry in entries:
+                yield self.build_hotfix(entry, columns)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+            pending: deque[concurrent.futures.Future[Hotfix]] = deque()
+            for entry in entries:
+                pending.append(executor.submit(self.build_hotfix, entry, columns))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def resolve_hotfixes(
+        self,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+    ) -> HotfixResolver:
+        """Resolves the hotfix in effect for every record, see `HotfixResolver`.
+
+        The hotfixes are lazy, so only the data of winners that are actually read gets decoded.
+        Feed later `poll_hotfixes` results to `HotfixResolver.update` to keep it current.
+        """
+        return HotfixResolver(self.iter_hotfixes(filter, show_cached_entries, entry_filter=entry_filter, lazy=True))
+
+    def open_db2(self, tbl_name: str, db2_path: Optional[str] = None) -> Optional[WDC5Reader]:
+        """Maps the table's DB2 from `db2_path` or an export in DB2_EXPORT_PATH, or reads it from CASC when there's neither.
+
+        None if the table has no DB2 to be found.
+        """
+        paths = [db2_path] if db2_path else [os.path.join(DB2_EXPORT_PATH, f"{name}.db2") for name in (tbl_name, tbl_name.lower())]
+        for path in paths:
+            if os.path.isfile(path):
+                return WDC5Reader.open(path)
+
+        db2_fdid = self.manifest.get_fdid_from_table_name(tbl_name)
+        data = self.dbdefs.read_db2(db2_fdid) if db2_fdid else None
+        return WDC5Reader(data) if data else None
+
+    def get_merged_table(
+        self, tbl_name: str, resolver: Optional[HotfixResolver] = None, db2_path: Optional[str] = None
+    ) -> MergedTable:
+        """The table's DB2 with the hotfixes in effect applied, see `MergedTable`.
+
+        The DB2 is decoded with the layout its header names. Pass a `resolver` to reuse one, otherwise this resolves the
+        table's hotfixes from the DBCache.
+        """
+        if resolver is None:
+            resolver = self.resolve_hotfixes(tbl_name)
+
+        base = None
+        reader = self.open_db2(tbl_name, db2_path)
+        if reader is not None:
+            dbd = self.dbdefs.get_parsed_definitions(tbl_name)
+            base = DB2Table(reader, get_db2_columns(dbd, reader.layout_hash))
+
+        return MergedTable(base, resolver, tbl_name)
+
+    def diff_hotfixes(
+        self,
+        old_path: str,
+        new_path: Optional[str] = None,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+    ) -> HotfixDiff:
+        """Diffs an older DBCache.bin against `new_path`, or this install's DBCache.bin.
+
+        Entries are matched by (table hash, record ID, push ID, unique ID) and compared by a hash of their raw payload,
+        so only the added, removed and changed ones are decoded. Both sides are decoded with the current layouts.
+        """
+        entry_filter = self.build_entry_filter(filter, show_cached_entries, entry_filter)
+        diff = diff_dbcache(old_path, new_path or self.dbcache_path, entry_filter)
+
+        def decode(snapshot, keys):
+            entries = [snapshot.get_entry(key) for key in keys]
+            return self.decode_selected([(entry, *self.resolve_table(entry)) for entry in entries])
+
+        old_changed = decode(diff.old, diff.changed)
+        new_changed = decode(diff.new, diff.changed)
+        changed = [HotfixChange(old, new, diff_fields(old.Data, new.Data)) for old, new in zip(old_changed, new_changed)]
+
+        return HotfixDiff(decode(diff.new, diff.added), decode(diff.old, diff.removed), changed, diff.unchanged)
+
+    def export_sqlite(
+        self,
+        path: str,
+        filter: Optional[TableFilter] = None,
+        show_cached_entries: Optional[bool] = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+        batch_size: int = SQLITE_BATCH_SIZE,
+    ) -> int:
+        """Streams hotfixes into the SQLite database at `path`, see `SQLiteSink`. Returns how many new entries were written.
+
+        Entries already in the database are skipped by unique ID without being decoded.
+        """
+        hotfixes = self.iter_hotfixes(filter, show_cached_entries, entry_filter=entry_filter, lazy=True)
+        with SQLiteSink(path, batch_size) as sink:
+            return sink.write(hotfixes, self.get_decoder)
 
     def read_build_info(self):
         with open(self.buildinfo_path, "r") as f:
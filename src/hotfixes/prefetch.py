@@ -0,0 +1,80 @@
+import asyncio
+import httpx
+
+from typing import Iterable, Optional
+
+from hotfixes.localdefs import DefinitionsSource
+
+DEFAULT_CONCURRENCY = 16
+
+
+class DefinitionsPrefetcher:
+    """Fetches `.dbd` files concurrently over one pooled client. Concurrent requests for the same table share one fetch."""
+
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        http_cache: Optional[DefinitionsSource] = None,
+    ):
+        if client is not None:
+            self.__client = client
+        else:
+            limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+            self.__client = httpx.AsyncClient(http2=True, limits=limits)
+
+        self.__client.base_url = httpx.URL(base_url)
+        self.__semaphore = asyncio.Semaphore(concurrency)
+        self.__inflight: dict[str, asyncio.Task[str]] = {}
+        self.__http_cache = http_cache
+
+    async def __aenter__(self) -> "DefinitionsPrefetcher":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.__client.aclose()
+
+    async def __fetch(self, tbl_name: str) -> str:
+        url = f"/definitions/{tbl_name}.dbd"
+        async with self.__semaphore:
+            if self.__http_cache is not None:
+                body = await self.__http_cache.aget(self.__client, url, url)
+                return body.decode("utf8")
+
+            response = await self.__client.get(url)
+            response.raise_for_status()
+            return response.text
+
+    async def fetch(self, tbl_name: str) -> str:
+        task = self.__inflight.get(tbl_name)
+        if task is None:
+            task = asyncio.ensure_future(self.__fetch(tbl_name))
+            self.__inflight[tbl_name] = task
+            task.add_done_callback(lambda _: self.__inflight.pop(tbl_name, None))
+
+        return await asyncio.shield(task)
+
+    async def fetch_all(self, tbl_names: Iterable[str]) -> dict[str, str]:
+        """Fetches every table at once, leaving out the ones that failed so the caller can retry them on its own."""
+        tbl_names = list(dict.fromkeys(tbl_names))
+        results = await asyncio.gather(*[self.fetch(tbl_name) for tbl_name in tbl_names], return_exceptions=True)
+
+        return {
+            tbl_name: definitions
+            for tbl_name, definitions in zip(tbl_names, results)
+            if isinstance(definitions, str)
+        }
+
+
+async def prefetch_definitions(
+    base_url: str,
+    tbl_names: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    http_cache: Optional[DefinitionsSource] = None,
+) -> dict[str, str]:
+    async with DefinitionsPrefetcher(base_url, concurrency=concurrency, http_cache=http_cache) as prefetcher:
+        return await prefetcher.fetch_all(tbl_names)
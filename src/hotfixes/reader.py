@@ -0,0 +1,283 @@
+import os
+import json
+import mmap
+import struct
+
+from dataclasses import dataclass, asdict
+from typing import Iterator, Optional, Union
+
+from hotfixes.structures import RecordState
+from hotfixes.t_structs import DBCacheFile, DBCacheHeader, DBCacheEntry
+
+# these mirror DBCACHE_V9 in structures.py, but are decoded with struct instead of construct
+DBCACHE_HEADER = struct.Struct("<III32s")
+DBCACHE_ENTRY_HEADER = struct.Struct("<IiiIIIIB3s")
+
+# when streaming, pages behind the cursor are handed back to the OS every this many bytes
+RELEASE_INTERVAL = 16 * 1024 * 1024
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def map_dbcache(path: str) -> Buffer:
+    """Maps `path` read-only. Empty files can't be mapped, so they come back as empty `bytes`."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+
+        # the map keeps its own handle to the file, so it outlives this `with` block
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_dbcache_header(buffer: Buffer) -> DBCacheHeader:
+    if len(buffer) < DBCACHE_HEADER.size:
+        raise ValueError(f"DBCache is too small to hold a header ({len(buffer)} bytes)")
+
+    magic, version, build_id, verification_hash = DBCACHE_HEADER.unpack_from(buffer, 0)
+    return DBCacheHeader(magic, version, build_id, list(verification_hash))
+
+
+def convert_status(status: int) -> Union[RecordState, int]:
+    try:
+        return RecordState(status)
+    except ValueError:
+        return status
+
+
+def release_pages(buffer: Buffer, start: int, end: int) -> int:
+    """Drops the resident pages of a read-only map between `start` and `end`, returning where the next release should start.
+
+    The pages are file-backed, so anything still holding a view into them just faults them back in.
+    """
+    end -= end % mmap.PAGESIZE
+    if end <= start:
+        return start
+
+    if isinstance(buffer, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+        buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    return end
+
+
+@dataclass
+class DBCacheFilter:
+    """Entry header conditions checked before a payload is touched. Anything left as None matches everything."""
+
+    table_hashes: Optional[set[int]] = None
+    push_ids: Optional[list[tuple[int, int]]] = None  # inclusive (lowest, highest) ranges
+    record_ids: Optional[set[int]] = None
+    statuses: Optional[set[RecordState]] = None
+    skip_cached: bool = False  # entries with a push_id of -1
+    # with table_hashes, entries of any table outside these also match, i.e. the tables that can't be named
+    known_table_hashes: Optional[set[int]] = None
+
+    def matches(self, table_hash: int, push_id: int, record_id: int, status: int) -> bool:
+        if self.skip_cached and push_id == -1:
+            return False
+        if self.table_hashes is not None and table_hash not in self.table_hashes:
+            if self.known_table_hashes is None or table_hash in self.known_table_hashes:
+                return False
+        if self.record_ids is not None and record_id not in self.record_ids:
+            return False
+        if self.statuses is not None and status not in self.statuses:
+            return False
+        if self.push_ids is not None and not any(lowest <= push_id <= highest for lowest, highest in self.push_ids):
+            return False
+
+        return True
+
+    def matches_entry(self, entry: DBCacheEntry) -> bool:
+        status = entry.status if isinstance(entry.status, int) else RecordState[entry.status]
+        return self.matches(entry.table_hash, entry.push_id, entry.record_id, status)
+
+    def key(self) -> str:
+        """The same string for any two filters that match the same entries, to tell whether a checkpoint was read with this filter."""
+        return json.dumps(
+            [
+                sorted(self.table_hashes) if self.table_hashes is not None else None,
+                sorted(self.push_ids) if self.push_ids is not None else None,
+                sorted(self.record_ids) if self.record_ids is not None else None,
+                sorted(int(status) for status in self.statuses) if self.statuses is not None else None,
+                self.skip_cached,
+                sorted(self.known_table_hashes) if self.known_table_hashes is not None else None,
+            ]
+        )
+
+
+class DBCacheEntryIterator(Iterator[DBCacheEntry]):
+    """Walks the entry headers of a DBCache, yielding each entry with its payload as a `memoryview` into the buffer.
+
+    Like the construct `GreedyRange`, this stops quietly at the first entry that's cut short.
+    Entries rejected by `entry_filter` are skipped using their `data_size`, without slicing their payload.
+    With `release_consumed`, pages already walked past are released so resident memory stays bounded.
+    `offset` always points at the next unread entry, which is where a later read should resume, and
+    `last_entry_offset` at the last entry walked past, filtered out or not.
+    """
+
+    def __init__(
+        self,
+        buffer: Buffer,
+        offset: int = DBCACHE_HEADER.size,
+        release_consumed: bool = False,
+        entry_filter: Optional[DBCacheFilter] = None,
+    ):
+        self.offset = offset
+        self.last_entry_offset: Optional[int] = None
+
+        self.__buffer = buffer
+        self.__view = memoryview(buffer)
+        self.__release_consumed = release_consumed
+        self.__released = 0
+        self.__filter = entry_filter
+
+    def __iter__(self) -> "DBCacheEntryIterator":
+        return self
+
+    def __next__(self) -> DBCacheEntry:
+        view = self.__view
+        buffer_size = len(view)
+        header_size = DBCACHE_ENTRY_HEADER.size
+        unpack_header = DBCACHE_ENTRY_HEADER.unpack_from
+        entry_filter = self.__filter
+        offset = self.offset
+        last_entry_offset = self.last_entry_offset
+
+        while offset + header_size <= buffer_size:
+            if self.__release_consumed and offset - self.__released >= RELEASE_INTERVAL:
+                self.__released = release_pages(self.__buffer, self.__released, offset)
+
+            magic, region_id, push_id, unique_id, table_hash, record_id, data_size, status, padding = unpack_header(view, offset)
+
+            data_start = offset + header_size
+            data_end = data_start + data_size
+            if data_end > buffer_size:
+                break
+
+            last_entry_offset = offset
+            offset = data_end
+            if entry_filter is not None and not entry_filter.matches(table_hash, push_id, record_id, status):
+                continue
+
+            self.offset = offset
+            self.last_entry_offset = last_entry_offset
+            return DBCacheEntry(
+                magic,
+                region_id,  # type: ignore
+                push_id,
+                unique_id,
+                table_hash,
+                record_id,
+                data_size,
+                convert_status(status),  # type: ignore
+                list(padding),
+                view[data_start:data_end],
+            )
+
+        self.offset = offset
+        self.last_entry_offset = last_entry_offset
+        raise StopIteration
+
+
+def iter_dbcache_entries(
+    buffer: Buffer,
+    offset: int = DBCACHE_HEADER.size,
+    release_consumed: bool = False,
+    entry_filter: Optional[DBCacheFilter] = None,
+) -> DBCacheEntryIterator:
+    return DBCacheEntryIterator(buffer, offset, release_consumed, entry_filter)
+
+
+def read_dbcache_mmap(path: str, entry_filter: Optional[DBCacheFilter] = None) -> DBCacheFile:
+    """Reads `path` into the same shape as `DBCACHE_V9.STRUCT_DBCACHE_FILE`, without copying any payload bytes."""
+    buffer = map_dbcache(path)
+    header = read_dbcache_header(buffer)
+    entries = list(iter_dbcache_entries(buffer, entry_filter=entry_filter))
+
+    return DBCacheFile(header, entries)
+
+
+@dataclass
+class DBCacheCheckpoint:
+    """Where an incremental read of a DBCache stopped, and which version of the file it was reading.
+
+    `last_entry` is the hex of the header of the entry right before `offset`, which has to still be there to resume,
+    and `filter_key` is the `DBCacheFilter.key` of the filter the read used, None without one.
+    """
+
+    offset: int
+    build_id: int
+    verification_hash: list[int]
+    last_entry: Optional[str] = None
+    filter_key: Optional[str] = None
+
+    def matches(self, header: DBCacheHeader) -> bool:
+        return self.build_id == header.build_id and self.verification_hash == header.verification_hash
+
+    def can_resume(self, buffer: Buffer, header: DBCacheHeader, entry_filter: Optional[DBCacheFilter] = None) -> bool:
+        """Whether `buffer` is still the file this checkpoint was taken from, read with the same filter.
+
+        A rewrite can keep the build and verification hash and not shrink the file, so the entry before `offset`
+        is compared too. Otherwise the read would resume in the middle of some other entry.
+        """
+        if not self.matches(header) or self.offset > len(buffer):
+            return False
+
+        if self.filter_key != (entry_filter.key() if entry_filter is not None else None):
+            return False
+
+        if self.offset == DBCACHE_HEADER.size:
+            return True
+
+        if self.last_entry is None:
+            return False
+
+        last_entry = bytes.fromhex(self.last_entry)
+        data_size = DBCACHE_ENTRY_HEADER.unpack(last_entry)[6]
+        start = self.offset - DBCACHE_ENTRY_HEADER.size - data_size
+        return start >= DBCACHE_HEADER.size and buffer[start : start + DBCACHE_ENTRY_HEADER.size] == last_entry
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DBCacheCheckpoint"]:
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                return cls(**json.load(f))
+        except (OSError, TypeError, json.JSONDecodeError):
+            return None
+
+
+def read_dbcache_since(
+    path: str,
+    checkpoint: Optional[DBCacheCheckpoint] = None,
+    entry_filter: Optional[DBCacheFilter] = None,
+) -> tuple[DBCacheFile, DBCacheCheckpoint, bool]:
+    """Reads only the entries appended after `checkpoint`, returning them with the next checkpoint.
+
+    Falls back to reading the whole file if it was rewritten since, or the checkpoint was taken with a different
+    filter, the third return value says whether the read actually resumed.
+    """
+    buffer = map_dbcache(path)
+    header = read_dbcache_header(buffer)
+
+    resumed = checkpoint is not None and checkpoint.can_resume(buffer, header, entry_filter)
+    offset = checkpoint.offset if resumed else DBCACHE_HEADER.size  # type: ignore
+
+    entries = iter_dbcache_entries(buffer, offset, entry_filter=entry_filter)
+    dbcache = DBCacheFile(header, list(entries))
+
+    if entries.last_entry_offset is not None:
+        start = entries.last_entry_offset
+        last_entry: Optional[str] = bytes(buffer[start : start + DBCACHE_ENTRY_HEADER.size]).hex()
+    else:
+        # nothing new since the checkpoint, so the entry before the offset didn't change either
+        last_entry = checkpoint.last_entry if resumed else None  # type: ignore
+
+    filter_key = entry_filter.key() if entry_filter is not None else None
+    next_checkpoint = DBCacheCheckpoint(entries.offset, header.build_id, header.verification_hash, last_entry, filter_key)
+    return dbcache, next_checkpoint, resumed
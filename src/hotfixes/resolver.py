@@ -0,0 +1,96 @@
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from hotfixes.structures import RecordState
+
+if TYPE_CHECKING:
+    from hotfixes.parser import Hotfix
+
+# states that override the source record, an Invalid or NotPublic winner reverts the record to its source data
+OVERRIDE_STATES = frozenset((RecordState.Valid, RecordState.Delete))
+
+
+class HotfixResolver:
+    """Resolves every (table, record ID) to its winning hotfix in one pass over the entries.
+
+    The entry with the highest push ID wins, and between entries of the same push the one added last wins, which is
+    file order when fed from a DBCache. Cached entries have a push ID of -1, so any pushed hotfix beats them.
+    Entries can be added as they arrive, e.g. from `HotfixParser.poll_hotfixes`.
+    """
+
+    def __init__(self, hotfixes: Iterable["Hotfix"] = ()):
+        self.__records: dict[str, dict[int, "Hotfix"]] = {}
+        self.__table_hashes: dict[str, str] = {}
+        self.update(hotfixes)
+
+    def add(self, hotfix: "Hotfix") -> bool:
+        """Adds one entry, returning whether it's now the winner for its record."""
+        records = self.__records.get(hotfix.TableHash)
+        if records is None:
+            records = self.__records[hotfix.TableHash] = {}
+            self.__table_hashes[hotfix.TableName] = hotfix.TableHash
+
+        current = records.get(hotfix.RecordID)
+        if current is not None and current.PushID > hotfix.PushID:
+            return False
+
+        records[hotfix.RecordID] = hotfix
+        return True
+
+    def update(self, hotfixes: Iterable["Hotfix"]) -> int:
+        """Adds entries in order, returning how many became winners."""
+        return sum(self.add(hotfix) for hotfix in hotfixes)
+
+    def get_table_hash(self, table: str) -> Optional[str]:
+        """`table` can be a table hash or name."""
+        if table in self.__records:
+            return table
+
+        return self.__table_hashes.get(table)
+
+    def get_records(self, table: str) -> dict[int, "Hotfix"]:
+        tbl_hash = self.get_table_hash(table)
+        if tbl_hash is None:
+            return {}
+
+        return self.__records[tbl_hash]
+
+    def get_winner(self, table: str, record_id: int) -> Optional["Hotfix"]:
+        """The winning entry for a record whatever its state, None if the record has no entries."""
+        return self.get_records(table).get(record_id)
+
+    def lookup(self, table: str, record_id: int) -> Optional["Hotfix"]:
+        """The hotfix in effect for a record: a Valid entry replacing it or a Delete removing it.
+
+        None when nothing overrides the source record, either because it has no entries or its winner is Invalid or NotPublic.
+        """
+        hotfix = self.get_records(table).get(record_id)
+        if hotfix is None or hotfix.Status not in OVERRIDE_STATES:
+            return None
+
+        return hotfix
+
+    def get_data(self, table: str, record_id: int) -> Optional[dict[str, Any]]:
+        """The hotfixed data of a record, None if it's deleted or not hotfixed."""
+        hotfix = self.lookup(table, record_id)
+        if hotfix is None or hotfix.Status != RecordState.Valid:
+            return None
+
+        return hotfix.Data
+
+    def is_deleted(self, table: str, record_id: int) -> bool:
+        hotfix = self.lookup(table, record_id)
+        return hotfix is not None and hotfix.Status == RecordState.Delete
+
+    def iter_table(self, table: str) -> Iterator["Hotfix"]:
+        """Yields the hotfix in effect for each of a table's records, in the order the records were first seen."""
+        for hotfix in self.get_records(table).values():
+            if hotfix.Status in OVERRIDE_STATES:
+                yield hotfix
+
+    @property
+    def tables(self) -> list[str]:
+        """The hashes of every table with entries."""
+        return list(self.__records)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self.__records.values())
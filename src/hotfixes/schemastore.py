@@ -0,0 +1,160 @@
+import os
+import json
+import mmap
+import pickle
+import struct
+import hashlib
+import tempfile
+import threading
+
+from typing import Any, Callable, Optional
+
+from hotfixes import CACHE_PATH
+from hotfixes.manifestindex import ManifestIndex
+
+SCHEMA_STORE_MAGIC = b"HFSS"
+SCHEMA_STORE_VERSION = 3
+
+# magic, version, checkout fingerprint, index offset, index size
+STRUCT_STORE_HEADER = struct.Struct("<4sI32sQQ")
+
+SCHEMA_STORES: dict[str, "SchemaStore"] = {}
+SCHEMA_STORES_LOCK = threading.Lock()
+
+
+def get_definitions_dir(dbdefs_path: str) -> str:
+    return os.path.join(dbdefs_path, "definitions")
+
+
+def get_schema_store_path(dbdefs_path: str) -> str:
+    path_hash = hashlib.sha1(os.path.abspath(dbdefs_path).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_PATH, f"schema-{path_hash}.bin")
+
+
+def fingerprint_checkout(dbdefs_path: str) -> bytes:
+    """Hashes the name, size and mtime of every definition and the manifest, so any change to the checkout shows up without reading it."""
+    digest = hashlib.sha256(SCHEMA_STORE_VERSION.to_bytes(4, "little"))
+
+    manifest_path = os.path.join(dbdefs_path, "manifest.json")
+    with os.scandir(get_definitions_dir(dbdefs_path)) as files:
+        entries = sorted((file.name, file.stat()) for file in files if file.name.endswith(".dbd"))
+
+    if os.path.exists(manifest_path):
+        entries.append(("manifest.json", os.stat(manifest_path)))
+
+    for name, stat in entries:
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+
+    return digest.digest()
+
+
+def compile_schema_store(dbdefs_path: str, out_path: str, parse_dbd: Callable[[str], Any]):
+    """Parses every definition in a WoWDBDefs checkout once and writes them, with the built manifest index, to a single store file.
+
+    Definitions that fail to parse are left out, so those tables fall back to being parsed on first use.
+    """
+    fingerprint = fingerprint_checkout(dbdefs_path)
+    definitions_dir = get_definitions_dir(dbdefs_path)
+
+    manifest = []
+    manifest_path = os.path.join(dbdefs_path, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(bytes(STRUCT_STORE_HEADER.size))
+
+        offsets: dict[str, tuple[int, int]] = {}
+        for file in sorted(os.listdir(definitions_dir)):
+            if not file.endswith(".dbd"):
+                continue
+
+            try:
+                with open(os.path.join(definitions_dir, file), "r") as dbd_file:
+                    dbd = parse_dbd(dbd_file.read())
+            except Exception:
+                # one malformed definition shouldn't keep every other table out of the store
+                continue
+
+            blob = pickle.dumps(dbd, protocol=pickle.HIGHEST_PROTOCOL)
+            offsets[file.removesuffix(".dbd")] = (f.tell(), len(blob))
+            f.write(blob)
+
+        manifest_index = ManifestIndex.from_manifest(manifest)
+        index = pickle.dumps({"tables": offsets, "manifest_index": manifest_index}, protocol=pickle.HIGHEST_PROTOCOL)
+        index_offset = f.tell()
+        f.write(index)
+
+        f.seek(0)
+        f.write(STRUCT_STORE_HEADER.pack(SCHEMA_STORE_MAGIC, SCHEMA_STORE_VERSION, fingerprint, index_offset, len(index)))
+
+    os.replace(tmp_path, out_path)
+
+
+class SchemaStore:
+    """A compiled schema file. Only the offset index is read up front, each table is unpickled on first request."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__map) < STRUCT_STORE_HEADER.size:
+            raise ValueError(f"{path} is too small to be a schema store")
+
+        magic, version, fingerprint, index_offset, index_size = STRUCT_STORE_HEADER.unpack_from(self.__map, 0)
+        if magic != SCHEMA_STORE_MAGIC or version != SCHEMA_STORE_VERSION:
+            raise ValueError(f"{path} isn't a version {SCHEMA_STORE_VERSION} schema store")
+
+        self.fingerprint: bytes = fingerprint
+
+        index = pickle.loads(self.__map[index_offset : index_offset + index_size])
+        self.__offsets: dict[str, tuple[int, int]] = index["tables"]
+        self.manifest_index: ManifestIndex = index["manifest_index"]
+
+    def __contains__(self, tbl_name: str) -> bool:
+        return tbl_name in self.__offsets
+
+    def close(self):
+        self.__map.close()
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    @property
+    def table_names(self) -> list[str]:
+        return list(self.__offsets)
+
+    def get(self, tbl_name: str) -> Optional[Any]:
+        if tbl_name not in self.__offsets:
+            return None
+
+        offset, size = self.__offsets[tbl_name]
+        return pickle.loads(self.__map[offset : offset + size])
+
+
+def open_schema_store(dbdefs_path: str, parse_dbd: Callable[[str], Any], path: Optional[str] = None) -> SchemaStore:
+    """Opens the store for a checkout, compiling it first if it's missing or the checkout changed since."""
+    path = path or get_schema_store_path(dbdefs_path)
+    fingerprint = fingerprint_checkout(dbdefs_path)
+
+    with SCHEMA_STORES_LOCK:
+        store = SCHEMA_STORES.pop(path, None)
+        if store is None:
+            try:
+                store = SchemaStore(path)
+            except (OSError, ValueError):
+                store = None
+
+        if store is None or store.fingerprint != fingerprint:
+            # the old map has to go before the file can be replaced on Windows
+            if store is not None:
+                store.close()
+
+            compile_schema_store(dbdefs_path, path, parse_dbd)
+            store = SchemaStore(path)
+
+        SCHEMA_STORES[path] = store
+        return store
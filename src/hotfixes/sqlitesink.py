@@ -0,0 +1,213 @@
+import sqlite3
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from hotfixes.decoder import RowDecoder, FixedRun, STRUCT_FORMAT_FIELD_PATTERN
+
+if TYPE_CHECKING:
+    from hotfixes.parser import Hotfix
+
+# rows per executemany call
+SQLITE_BATCH_SIZE = 10_000
+
+HOTFIXES_TABLE = "hotfixes"
+HOTFIX_COLUMNS = ("push_id", "unique_id", "table_hash", "table_name", "record_id", "status")
+HOTFIX_KEY = ("push_id", "unique_id", "table_hash", "record_id", "status")
+
+# columns every typed table starts with, ahead of the ones from its layout
+ROW_COLUMNS = (("push_id", "INTEGER"), ("unique_id", "INTEGER"), ("record_id", "INTEGER"))
+
+DecoderLookup = Callable[[str, str], Optional[RowDecoder]]
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+@dataclass
+class SQLColumn:
+    name: str
+    type: str
+    column: str  # the decoded column this comes from
+    index: Optional[int] = None  # the array element, None for scalars
+
+    def get_value(self, data: dict[str, Any]) -> Any:
+        value = data.get(self.column)
+        if self.index is None or value is None:
+            return value
+
+        return value[self.index] if self.index < len(value) else None
+
+
+def get_sql_columns(decoder: RowDecoder) -> list[SQLColumn]:
+    """The typed columns for a layout, in layout order. Arrays get one `Name_N` column per element."""
+
+    def expand(column: str, array_size: int, sql_type: str) -> list[SQLColumn]:
+        if array_size == 0:
+            return [SQLColumn(column, sql_type, column)]
+        return [SQLColumn(f"{column}_{i}", sql_type, column, i) for i in range(array_size)]
+
+    columns: list[SQLColumn] = []
+    for step in decoder.steps:
+        if isinstance(step, FixedRun):
+            codes = [code for _, code in STRUCT_FORMAT_FIELD_PATTERN.findall(step.struct.format[1:]) if code != "x"]
+            for (column, array_size), code in zip(step.fields, codes):
+                columns.extend(expand(column, array_size, "REAL" if code == "f" else "INTEGER"))
+        elif not step.skip:
+            columns.extend(expand(step.column, step.array_size, "TEXT"))
+
+    return columns
+
+
+@dataclass
+class TableWriter:
+    """Buffers the decoded rows of one DB2 table and writes them in `executemany` batches."""
+
+    name: str
+    columns: list[SQLColumn]
+    insert_sql: str
+    rows: list[tuple[Any, ...]] = field(default_factory=list)
+
+    def add(self, push_id: int, unique_id: int, record_id: int, data: dict[str, Any]):
+        self.rows.append((push_id, unique_id, record_id, *[column.get_value(data) for column in self.columns]))
+
+    def flush(self, connection: sqlite3.Connection):
+        if self.rows:
+            connection.executemany(self.insert_sql, self.rows)
+            self.rows.clear()
+
+
+class SQLiteSink:
+    """Writes hotfixes into a SQLite database.
+
+    Every entry goes into `hotfixes`, and the decoded data of each DB2 table into a typed table named after it,
+    with the columns of its layout. Entries whose unique ID is already in the database are skipped, so writing
+    an updated DBCache into the same database only adds what's new.
+    """
+
+    def __init__(self, path: str, batch_size: int = SQLITE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+
+        # transactions are managed by write(), one per load
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {HOTFIXES_TABLE} ("
+            "push_id INTEGER NOT NULL, unique_id INTEGER NOT NULL, table_hash TEXT NOT NULL, table_name TEXT, "
+            "record_id INTEGER NOT NULL, status INTEGER NOT NULL)"
+        )
+
+        self.__tables: dict[str, Optional[TableWriter]] = {}
+
+    def __enter__(self) -> "SQLiteSink":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def get_known_unique_ids(self) -> set[int]:
+        return {row[0] for row in self.connection.execute(f"SELECT unique_id FROM {HOTFIXES_TABLE}")}
+
+    def get_table(self, tbl_hash: str, tbl_name: str, get_decoder: DecoderLookup) -> Optional[TableWriter]:
+        if tbl_hash in self.__tables:
+            return self.__tables[tbl_hash]
+
+        decoder = get_decoder(tbl_hash, tbl_name)
+        table = None
+        if decoder is not None:
+            table = self.create_table(tbl_name, get_sql_columns(decoder))
+
+        self.__tables[tbl_hash] = table
+        return table
+
+    def create_table(self, tbl_name: str, columns: list[SQLColumn]) -> TableWriter:
+        """Creates the typed table, or adds any columns a newer layout brought to the one that's already there."""
+        definitions = [(name, sql_type) for name, sql_type in ROW_COLUMNS] + [(column.name, column.type) for column in columns]
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote(tbl_name)} ({', '.join(f'{quote(name)} {sql_type}' for name, sql_type in definitions)})"
+        )
+
+        existing = {row[1].lower() for row in self.connection.execute(f"PRAGMA table_info({quote(tbl_name)})")}
+        for name, sql_type in definitions:
+            if name.lower() not in existing:
+                self.connection.execute(f"ALTER TABLE {quote(tbl_name)} ADD COLUMN {quote(name)} {sql_type}")
+
+        names = ", ".join(quote(name) for name, _ in definitions)
+        placeholders = ", ".join("?" * len(definitions))
+        return TableWriter(tbl_name, columns, f"INSERT INTO {quote(tbl_name)} ({names}) VALUES ({placeholders})")
+
+    def create_indexes(self):
+        self.connection.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {HOTFIXES_TABLE}_key ON {HOTFIXES_TABLE} ({', '.join(HOTFIX_KEY)})"
+        )
+        self.connection.execute(f"CREATE INDEX IF NOT EXISTS {HOTFIXES_TABLE}_unique_id ON {HOTFIXES_TABLE} (unique_id)")
+        self.connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {HOTFIXES_TABLE}_record ON {HOTFIXES_TABLE} (table_hash, record_id)"
+        )
+        for table in self.__tables.values():
+            if table is not None:
+                index_name = quote(f"{table.name}_record_id")
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {quote(table.name)} (record_id)")
+
+    def write(self, hotfixes: Iterable["Hotfix"], get_decoder: DecoderLookup) -> int:
+        """Writes every hotfix whose unique ID isn't in the database yet in a single transaction, returning how many were written.
+
+        `get_decoder(table hash, table name)` supplies the layout for typed tables. Hotfixes are only skipped by
+        their unique ID, so lazily decoded ones that are already in the database are never decoded.
+        """
+        known = self.get_known_unique_ids()
+        seen: set[tuple[int, int, str, int, int]] = set()
+        pending: list[tuple[Any, ...]] = []
+        insert_sql = f"INSERT INTO {HOTFIXES_TABLE} ({', '.join(HOTFIX_COLUMNS)}) VALUES ({', '.join('?' * len(HOTFIX_COLUMNS))})"
+
+        written = 0
+        self.connection.execute("BEGIN")
+        try:
+            for hotfix in hotfixes:
+                if hotfix.UniqueID in known:
+                    continue
+
+                status = int(hotfix.Status)
+                key = (hotfix.PushID, hotfix.UniqueID, hotfix.TableHash, hotfix.RecordID, status)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                pending.append((hotfix.PushID, hotfix.UniqueID, hotfix.TableHash, hotfix.TableName, hotfix.RecordID, status))
+                if len(pending) >= self.batch_size:
+                    self.connection.executemany(insert_sql, pending)
+                    written += len(pending)
+                    pending.clear()
+
+                data = hotfix.Data
+                if data is None:
+                    continue
+
+                table = self.get_table(hotfix.TableHash, hotfix.TableName, get_decoder)
+                if table is not None:
+                    table.add(hotfix.PushID, hotfix.UniqueID, hotfix.RecordID, data)
+                    if len(table.rows) >= self.batch_size:
+                        table.flush(self.connection)
+
+            self.connection.executemany(insert_sql, pending)
+            written += len(pending)
+            for table in self.__tables.values():
+                if table is not None:
+                    table.flush(self.connection)
+
+            # building the indexes once after the load is cheaper than keeping them up to date on every insert
+            self.create_indexes()
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            # tables created in the rolled back transaction are gone too
+            self.__tables.clear()
+            raise
+
+        return written
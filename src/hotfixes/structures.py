@@ -68,6 +68,15 @@ class DBCACHE_V9:
     )
 
 
+class FieldCompression(IntEnum):
+    NoCompression = 0
+    Bitpacked = 1
+    CommonData = 2
+    BitpackedIndexed = 3
+    BitpackedIndexedArray = 4
+    BitpackedSigned = 5
+
+
 class WDC5:
     STRUCT_DB2_HEADER = Struct(
         "magic" / Int32ul,  # type: ignore
@@ -1,9 +1,11 @@
 from typing import Union
+from dataclasses import dataclass
 
 from hotfixes.structures import Region, RecordState
 from hotfixes.bytelist import ByteList
 
 
+@dataclass
 class DBCacheHeader:
     magic: int
     version: int
@@ -11,6 +13,7 @@ class DBCacheHeader:
     verification_hash: list[int]
 
 
+@dataclass
 class DBCacheEntry:
     magic: int
     region_id: Region
@@ -21,9 +24,10 @@ class DBCacheEntry:
     data_size: int
     status: Union[RecordState, str]
     padding: list[int]
-    data: ByteList
+    data: Union[ByteList, memoryview]
 
 
+@dataclass
 class DBCacheFile:
     header: DBCacheHeader
     entries: list[DBCacheEntry]
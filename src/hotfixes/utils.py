@@ -1,7 +1,15 @@
-from typing import Any
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from hotfixes.codec import FLOAT_STRUCT
 
 TABLE_HASH_LEN = 8
 
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
 
 class Singleton:
     __instance = None
@@ -13,6 +21,69 @@ class Singleton:
         return cls.__instance
 
 
+class LRUCache(Generic[K, V]):
+    """A bounded, thread-safe LRU cache. Concurrent misses for the same key share a single load."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self.__entries: OrderedDict[K, V] = OrderedDict()
+        self.__loading: dict[K, threading.Lock] = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__entries
+
+    def __get_hit(self, key: K) -> tuple[bool, Any]:
+        # must be called while holding self.__lock
+        if key not in self.__entries:
+            return False, None
+
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return True, self.__entries[key]
+
+    def get_or_load(self, key: K, loader: Callable[[], V]) -> V:
+        with self.__lock:
+            found, value = self.__get_hit(key)
+            if found:
+                return value  # type: ignore
+
+            key_lock = self.__loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.__lock:
+                # another thread may have loaded it while we were waiting
+                found, value = self.__get_hit(key)
+                if found:
+                    return value  # type: ignore
+
+                self.misses += 1
+
+            try:
+                value = loader()
+                with self.__lock:
+                    self.__entries[key] = value
+                    while len(self.__entries) > self.maxsize:
+                        self.__entries.popitem(last=False)
+            finally:
+                with self.__lock:
+                    self.__loading.pop(key, None)
+
+        return value  # type: ignore
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
 def flatten_matches(matches: tuple[list[Any]] | list[Any], preserve_empty: bool = True) -> list[str]:
     if preserve_empty:
         return [thing for match in matches for thing in match]
@@ -40,14 +111,7 @@ def convert_table_hash(tbl_hash: int) -> str:
 
 
 def bytes_to_hex(data: list[int]) -> str:
-    hex_bytes = ""
-    for number in data:
-        number_hex = hex(number)[2:]
-        if len(number_hex) % 2 != 0:
-            number_hex = "0" + number_hex
-        hex_bytes += number_hex
-
-    return hex_bytes
+    return bytes(data).hex()
 
 
 def bytes_to_int(data: list[int], is_unsigned: bool = True):
@@ -55,15 +119,11 @@ def bytes_to_int(data: list[int], is_unsigned: bool = True):
 
 
 def bytes_to_float(data: list[int]):
-    hex_bytes = bytes_to_hex(data)
-
-    return float.fromhex(hex_bytes)
+    return FLOAT_STRUCT.unpack(bytes(data))[0]
 
 
 def bytes_to_str(data: list[int]):
-    hex_bytes = bytes_to_hex(data)
-
-    return bytes.fromhex(hex_bytes).decode(encoding="utf8")
+    return bytes(data).decode(encoding="utf8")
 
 
 def str_to_bytes(input: str) -> list[int]:
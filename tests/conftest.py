@@ -0,0 +1,91 @@
+import time
+import threading
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+
+import pytest
+
+LAST_MODIFIED = "Wed, 21 Oct 2026 07:28:00 GMT"
+
+
+class FakeGitHub(ThreadingHTTPServer):
+    """Serves `files` by path like raw.githubusercontent.com does, with ETags.
+
+    Counts requests by path and responses by status, and how many requests were in flight at once.
+    """
+
+    def __init__(self, files: dict[str, bytes], delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), FakeGitHubHandler)
+        self.files = dict(files)
+        self.delay = delay
+        self.requests: Counter[str] = Counter()
+        self.responses: Counter[int] = Counter()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    server: FakeGitHub
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status: int, body: bytes = b"", etag: str = ""):
+        with self.server.lock:
+            self.server.responses[status] += 1
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests[self.path] += 1
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+
+        time.sleep(self.server.delay)
+        body = self.server.files.get(self.path)
+
+        with self.server.lock:
+            self.server.active -= 1
+
+        if body is None:
+            return self.respond(404)
+
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.respond(304)
+
+        self.respond(200, body, etag)
+
+
+ServerFactory = Callable[..., FakeGitHub]
+
+
+@pytest.fixture
+def make_server() -> Iterator[ServerFactory]:
+    """Starts a `FakeGitHub` per call, all of them shut down after the test."""
+    servers: list[FakeGitHub] = []
+
+    def start(files: dict[str, bytes], delay: float = 0.0) -> FakeGitHub:
+        server = FakeGitHub(files, delay)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,483 @@
+import os
+import json
+import random
+import struct
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Optional
+
+from hotfixes.reader import DBCACHE_HEADER, DBCACHE_ENTRY_HEADER
+from hotfixes.structures import FieldCompression, RecordState
+
+XFTH_MAGIC = int.from_bytes(b"XFTH", "little")
+DBCACHE_VERSION = 9
+
+
+@dataclass
+class SyntheticEntry:
+    push_id: int
+    unique_id: int
+    table_hash: int
+    record_id: int
+    status: RecordState
+    data: bytes
+    region_id: int = 1
+
+
+def pack_dbcache_header(build_id: int, verification_hash: bytes = bytes(32), version: int = DBCACHE_VERSION) -> bytes:
+    return DBCACHE_HEADER.pack(XFTH_MAGIC, version, build_id, verification_hash)
+
+
+def pack_dbcache_entry(entry: SyntheticEntry) -> bytes:
+    header = DBCACHE_ENTRY_HEADER.pack(
+        XFTH_MAGIC,
+        entry.region_id,
+        entry.push_id,
+        entry.unique_id,
+        entry.table_hash,
+        entry.record_id,
+        len(entry.data),
+        entry.status,
+        bytes(3),
+    )
+    return header + entry.data
+
+
+def build_dbcache(entries: list[SyntheticEntry], build_id: int = 54988) -> bytes:
+    return pack_dbcache_header(build_id) + b"".join(pack_dbcache_entry(entry) for entry in entries)
+
+
+def iter_random_entries(count: int, table_hashes: list[int], max_data_size: int = 128, seed: int = 0) -> Iterator[SyntheticEntry]:
+    rng = random.Random(seed)
+    statuses = list(RecordState)
+    for unique_id in range(count):
+        status = rng.choice(statuses)
+        data = rng.randbytes(rng.randint(1, max_data_size)) if status == RecordState.Valid else b""
+        yield SyntheticEntry(
+            push_id=rng.randint(1, 1_000_000),
+            unique_id=unique_id,
+            table_hash=rng.choice(table_hashes),
+            record_id=rng.randint(1, 500_000),
+            status=status,
+            data=data,
+        )
+
+
+def random_entries(count: int, table_hashes: list[int], max_data_size: int = 128, seed: int = 0) -> list[SyntheticEntry]:
+    return list(iter_random_entries(count, table_hashes, max_data_size, seed))
+
+
+def write_dbcache(path: str, entries: Iterable[SyntheticEntry], build_id: int = 54988):
+    """Writes entries as they come, so huge caches can be generated without holding them in memory."""
+    with open(path, "wb") as f:
+        f.write(pack_dbcache_header(build_id))
+        for entry in entries:
+            f.write(pack_dbcache_entry(entry))
+
+
+def make_dbd_text(column_count: int, layout_count: int, seed: int = 0) -> str:
+    """A definition shaped like the real ones: a column list, then one layout section per build range."""
+    rng = random.Random(seed)
+    columns = ["int ID", *[f"int Field{i}" for i in range(column_count)], "locstring Name_lang"]
+    sections = ["\n".join(["COLUMNS", *columns])]
+    for layout in range(layout_count):
+        major = 7 + layout
+        section = [
+            f"LAYOUT {rng.getrandbits(32):08X}",
+            f"BUILD {major}.0.1.20000-{major}.3.5.30000",
+            "$noninline,id$ID<32>",
+            "Name_lang",
+            *[f"Field{i}<{rng.choice([8, 16, 32])}>" for i in range(column_count)],
+        ]
+        sections.append("\n".join(section))
+
+    return "\n\n".join(sections) + "\n"
+
+
+def write_definitions_checkout(path: str, table_count: int, column_count: int = 20, layout_count: int = 6) -> list[str]:
+    """Writes a WoWDBDefs-shaped checkout of `table_count` tables and returns their names."""
+    definitions_dir = os.path.join(path, "definitions")
+    os.makedirs(definitions_dir, exist_ok=True)
+
+    manifest = []
+    tbl_names = [f"Table{i:04d}" for i in range(table_count)]
+    for i, tbl_name in enumerate(tbl_names):
+        with open(os.path.join(definitions_dir, f"{tbl_name}.dbd"), "w") as f:
+            f.write(make_dbd_text(column_count, layout_count, seed=i))
+        manifest.append({"tableName": tbl_name, "tableHash": f"{i:08X}", "db2FileDataID": 1_000_000 + i})
+
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    return tbl_names
+
+
+# (int width, unsigned) -> struct code, for the int columns synthetic tables use
+INT_COLUMN_FORMATS = {(8, False): "b", (8, True): "B", (16, False): "h", (16, True): "H", (32, False): "i", (32, True): "I"}
+ASCII_LETTERS = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ "
+
+
+@dataclass
+class SyntheticColumn:
+    name: str
+    type: str  # int, float, string or locstring
+    int_width: int = 32
+    is_unsigned: bool = False
+    array_size: int = 0
+
+    def layout_line(self) -> str:
+        line = self.name
+        if self.type == "int":
+            line += f"<{'u' if self.is_unsigned else ''}{self.int_width}>"
+        if self.array_size:
+            line += f"[{self.array_size}]"
+        return line
+
+
+@dataclass
+class SyntheticTable:
+    """A table with a single layout, able to write its own .dbd and generate payloads that decode against it."""
+
+    name: str
+    table_hash: int
+    db2_fdid: int
+    layout_hash: str
+    columns: list[SyntheticColumn] = field(default_factory=list)
+
+    def dbd_text(self, build_range: str = "0.0.0.1-0.0.9.99999") -> str:
+        column_lines = ["COLUMNS", "int ID", *[f"{column.type} {column.name}" for column in self.columns]]
+        layout_lines = [f"LAYOUT {self.layout_hash}", f"BUILD {build_range}", "$noninline,id$ID<32>"]
+        layout_lines += [column.layout_line() for column in self.columns]
+        return "\n".join(column_lines) + "\n\n" + "\n".join(layout_lines) + "\n"
+
+    def make_payload(self, rng: random.Random) -> bytes:
+        payload = bytearray()
+        for column in self.columns:
+            count = max(column.array_size, 1)
+            if column.type in ("string", "locstring"):
+                for _ in range(count):
+                    payload += bytes(rng.choices(ASCII_LETTERS, k=rng.randint(0, 48))) + b"\x00"
+            elif column.type == "float":
+                payload += struct.pack(f"<{count}f", *[rng.uniform(-1000, 1000) for _ in range(count)])
+            else:
+                code = INT_COLUMN_FORMATS[(column.int_width, column.is_unsigned)]
+                low, high = (0, 2**column.int_width - 1) if column.is_unsigned else (-(2 ** (column.int_width - 1)), 2 ** (column.int_width - 1) - 1)
+                payload += struct.pack(f"<{count}{code}", *[rng.randint(low, high) for _ in range(count)])
+
+        return bytes(payload)
+
+    def make_row(self, rng: random.Random) -> dict[str, Any]:
+        """A row as `RowDecoder` decodes it, with floats that survive a round trip through float32."""
+        row: dict[str, Any] = {}
+        for column in self.columns:
+            count = max(column.array_size, 1)
+            if column.type in ("string", "locstring"):
+                values: list[Any] = [bytes(rng.choices(ASCII_LETTERS, k=rng.randint(0, 48))).decode() for _ in range(count)]
+            elif column.type == "float":
+                values = list(struct.unpack(f"<{count}f", struct.pack(f"<{count}f", *[rng.uniform(-1000, 1000) for _ in range(count)])))
+            else:
+                low, high = (0, 2**column.int_width - 1) if column.is_unsigned else (-(2 ** (column.int_width - 1)), 2 ** (column.int_width - 1) - 1)
+                values = [rng.randint(low, high) for _ in range(count)]
+            row[column.name] = values if column.array_size else values[0]
+
+        return row
+
+
+def make_tables(count: int, string_ratio: float = 0.5, max_columns: int = 60, seed: int = 0) -> list[SyntheticTable]:
+    """Tables with a mix of fixed-width layouts and layouts with strings, of between 4 and `max_columns` columns."""
+    rng = random.Random(seed)
+    tables = []
+    for i in range(count):
+        has_strings = rng.random() < string_ratio
+        columns = []
+        for c in range(rng.randint(4, max_columns)):
+            kind = rng.random()
+            if has_strings and kind < 0.1:
+                columns.append(SyntheticColumn(f"Text{c}_lang", rng.choice(["string", "locstring"])))
+            elif kind < 0.25:
+                columns.append(SyntheticColumn(f"Float{c}", "float", array_size=rng.choice([0, 0, 0, 3])))
+            else:
+                width, is_unsigned = rng.choice(list(INT_COLUMN_FORMATS))
+                columns.append(SyntheticColumn(f"Field{c}", "int", width, is_unsigned, rng.choice([0, 0, 0, 0, 2, 4])))
+
+        tables.append(SyntheticTable(f"Synthetic{i:03d}", 0x10000000 + i, 2_000_000 + i, f"{rng.getrandbits(32):08X}", columns))
+
+    return tables
+
+
+def iter_table_entries(
+    tables: list[SyntheticTable], count: int, skew: float = 1.0, valid_ratio: float = 0.9, seed: int = 0
+) -> Iterator[SyntheticEntry]:
+    """Entries spread over `tables` with Zipf-like weights: the higher `skew`, the more a few tables dominate."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(len(tables))]
+    other_states = [RecordState.Delete, RecordState.Invalid, RecordState.NotPublic]
+    for unique_id, table in enumerate(rng.choices(tables, weights, k=count)):
+        valid = rng.random() < valid_ratio
+        yield SyntheticEntry(
+            push_id=rng.randint(1, 1_000_000),
+            unique_id=unique_id,
+            table_hash=table.table_hash,
+            record_id=rng.randint(1, 500_000),
+            status=RecordState.Valid if valid else rng.choice(other_states),
+            data=table.make_payload(rng) if valid else b"",
+        )
+
+
+def write_table_checkout(path: str, tables: list[SyntheticTable]):
+    """Writes a WoWDBDefs-shaped checkout with a definition and a manifest entry for each table."""
+    definitions_dir = os.path.join(path, "definitions")
+    os.makedirs(definitions_dir, exist_ok=True)
+
+    for table in tables:
+        with open(os.path.join(definitions_dir, f"{table.name}.dbd"), "w") as f:
+            f.write(table.dbd_text())
+
+    manifest = [
+        {"tableName": table.name, "tableHash": f"{table.table_hash:08X}", "db2FileDataID": table.db2_fdid}
+        for table in tables
+    ]
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+
+def make_db2_header(layout_hash: int, table_hash: int = 0) -> bytes:
+    schema = b"WDC5".ljust(128, b"\x00")
+    return struct.pack("<4sI128s6I", b"WDC5", 5, schema, 0, 0, 0, 0, table_hash, layout_hash) + bytes(64)
+
+
+def get_raw_value(column: SyntheticColumn, value: Any) -> int:
+    """The uint32 a value is stored as in bitpacked, pallet and common data."""
+    if column.type == "float":
+        return struct.unpack("<I", struct.pack("<f", value))[0]
+    return value & 0xFFFFFFFF
+
+
+def pack_field(column: SyntheticColumn, values: list[Any]) -> bytes:
+    if column.type == "float":
+        return struct.pack(f"<{len(values)}f", *values)
+    return struct.pack(f"<{len(values)}{INT_COLUMN_FORMATS[(column.int_width, column.is_unsigned)]}", *values)
+
+
+def build_wdc5(
+    table: SyntheticTable,
+    rows: list[tuple[int, dict[str, Any]]],
+    compressions: Optional[dict[str, FieldCompression]] = None,
+    section_count: int = 1,
+    copies: Optional[dict[int, int]] = None,
+    sparse: bool = False,
+    inline_ids: bool = False,
+    encrypted_sections: Iterable[int] = (),
+) -> bytes:
+    """A WDC5 DB2 of `table` holding `rows`, (record ID, row as `make_row` makes them), split over `section_count` sections.
+
+    `compressions` picks how each column is stored, uncompressed by default. `copies` (new ID -> copied ID) goes in the
+    last section's copy table. Sparse tables store every column uncompressed with strings inline, and keep their IDs in
+    the offset map ID list. `inline_ids` stores IDs as a leading field instead of an ID list. Records of
+    `encrypted_sections` are zeroed and their section gets a TACT key, as CASC returns them without the key.
+    """
+    compressions = compressions or {}
+    copies = copies or {}
+    encrypted_sections = set(encrypted_sections)
+    columns = list(table.columns)
+    if inline_ids:
+        columns.insert(0, SyntheticColumn("ID", "int", 32, True))
+        rows = [(record_id, {"ID": record_id, **row}) for record_id, row in rows]
+
+    # (offset bits, size bits, additional data size, compression, val1, val2, val3) per field
+    fields: list[tuple[int, ...]] = []
+    field_structures = b""
+    pallet_data = bytearray()
+    common_data = bytearray()
+    pallets: dict[str, dict[Any, int]] = {}
+    bit = 0
+    for column in columns:
+        compression = FieldCompression.NoCompression if sparse else compressions.get(column.name, FieldCompression.NoCompression)
+        count = max(column.array_size, 1)
+        values = [row[column.name] for _, row in rows]
+        if compression == FieldCompression.NoCompression:
+            bit = (bit + 7) & ~7
+            element_bits = column.int_width if column.type == "int" else 32
+            fields.append((bit, element_bits * count, 0, compression, 0, 0, 0))
+            field_structures += struct.pack("<hH", 32 - element_bits, bit >> 3)
+            bit += element_bits * count
+        elif compression in (FieldCompression.Bitpacked, FieldCompression.BitpackedSigned):
+            signed = compression == FieldCompression.BitpackedSigned
+            width = max([1, *[value.bit_length() + signed for value in values]])
+            fields.append((bit, width, 0, compression, bit, width, int(signed)))
+            field_structures += struct.pack("<hH", 0, bit >> 3)
+            bit += width
+        elif compression == FieldCompression.CommonData:
+            data = b"".join(
+                struct.pack("<II", record_id, get_raw_value(column, row[column.name])) for record_id, row in rows if row[column.name] != 0
+            )
+            fields.append((bit, 0, len(data), compression, 0, 0, 0))
+            field_structures += struct.pack("<hH", 0, bit >> 3)
+            common_data += data
+        else:
+            keys = [tuple(value) if column.array_size else value for value in values]
+            pallet = pallets[column.name] = {key: i for i, key in enumerate(dict.fromkeys(keys))}
+            data = b"".join(
+                struct.pack(f"<{count}I", *[get_raw_value(column, value) for value in (key if column.array_size else [key])])
+                for key in pallet
+            )
+            width = max(1, (len(pallet) - 1).bit_length())
+            fields.append((bit, width, len(data), compression, 0, width, count if column.array_size else 0))
+            field_structures += struct.pack("<hH", 0, bit >> 3)
+            pallet_data += data
+            bit += width
+
+    record_size = 0 if sparse else (bit + 7) >> 3
+    total_records = len(rows)
+    chunk = -(-total_records // section_count) if total_records else 0
+    chunks = [rows[i * chunk : (i + 1) * chunk] for i in range(section_count)]
+
+    header_size = 204 + 40 * section_count + 28 * len(columns)
+    offset = header_size + len(pallet_data) + len(common_data)
+
+    section_headers = []
+    section_blobs = []
+    first_record = 0
+    string_table_start = 0
+    for section_index, section_rows in enumerate(chunks):
+        records = bytearray()
+        strings = bytearray()
+        string_offsets: dict[str, int] = {}
+        offset_map = bytearray()
+        for i, (record_id, row) in enumerate(section_rows):
+            if sparse:
+                record = bytearray()
+                for column in columns:
+                    values = row[column.name] if column.array_size else [row[column.name]]
+                    if column.type in ("string", "locstring"):
+                        record += b"".join(value.encode() + b"\x00" for value in values)
+                    else:
+                        record += pack_field(column, values)
+                offset_map += struct.pack("<IH", offset + len(records), len(record))
+                records += record
+                continue
+
+            record_index = first_record + i
+            record_bits = 0
+            for column, (offset_bits, _, _, compression, _, width, _) in zip(columns, fields):
+                value = row[column.name]
+                if compression == FieldCompression.NoCompression:
+                    values = value if column.array_size else [value]
+                    if column.type in ("string", "locstring"):
+                        # offsets are relative to where they're stored, with every record ahead of every string table
+                        positions = []
+                        for element, string in enumerate(values):
+                            if string not in string_offsets:
+                                string_offsets[string] = len(strings)
+                                strings += string.encode() + b"\x00"
+                            string_position = total_records * record_size + string_table_start + string_offsets[string]
+                            positions.append(string_position - (record_index * record_size + (offset_bits >> 3) + element * 4))
+                        packed = struct.pack(f"<{len(positions)}I", *positions)
+                    else:
+                        packed = pack_field(column, values)
+                    record_bits |= int.from_bytes(packed, "little") << offset_bits
+                elif compression in (FieldCompression.Bitpacked, FieldCompression.BitpackedSigned):
+                    record_bits |= (value & ((1 << width) - 1)) << offset_bits
+                elif compression != FieldCompression.CommonData:
+                    record_bits |= pallets[column.name][tuple(value) if column.array_size else value] << offset_bits
+            records += record_bits.to_bytes(record_size, "little")
+
+        record_ids = [record_id for record_id, _ in section_rows]
+        if section_index in encrypted_sections:
+            records = bytearray(len(records))
+
+        copy_table = b""
+        if section_index == section_count - 1:
+            copy_table = b"".join(struct.pack("<II", new_id, copied_id) for new_id, copied_id in copies.items())
+
+        id_list = b"" if sparse or inline_ids else struct.pack(f"<{len(record_ids)}I", *record_ids)
+        offset_map_ids = struct.pack(f"<{len(record_ids)}I", *record_ids) if sparse else b""
+        blob = bytes(records) + bytes(strings) + id_list + copy_table + bytes(offset_map) + offset_map_ids
+        section_headers.append(
+            struct.pack(
+                "<Q8I",
+                0x1234567890ABCDEF if section_index in encrypted_sections else 0,
+                offset,
+                len(section_rows),
+                len(strings),
+                offset + len(records) if sparse else 0,
+                len(id_list),
+                0,
+                len(section_rows) if sparse else 0,
+                len(copies) if copy_table else 0,
+            )
+        )
+        section_blobs.append(blob)
+        offset += len(blob)
+        first_record += len(section_rows)
+        string_table_start += len(strings)
+
+    record_ids = [record_id for record_id, _ in rows]
+    header = struct.pack(
+        "<4sI128s9I2H7I",
+        b"WDC5",
+        5,
+        b"WDC5".ljust(128, b"\x00"),
+        total_records,
+        len(columns),
+        record_size,
+        string_table_start,
+        table.table_hash,
+        int(table.layout_hash, 16),
+        min(record_ids, default=0),
+        max(record_ids, default=0),
+        0,
+        1 if sparse else 0,
+        0,
+        # real DB2s count some fields here that have no field structure, so this differs from field_count on purpose
+        len(columns) + 1,
+        0,
+        0,
+        24 * len(columns),
+        len(common_data),
+        len(pallet_data),
+        section_count,
+    )
+    field_storage_info = b"".join(struct.pack("<2H5I", *info) for info in fields)
+    return header + b"".join(section_headers) + field_structures + field_storage_info + pallet_data + common_data + b"".join(section_blobs)
+
+
+@dataclass
+class FakeCascFile:
+    data: bytes
+
+
+class FakeCasc:
+    """Stands in for a CascHandler, serving just enough of each table's DB2 for its layout hash to be read."""
+
+    def __init__(self, tables: list[SyntheticTable]):
+        self.headers = {table.db2_fdid: make_db2_header(int(table.layout_hash, 16), table.table_hash) for table in tables}
+        self.opened: list[int] = []
+        self.closed = False
+
+    def read_file_by_id(self, fdid: int, flags: int = 0) -> FakeCascFile:
+        self.opened.append(fdid)
+        return FakeCascFile(self.headers[fdid])
+
+    def close(self):
+        self.closed = True
+
+
+def write_game_install(
+    path: str, entries: Iterable[SyntheticEntry], version: str = "0.0.1.1", flavor: str = "_retail_", product: str = "wow"
+) -> str:
+    """Lays out just what HotfixParser reads from a game install: .build.info and the flavor's DBCache.bin.
+
+    Returns the DBCache path.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".build.info"), "w") as f:
+        f.write("Branch!STRING:0|Active!DEC:1|Version!STRING:0|Product!STRING:0\n")
+        f.write(f"us|1|{version}|{product}\n")
+
+    dbcache_dir = os.path.join(path, flavor, "Cache", "ADB", "enUS")
+    os.makedirs(dbcache_dir, exist_ok=True)
+
+    dbcache_path = os.path.join(dbcache_dir, "DBCache.bin")
+    write_dbcache(dbcache_path, entries, build_id=int(version.split(".")[-1]))
+    return dbcache_path
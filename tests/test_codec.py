@@ -0,0 +1,72 @@
+import math
+import random
+import struct
+import pytest
+
+from hotfixes.codec import decode_array, decode_value, get_format_code, skip_strings, split_strings
+from hotfixes.utils import bytes_to_float, bytes_to_hex, bytes_to_int, bytes_to_str
+
+INT_COLUMNS = [("int", width, is_unsigned) for width in (8, 16, 32, 64) for is_unsigned in (False, True)]
+FIXED_INT_COLUMNS = [("u8", 8), ("u16", 16), ("u32", 32), ("u64", 64)]
+
+
+def int_range(width: int, is_unsigned: bool) -> tuple[int, int]:
+    if is_unsigned:
+        return 0, 2**width - 1
+    return -(2 ** (width - 1)), 2 ** (width - 1) - 1
+
+
+@pytest.mark.parametrize("column_type,width,is_unsigned", INT_COLUMNS + [(t, w, True) for t, w in FIXED_INT_COLUMNS])
+def test_int_round_trip(column_type: str, width: int, is_unsigned: bool):
+    rng = random.Random(width)
+    low, high = int_range(width, is_unsigned)
+    values = [low, high, 0 if low == 0 else -1, *[rng.randint(low, high) for _ in range(20)]]
+
+    for value in values:
+        data = value.to_bytes(width // 8, "little", signed=not is_unsigned)
+        assert decode_value(data, column_type, width, is_unsigned) == value
+
+    data = b"\xaa" + b"".join(value.to_bytes(width // 8, "little", signed=not is_unsigned) for value in values)
+    assert decode_array(data, column_type, width, is_unsigned, len(values), offset=1) == values
+
+
+def test_fixed_width_types_ignore_layout_width():
+    assert get_format_code("u64", 8, False) == "Q"
+    assert decode_value(b"\xff\xff", "u16", 32, False) == 0xFFFF
+
+
+def test_float_round_trip():
+    values = [0.0, 1.0, -2.5, 3.4028234663852886e38, float("inf")]
+    data = struct.pack(f"<{len(values)}f", *values)
+
+    assert decode_array(data, "float", 32, False, len(values)) == values
+    assert decode_value(data, "float", offset=8) == -2.5
+    assert math.isnan(decode_value(struct.pack("<f", float("nan")), "float"))
+
+
+def test_unsupported_width():
+    with pytest.raises(ValueError):
+        get_format_code("int", 24)
+
+
+def test_split_strings():
+    data = "Azeroth\x00\x00Dalaran ✨\x00tail".encode()
+
+    assert split_strings(data, 1) == (["Azeroth"], 8)
+    assert split_strings(memoryview(data), 3) == (["Azeroth", "", "Dalaran ✨"], 21)
+    assert split_strings(data, 1, offset=21) == (["tail"], len(data) + 1)
+    assert split_strings(data, 2, offset=21) == (["tail", ""], len(data) + 1)
+
+
+def test_skip_strings_matches_split_strings():
+    data = "Azeroth\x00\x00Dalaran ✨\x00tail".encode()
+
+    for offset, count in [(0, 1), (0, 3), (21, 1), (21, 2), (8, 2)]:
+        assert skip_strings(data, count, offset) == split_strings(data, count, offset)[1]
+
+
+def test_utils_primitives():
+    assert bytes_to_float(list(struct.pack("<f", 1.5))) == 1.5
+    assert bytes_to_int([0x4E, 0xE5, 0x9B, 0x91]) == 0x919BE54E
+    assert bytes_to_str(list("KeyboardTurner".encode())) == "KeyboardTurner"
+    assert bytes_to_hex([0, 15, 255]) == "000fff"
@@ -0,0 +1,175 @@
+import random
+
+import pytest
+
+from hotfixes.db2 import WDC5Reader, DB2Column, DB2Table, MergedTable, read_bits
+from hotfixes.resolver import HotfixResolver
+from hotfixes.structures import FieldCompression, RecordState
+
+from tests.synthetic import SyntheticColumn, SyntheticTable, build_wdc5
+from tests.test_resolver import FakeHotfix
+
+TABLE = SyntheticTable(
+    "Test",
+    0x0AB1C2D3,
+    1234,
+    "0000ABCD",
+    [
+        SyntheticColumn("Signed", "int", 32),
+        SyntheticColumn("Unsigned", "int", 16, True),
+        SyntheticColumn("Scale", "float"),
+        SyntheticColumn("Name_lang", "locstring"),
+        SyntheticColumn("Flags", "int", 8, False, 3),
+        SyntheticColumn("Pallet", "int", 32, True),
+        SyntheticColumn("Common", "int", 32),
+        SyntheticColumn("PalletArray", "int", 16, False, 2),
+        SyntheticColumn("Text", "string", array_size=2),
+    ],
+)
+
+COMPRESSIONS = {
+    "Signed": FieldCompression.BitpackedSigned,
+    "Unsigned": FieldCompression.Bitpacked,
+    "Scale": FieldCompression.CommonData,
+    "Pallet": FieldCompression.BitpackedIndexed,
+    "Common": FieldCompression.CommonData,
+    "PalletArray": FieldCompression.BitpackedIndexedArray,
+}
+
+
+def make_rows(count: int = 60, seed: int = 0) -> list[tuple[int, dict]]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = TABLE.make_row(rng)
+        row["Signed"] = rng.randint(-5000, 5000)
+        row["Unsigned"] = rng.randint(0, 1000)
+        row["Pallet"] = rng.choice([7, 9, 100_000])
+        row["Common"] = rng.choice([0, 0, -5, 12])
+        row["PalletArray"] = rng.choice([[1, 2], [-3, 4]])
+        rows.append((i * 3 + 1, row))
+
+    return rows
+
+
+def get_columns(first_field: int = 0) -> list[DB2Column]:
+    return [
+        DB2Column.create(column.name, column.type, column.int_width, column.is_unsigned, column.array_size, first_field + i)
+        for i, column in enumerate(TABLE.columns)
+    ]
+
+
+def test_read_bits():
+    data = (0b1011_0110_1100_0101).to_bytes(2, "little")
+
+    assert read_bits(data, 0, 4) == 0b0101
+    assert read_bits(data, 6, 5) == 0b11011
+    assert read_bits(data, 12, 4, signed=True) == -5
+
+
+def test_rejects_other_formats():
+    with pytest.raises(ValueError):
+        WDC5Reader(b"WDC4" + bytes(300))
+
+
+@pytest.mark.parametrize("compressions", [None, COMPRESSIONS])
+def test_reads_every_row_across_sections(compressions):
+    rows = make_rows()
+    reader = WDC5Reader(build_wdc5(TABLE, rows, compressions, section_count=3))
+    table = DB2Table(reader, get_columns())
+
+    assert reader.layout_hash == "0000ABCD" and len(reader.sections) == 3
+    assert len(table) == len(rows)
+    assert list(table.record_ids()) == [record_id for record_id, _ in rows]
+    for record_id, row in rows:
+        assert table[record_id] == row
+
+    assert table.get(2) is None and 2 not in table
+
+
+def test_index_is_built_on_first_access():
+    reader = WDC5Reader(build_wdc5(TABLE, make_rows()))
+
+    assert reader._WDC5Reader__index is None
+    assert reader.index[1] == 0
+    assert reader._WDC5Reader__index is not None
+
+
+def test_copy_table():
+    rows = make_rows()
+    table = DB2Table(WDC5Reader(build_wdc5(TABLE, rows, COMPRESSIONS, section_count=2, copies={1000: 4, 1001: 1000})), get_columns())
+
+    # copies keep the common data of the record they copy
+    assert table[1000] == table[1001] == dict(rows)[4]
+    assert len(table) == len(rows) + 2
+
+
+def test_sparse():
+    rows = make_rows(20)
+    reader = WDC5Reader(build_wdc5(TABLE, rows, sparse=True, section_count=2))
+    table = DB2Table(reader, get_columns())
+
+    assert reader.is_sparse
+    assert [table[record_id] for record_id, _ in rows] == [row for _, row in rows]
+
+
+def test_inline_ids():
+    rows = make_rows(20)
+    table = DB2Table(WDC5Reader(build_wdc5(TABLE, rows, COMPRESSIONS, section_count=2, inline_ids=True)), get_columns(1))
+
+    assert [table[record_id] for record_id, _ in rows] == [row for _, row in rows]
+
+
+def test_skips_encrypted_sections():
+    rows = make_rows(30)
+    table = DB2Table(WDC5Reader(build_wdc5(TABLE, rows, section_count=3, encrypted_sections=[1])), get_columns())
+
+    assert list(table.record_ids()) == [record_id for record_id, _ in rows[:10] + rows[20:]]
+
+
+def test_open_maps_the_file(tmp_path):
+    rows = make_rows(10)
+    path = tmp_path / "Test.db2"
+    path.write_bytes(build_wdc5(TABLE, rows))
+
+    table = DB2Table(WDC5Reader.open(str(path)), get_columns())
+    assert table[rows[0][0]] == rows[0][1]
+
+
+def make_hotfix(push_id: int, record_id: int, status: RecordState, data=None) -> FakeHotfix:
+    return FakeHotfix(push_id, push_id, "0AB1C2D3", "Test", status, record_id, data)
+
+
+def test_merged_table():
+    rows = make_rows(10)
+    base = DB2Table(WDC5Reader(build_wdc5(TABLE, rows)), get_columns())
+    hotfixed = {**rows[1][1], "Signed": 1}
+    resolver = HotfixResolver(
+        [
+            make_hotfix(1, rows[1][0], RecordState.Valid, hotfixed),
+            make_hotfix(2, rows[2][0], RecordState.Delete),
+            make_hotfix(3, rows[3][0], RecordState.Invalid),
+            make_hotfix(4, 500, RecordState.Valid, {"Signed": 2}),
+            make_hotfix(5, 501, RecordState.Delete),
+        ]
+    )
+    merged = MergedTable(base, resolver, "Test")
+
+    assert merged[rows[0][0]] == rows[0][1]
+    assert merged[rows[1][0]] == hotfixed
+    assert merged.get(rows[2][0]) is None and rows[2][0] not in merged
+    assert merged[rows[3][0]] == rows[3][1] and not merged.is_hotfixed(rows[3][0])
+    assert merged[500] == {"Signed": 2} and 501 not in merged
+
+    expected = [record_id for record_id, _ in rows if record_id != rows[2][0]] + [500]
+    assert list(merged.record_ids()) == expected
+    assert len(merged) == len(expected)
+    assert dict(merged.items())[rows[1][0]] == hotfixed
+
+
+def test_merged_table_without_base():
+    resolver = HotfixResolver([make_hotfix(1, 7, RecordState.Valid, {"Signed": 3}), make_hotfix(2, 8, RecordState.Delete)])
+    merged = MergedTable(None, resolver, "0AB1C2D3")
+
+    assert list(merged.items()) == [(7, {"Signed": 3})]
+    assert len(merged) == 1 and merged.get(9) is None
@@ -0,0 +1,112 @@
+import random
+import pytest
+
+pytest.importorskip("pycasclib")
+
+from hotfixes.dbdefs import DBD, Build, BuildRange, Definitions, DefinitionEntry  # noqa: E402
+
+
+def make_definitions(i: int, builds: list) -> Definitions:
+    entry = DefinitionEntry(f"Field{i}", 32, False, 0, "", "")
+    return Definitions(builds, [f"{i:08X}"], [], [entry])
+
+
+def test_build_ordering_is_lexicographic():
+    assert Build(9, 2, 5, 52902) < Build(10, 0, 0, 46000)
+    assert not Build(9, 2, 5, 52902) > Build(10, 0, 0, 46000)
+    assert Build(11, 0, 2, 55000) > Build(11, 0, 0, 56000)
+    assert Build(1, 2, 3, 4) <= Build(1, 2, 3, 4) <= Build(1, 2, 3, 4)
+
+
+def test_build_ranges_are_inclusive():
+    definitions = make_definitions(0, [BuildRange(Build(10, 0, 0, 46000), Build(10, 2, 7, 55000))])
+    dbd = DBD([], [definitions])
+
+    for version in (Build(10, 0, 0, 46000), Build(10, 1, 5, 50000), Build(10, 2, 7, 55000)):
+        assert definitions.supports_version(version)
+        assert dbd.get_definitions_for_build(version) == definitions.entries
+
+    for version in (Build(9, 2, 7, 54000), Build(10, 2, 7, 55001), Build(11, 0, 0, 1)):
+        assert not definitions.supports_version(version)
+        assert dbd.get_definitions_for_build(version) == []
+
+
+def test_build_index_matches_linear_scan():
+    rng = random.Random(0)
+
+    def random_build() -> Build:
+        return Build(rng.randint(7, 11), rng.randint(0, 3), rng.randint(0, 7), rng.randint(20000, 60000))
+
+    definitions = []
+    for i in range(150):
+        builds: list = []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.5:
+                builds.append(random_build())
+            else:
+                lower, upper = sorted((random_build(), random_build()), key=Build.to_tuple)
+                builds.append(BuildRange(lower, upper))
+        definitions.append(make_definitions(i, builds))
+
+    dbd = DBD([], definitions)
+    probes = [random_build() for _ in range(2000)]
+    probes += [build for definition in definitions for build in definition.builds if isinstance(build, Build)]
+    for version in probes:
+        expected = [entry for definition in definitions if definition.supports_version(version) for entry in definition.entries]
+        assert dbd.get_definitions_for_build(version) == expected
+
+
+def test_layout_index():
+    definitions = [make_definitions(i, []) for i in range(3)]
+    definitions[2].layouts.append("00000000")
+    dbd = DBD([], definitions)
+
+    assert dbd.get_definitions_for_layout("00000001") == definitions[1].entries
+    assert dbd.get_definitions_for_layout("00000000") == definitions[0].entries + definitions[2].entries
+    assert dbd.get_definitions_for_layout("FFFFFFFF") == []
+
+
+def test_parse_layout_hashes():
+    from hotfixes.dbdefs import DBDefs
+
+    dbd = DBDefs().parse_dbd("COLUMNS\nint ID\n\nLAYOUT A81AA40A, 0AB1C2D3\nBUILD 11.0.2.55000\nID<32>\n")
+    assert dbd.definitions[0].layouts == ["A81AA40A", "0AB1C2D3"]
+    assert [entry.column for entry in dbd.get_definitions_for_layout("A81AA40A")] == ["ID"]
+
+
+def test_prefetch_definitions_inside_a_running_loop(tmp_path, monkeypatch, make_server):
+    import asyncio
+
+    from hotfixes.dbdefs import DBDefs
+    from hotfixes.httpcache import DiskCache
+
+    server = make_server({"/definitions/Map.dbd": b"COLUMNS\nint ID\n"})
+    monkeypatch.setattr("hotfixes.dbdefs.DBD_URL", server.url)
+    monkeypatch.setattr("hotfixes.dbdefs.DBD_CACHE", {})
+    dbdefs = DBDefs(http_cache=DiskCache(str(tmp_path)))
+
+    async def prefetch_from_a_coroutine():
+        dbdefs.prefetch_definitions(["Map"])
+
+    asyncio.run(prefetch_from_a_coroutine())
+
+    assert dbdefs.get_definitions_for_table("Map") == "COLUMNS\nint ID\n"
+    assert server.requests == {"/definitions/Map.dbd": 1}
+
+
+def test_schema_store_is_opt_in(tmp_path, monkeypatch):
+    from hotfixes.dbdefs import DBDefs
+    from hotfixes.httpcache import DiskCache
+
+    checkout = tmp_path / "WoWDBDefs"
+    (checkout / "definitions").mkdir(parents=True)
+    (checkout / "definitions" / "Map.dbd").write_text("COLUMNS\nint ID\n\nLAYOUT A81AA40A\nBUILD 11.0.2.55000\nID<32>\n")
+    monkeypatch.setattr("hotfixes.schemastore.CACHE_PATH", str(tmp_path / "cache"))
+
+    lazy = DBDefs(dbdefs_path=str(checkout), http_cache=DiskCache(str(tmp_path)))
+    assert lazy.schema_store is None
+    assert not (tmp_path / "cache").exists()
+
+    compiled = DBDefs(dbdefs_path=str(checkout), http_cache=DiskCache(str(tmp_path)), use_schema_store=True)
+    assert compiled.schema_store is not None
+    assert "Map" in compiled.schema_store
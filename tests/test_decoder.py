@@ -0,0 +1,212 @@
+import pickle
+import struct
+
+import pytest
+
+from dataclasses import dataclass
+
+pytest.importorskip("pycasclib")
+
+from hotfixes.dbdefs import DBDefs  # noqa: E402
+from hotfixes.decoder import (  # noqa: E402
+    RowDecoder,
+    FixedRun,
+    StringColumn,
+    DecodeBackend,
+    DECODER_CACHE,
+    get_row_decoder,
+    create_executor,
+    decode_payloads,
+)
+
+TEST_DBD = """COLUMNS
+int ID
+string Name
+locstring Description_lang
+float Position
+int Flags
+int Counts
+
+LAYOUT 0AB1C2D3
+BUILD 11.0.2.55000
+$noninline,id$ID<32>
+Name
+Description_lang
+Position[3]
+Flags<u16>
+Counts<8>[2]
+"""
+
+
+@pytest.fixture
+def dbd():
+    return DBDefs().parse_dbd(TEST_DBD)
+
+
+def test_compile_folds_fixed_runs(dbd):
+    decoder = RowDecoder.compile(dbd, "0AB1C2D3")
+
+    assert [type(step) for step in decoder.steps] == [StringColumn, StringColumn, FixedRun]
+    assert decoder.steps[2].struct.format == "<3f1H2b"
+
+
+def test_decode_row(dbd):
+    decoder = RowDecoder.compile(dbd, "0AB1C2D3")
+    data = b"Turner\x00Keyboard\x00" + struct.pack("<3fHbb", 1.5, -2.0, 0.25, 65535, -1, 7)
+
+    assert decoder.decode(memoryview(data)) == {
+        "Name": "Turner",
+        "Description_lang": "Keyboard",
+        "Position": [1.5, -2.0, 0.25],
+        "Flags": 65535,
+        "Counts": [-1, 7],
+    }
+    with pytest.raises(struct.error):
+        decoder.decode(data[:-1])
+
+
+def test_decoders_are_cached_per_layout(dbd):
+    DECODER_CACHE.clear()
+    loads = []
+
+    def load_dbd():
+        loads.append(1)
+        return dbd
+
+    first = get_row_decoder("DEADBEEF", "0AB1C2D3", load_dbd)
+    second = get_row_decoder("DEADBEEF", "0AB1C2D3", load_dbd)
+
+    assert first is second
+    assert len(loads) == 1
+
+
+def test_decoder_survives_pickling(dbd):
+    decoder = RowDecoder.compile(dbd, "0AB1C2D3")
+    data = b"Turner\x00Keyboard\x00" + struct.pack("<3fHbb", 1.5, -2.0, 0.25, 65535, -1, 7)
+
+    assert pickle.loads(pickle.dumps(decoder)).decode(data) == decoder.decode(data)
+
+
+ROW = b"Turner\x00Keyboard\x00" + struct.pack("<3fHbb", 1.5, -2.0, 0.25, 65535, -1, 7)
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [["Flags"], ["Name"], ["Description_lang", "Counts"], ["Position", "Counts"], ["Name", "Flags", "Missing"], []],
+)
+def test_projected_decode_matches_full_decode(dbd, columns: list[str]):
+    decoder = RowDecoder.compile(dbd, "0AB1C2D3")
+    projected = decoder.project(columns)
+    full = decoder.decode(ROW)
+
+    assert projected.decode(ROW) == {column: full[column] for column in columns if column in full}
+    assert pickle.loads(pickle.dumps(projected)).decode(ROW) == projected.decode(ROW)
+
+
+def test_projection_skips_unneeded_spans(dbd):
+    decoder = RowDecoder.compile(dbd, "0AB1C2D3")
+
+    name_only = decoder.project(["Name"])
+    assert [type(step) for step in name_only.steps] == [StringColumn]
+    assert name_only.decode(b"Turner\x00") == {"Name": "Turner"}  # nothing after Name is read
+
+    flags = decoder.project(["Flags"])
+    assert [step.skip for step in flags.steps[:2]] == [True, True]
+    assert flags.steps[2].struct.format == "<12x1H"
+
+    fixed = RowDecoder.compile(DBDefs().parse_dbd(FIXED_DBD), "1F2E3D4C").project(["Counts"])
+    assert not fixed.has_strings
+    assert fixed.steps[0].struct.format == "<14x2b"
+
+
+def test_projected_decoders_are_cached(dbd):
+    DECODER_CACHE.clear()
+    loads = []
+
+    def load_dbd():
+        loads.append(1)
+        return dbd
+
+    full = get_row_decoder("DEADBEEF", "0AB1C2D3", load_dbd)
+    projected = get_row_decoder("DEADBEEF", "0AB1C2D3", load_dbd, ["Flags", "Name"])
+
+    assert projected is get_row_decoder("DEADBEEF", "0AB1C2D3", load_dbd, ("Name", "Flags"))
+    assert projected is not full
+    assert len(loads) == 1
+
+
+@pytest.mark.parametrize("backend", list(DecodeBackend))
+def test_decode_payloads_keeps_file_order(dbd, backend: DecodeBackend):
+    decoder = RowDecoder.compile(dbd, "0AB1C2D3")
+    jobs = []
+    for i in range(50):
+        name = f"Row{i}".encode()
+        jobs.append((decoder, name + b"\x00\x00" + struct.pack("<3fHbb", i, 0, 0, i, 0, 0)))
+        jobs.append((None, b"\x01\x02"))
+        jobs.append((decoder, b""))
+
+    results = decode_payloads(jobs, backend, max_workers=2)
+
+    assert len(results) == len(jobs)
+    assert [result["Flags"] for result in results[::3]] == list(range(50))
+    assert results[1::3] == [None] * 50
+    assert results[2::3] == [None] * 50
+
+    # batches sharing one pool decode the same
+    executor = create_executor(backend, max_workers=2)
+    try:
+        shared = [result for start in range(0, len(jobs), 40) for result in decode_payloads(jobs[start : start + 40], backend, 2, executor)]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    assert shared == results
+
+
+FIXED_DBD = """COLUMNS
+int ID
+float Position
+int Flags
+int Counts
+
+LAYOUT 1F2E3D4C
+$noninline,id$ID<32>
+Position[3]
+Flags<u16>
+Counts<8>[2]
+"""
+
+
+@dataclass
+class FakeEntry:
+    push_id: int
+    unique_id: int
+    record_id: int
+    data: bytes
+
+
+def test_columnar_decode_matches_rows(dbd):
+    np = pytest.importorskip("numpy")
+    from hotfixes.columnar import build_columnar_table, get_row_dtype
+
+    decoder = RowDecoder.compile(DBDefs().parse_dbd(FIXED_DBD), "1F2E3D4C")
+    assert get_row_dtype(decoder).itemsize == 16
+
+    entries = [FakeEntry(i, i, 100 + i, struct.pack("<3fHbb", i, 0.5, -i, i, -1, 1)) for i in range(10)]
+    entries.append(FakeEntry(10, 10, 110, struct.pack("<3fHbb", 10, 0.5, -10, 10, -1, 1) + b"\xff\xff"))  # trailing bytes
+    entries.append(FakeEntry(11, 11, 111, b"\x01"))  # too short to decode
+
+    table = build_columnar_table("DEADBEEF", "Fixed", decoder, entries)
+
+    assert len(table) == 11
+    assert table.columns["Position"].shape == (11, 3)
+    for i, record_id in enumerate(table.record_ids):
+        row = decoder.decode(next(entry.data for entry in entries if entry.record_id == record_id))
+        assert table.columns["Position"][i].tolist() == row["Position"]
+        assert table.columns["Flags"][i] == row["Flags"]
+        assert table.columns["Counts"][i].tolist() == row["Counts"]
+
+    string_table = build_columnar_table("0AB1C2D3", "Strings", RowDecoder.compile(dbd, "0AB1C2D3"), [
+        FakeEntry(1, 1, 1, b"A\x00B\x00" + struct.pack("<3fHbb", 1, 2, 3, 4, 5, 6)),
+    ])
+    assert string_table.columns["Name"].tolist() == ["A"]
+    assert np.allclose(string_table.columns["Position"][0], [1, 2, 3])
@@ -0,0 +1,53 @@
+import dataclasses
+
+from hotfixes.diff import DBCacheSnapshot, diff_dbcache, diff_fields
+from hotfixes.reader import DBCacheFilter
+from hotfixes.structures import RecordState
+
+from tests.synthetic import SyntheticEntry, random_entries, write_dbcache
+
+TABLE_HASHES = [0x919BE54E, 0xDF2F53CF]
+
+
+def key(entry: SyntheticEntry) -> tuple[int, int, int, int]:
+    return (entry.table_hash, entry.record_id, entry.push_id, entry.unique_id)
+
+
+def test_diff_dbcache(tmp_path):
+    old = random_entries(200, TABLE_HASHES, seed=3)
+    new = [dataclasses.replace(entry) for entry in old[10:]]  # the first 10 are removed
+    new[0].data = new[0].data + b"\x01"  # changed payload
+    new[1].status = RecordState.Delete if new[1].status != RecordState.Delete else RecordState.Valid  # changed status
+    added = [SyntheticEntry(99999, 50000 + i, TABLE_HASHES[0], i, RecordState.Valid, b"\x02" * i) for i in range(5)]
+    new.extend(added)
+
+    write_dbcache(str(tmp_path / "old.bin"), old)
+    write_dbcache(str(tmp_path / "new.bin"), new)
+    diff = diff_dbcache(str(tmp_path / "old.bin"), str(tmp_path / "new.bin"))
+
+    assert diff.removed == [key(entry) for entry in old[:10]]
+    assert diff.added == [key(entry) for entry in added]
+    assert diff.changed == [key(new[0]), key(new[1])]
+    assert diff.unchanged == 188
+
+    entry = diff.new.get_entry(key(new[0]))
+    assert (entry.unique_id, bytes(entry.data)) == (new[0].unique_id, new[0].data)
+    assert bytes(diff.old.get_entry(key(old[0])).data) == old[0].data
+
+
+def test_snapshot_applies_filter(tmp_path):
+    write_dbcache(str(tmp_path / "DBCache.bin"), random_entries(100, TABLE_HASHES, seed=4))
+    snapshot = DBCacheSnapshot.read(str(tmp_path / "DBCache.bin"), DBCacheFilter(table_hashes={TABLE_HASHES[1]}))
+
+    assert snapshot.entries and all(key[0] == TABLE_HASHES[1] for key in snapshot.entries)
+    for entry_key in snapshot.entries:
+        entry = snapshot.get_entry(entry_key)
+        assert (entry.table_hash, entry.record_id, entry.push_id, entry.unique_id) == entry_key
+
+
+def test_diff_fields():
+    old = {"Name": "Thunderfury", "Flags": [1, 2], "Level": 80}
+    new = {"Name": "Thunderfury", "Flags": [1, 3], "Quality": 5}
+
+    assert diff_fields(old, new) == {"Flags": ([1, 2], [1, 3]), "Level": (80, None), "Quality": (None, 5)}
+    assert diff_fields(None, {"Name": "A"}) == {"Name": (None, "A")}
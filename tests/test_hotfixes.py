@@ -11,3 +11,31 @@ def test_bytelist_from_str(input: str, expected: list[int]):
 @pytest.mark.parametrize("input,expected", [([75, 101, 121, 98, 111, 97, 114, 100, 84, 117, 114, 110, 101, 114], "KeyboardTurner")])
 def test_bytelist_to_str(input: list[int], expected: str):
     assert ByteList.from_list(input).to_str() == expected
+
+
+@pytest.mark.parametrize(
+    "input,unsigned,byteorder,expected",
+    [
+        (b"\x4e\xe5\x9b\x91", True, "little", 0x919BE54E),
+        (b"\xff\xff\xff\xff", False, "little", -1),
+        (b"\x00\x01", True, "big", 1),
+    ],
+)
+def test_bytelist_to_int(input: bytes, unsigned: bool, byteorder: str, expected: int):
+    assert ByteList.from_bytes(input, byteorder=byteorder).to_int(unsigned) == expected
+
+
+def test_bytelist_slices_are_views():
+    data = bytearray(b"\x00\x00\x80\x3fKeyboardTurner\x00")
+    byte_list = ByteList.from_bytes(data)
+
+    number, name = byte_list[:4], byte_list[4:-1]
+    assert number.to_float() == 1.0
+    assert name.to_str() == "KeyboardTurner"
+    assert byte_list.to_hex() == data.hex()
+
+    data[4] = ord("k")
+    assert name.to_str() == "keyboardTurner"
+
+    # iterating doesn't share any state between iterators
+    assert list(zip(name, name[1:]))[:2] == [(107, 101), (101, 121)]
@@ -0,0 +1,68 @@
+import asyncio
+
+from collections import Counter
+
+import httpx
+import pytest
+
+from hotfixes.httpcache import DiskCache
+
+from tests.conftest import FakeGitHub
+
+
+@pytest.fixture
+def server(make_server) -> FakeGitHub:
+    return make_server({"/manifest.json": b"[]", "/definitions/Map.dbd": b"COLUMNS\nint ID\n"})
+
+
+def test_fresh_entries_skip_the_network(tmp_path, server: FakeGitHub):
+    client = httpx.Client(base_url=server.url)
+    cache = DiskCache(str(tmp_path))
+
+    assert cache.get(client, "/manifest.json", "manifest.json") == b"[]"
+    # a new process, same cache directory
+    assert DiskCache(str(tmp_path)).get(client, "/manifest.json", "manifest.json") == b"[]"
+
+    assert server.responses == Counter({200: 1})
+    assert (tmp_path / "manifest.json").read_bytes() == b"[]"
+
+
+def test_stale_entries_are_revalidated(tmp_path, server: FakeGitHub):
+    client = httpx.Client(base_url=server.url)
+    cache = DiskCache(str(tmp_path), ttl=0)
+    url = "/definitions/Map.dbd"
+
+    first = cache.get(client, url, url)
+    assert cache.get(client, url, url) == first
+    assert server.responses == Counter({200: 1, 304: 1})
+
+    server.files[url] = b"COLUMNS\nint ID\nstring Directory\n"
+    assert cache.get(client, url, url) == server.files[url]
+    assert server.responses == Counter({200: 2, 304: 1})
+
+
+def test_async_revalidation(tmp_path, server: FakeGitHub):
+    cache = DiskCache(str(tmp_path), ttl=0)
+    url = "/definitions/Map.dbd"
+
+    async def get_twice():
+        async with httpx.AsyncClient(base_url=server.url) as client:
+            return [await cache.aget(client, url, url) for _ in range(2)]
+
+    assert asyncio.run(get_twice()) == [server.files[url]] * 2
+    assert server.responses == Counter({200: 1, 304: 1})
+
+
+def test_offline_and_unreachable(tmp_path, server: FakeGitHub):
+    client = httpx.Client(base_url=server.url)
+    DiskCache(str(tmp_path)).get(client, "/manifest.json", "manifest.json")
+
+    offline = DiskCache(str(tmp_path), ttl=0, offline=True)
+    assert offline.get(client, "/manifest.json", "manifest.json") == b"[]"
+    with pytest.raises(FileNotFoundError):
+        offline.get(client, "/definitions/Map.dbd", "definitions/Map.dbd")
+    assert server.responses == Counter({200: 1})
+
+    # stale entries are still served when the server can't be reached
+    unreachable = httpx.Client(base_url="http://127.0.0.1:1")
+    assert DiskCache(str(tmp_path), ttl=0).get(unreachable, "/manifest.json", "manifest.json") == b"[]"
@@ -0,0 +1,125 @@
+import struct
+from dataclasses import dataclass
+
+from hotfixes.layouts import LayoutCache
+
+LAYOUTS = {1572924: 0x0AB1C2D3, 1349477: 0xDEADBEEF}
+
+
+def make_db2_header(layout_hash: int) -> bytes:
+    schema = b"WDC5".ljust(128, b"\x00")
+    return struct.pack("<4sI128s6I", b"WDC5", 5, schema, 10, 4, 16, 0, 0x919BE54E, layout_hash) + bytes(64)
+
+
+@dataclass
+class FakeCascFile:
+    data: bytes
+
+
+class FakeCasc:
+    def __init__(self):
+        self.opened: list[int] = []
+
+    def read_file_by_id(self, fdid: int, flags: int = 0) -> FakeCascFile:
+        self.opened.append(fdid)
+        return FakeCascFile(make_db2_header(LAYOUTS[fdid]))
+
+
+def make_cache(casc: FakeCasc, path: str, build: str = "11.0.2.55000") -> LayoutCache:
+    return LayoutCache("wow", build, lambda fdid: casc.read_file_by_id(fdid).data, path)
+
+
+def test_layout_cache_opens_each_table_once_per_build(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    casc = FakeCasc()
+
+    cache = make_cache(casc, path)
+    cache.prefetch([1572924, 1349477, 1572924])
+    for _ in range(100):
+        assert cache.get(1572924) == "0AB1C2D3"
+        assert cache.get(1349477) == "DEADBEEF"
+    assert sorted(casc.opened) == [1349477, 1572924]
+
+    # a fresh process for the same build is served entirely from disk
+    assert make_cache(casc, path).get(1572924) == "0AB1C2D3"
+    assert len(casc.opened) == 2
+
+    # a new build has to look again
+    assert make_cache(casc, path, "11.0.2.55001").get(1572924) == "0AB1C2D3"
+    assert len(casc.opened) == 3
+
+
+def test_layout_cache_remembers_missing_files(tmp_path):
+    opened = []
+
+    def read_header(fdid: int):
+        opened.append(fdid)
+        return None
+
+    cache = LayoutCache("wow", "11.0.2.55000", read_header, str(tmp_path / "layouts.json"))
+    assert cache.get(0) is None
+    assert cache.get(123) is None
+    assert cache.get(123) is None
+    assert opened == [123]
+
+
+def test_layout_cache_retries_failed_reads_next_run(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    casc = FakeCasc()
+    failing = True
+
+    def read_header(fdid: int):
+        if failing:
+            return None
+        return casc.read_file_by_id(fdid).data
+
+    cache = LayoutCache("wow", "11.0.2.55000", read_header, path)
+    assert cache.get(1572924) is None
+    cache.prefetch([1349477])
+
+    failing = False
+    cache = LayoutCache("wow", "11.0.2.55000", read_header, path)
+    assert cache.get(1572924) == "0AB1C2D3"
+    assert cache.get(1349477) == "DEADBEEF"
+
+
+def test_layout_cache_save_keeps_other_processes_entries(tmp_path):
+    path = str(tmp_path / "layouts.json")
+    casc = FakeCasc()
+
+    # both load the file before either saves
+    first = make_cache(casc, path)
+    second = make_cache(casc, path)
+    other_build = make_cache(casc, path, "11.0.2.55001")
+
+    assert first.get(1572924) == "0AB1C2D3"
+    assert other_build.get(1572924) == "0AB1C2D3"
+    assert second.get(1349477) == "DEADBEEF"
+
+    fresh_casc = FakeCasc()
+    assert make_cache(fresh_casc, path).get(1572924) == "0AB1C2D3"
+    assert make_cache(fresh_casc, path).get(1349477) == "DEADBEEF"
+    assert make_cache(fresh_casc, path, "11.0.2.55001").get(1572924) == "0AB1C2D3"
+    assert fresh_casc.opened == []
+
+
+def test_layout_cache_does_not_hold_the_lock_while_reading(tmp_path):
+    import threading
+
+    casc = FakeCasc()
+    answered = []
+
+    def read_header(fdid: int):
+        if fdid == 1349477:
+            # another thread asking for a table that's already cached mustn't wait on this read
+            reader = threading.Thread(target=lambda: answered.append(cache.get(1572924)))
+            reader.start()
+            reader.join(timeout=5)
+        return casc.read_file_by_id(fdid).data
+
+    cache = LayoutCache("wow", "11.0.2.55000", read_header, str(tmp_path / "layouts.json"))
+    cache.get(1572924)
+    cache.prefetch([1349477])
+
+    assert answered == ["0AB1C2D3"]
+    assert cache.get(1349477) == "DEADBEEF"
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+
+from hotfixes.localdefs import LocalDefinitions
+
+from tests.synthetic import write_definitions_checkout
+
+
+class FakeFallback:
+    def __init__(self):
+        self.requested: list[str] = []
+
+    def get(self, client, url: str, key: str) -> bytes:
+        self.requested.append(key)
+        return b"COLUMNS\nint ID\n"
+
+    async def aget(self, client, url: str, key: str) -> bytes:
+        return self.get(client, url, key)
+
+
+def test_local_definitions_reads_on_demand(tmp_path, monkeypatch):
+    dbdefs_path = str(tmp_path / "WoWDBDefs")
+    tbl_names = write_definitions_checkout(dbdefs_path, 50)
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda path, *args, **kwargs: opened.append(path) or real_open(path, *args, **kwargs))
+
+    local = LocalDefinitions(dbdefs_path)
+    assert opened == []
+    assert f"/definitions/{tbl_names[3]}.dbd" in local
+    assert "manifest.json" in local
+
+    body = local.get(None, "", f"/definitions/{tbl_names[3]}.dbd")  # type: ignore
+    assert body.startswith(b"COLUMNS\n")
+    assert len(opened) == 1
+
+
+def test_local_definitions_falls_back_for_missing_tables(tmp_path):
+    dbdefs_path = str(tmp_path / "WoWDBDefs")
+    write_definitions_checkout(dbdefs_path, 2)
+
+    fallback = FakeFallback()
+    local = LocalDefinitions(dbdefs_path, fallback)  # type: ignore
+    assert local.get(None, "", "/definitions/Missing.dbd") == b"COLUMNS\nint ID\n"  # type: ignore
+    assert asyncio.run(local.aget(None, "", "/definitions/Table0001.dbd")).startswith(b"COLUMNS\n")  # type: ignore
+    assert fallback.requested == ["/definitions/Missing.dbd"]
+
+    with pytest.raises(FileNotFoundError):
+        LocalDefinitions(dbdefs_path).get(None, "", "/definitions/Missing.dbd")  # type: ignore
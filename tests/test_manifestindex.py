@@ -0,0 +1,40 @@
+import json
+import pytest
+
+from hotfixes.manifestindex import ManifestIndex, load_manifest_index
+
+MANIFEST = [
+    {"tableName": "SpellName", "tableHash": "3BA1AF8D", "db2FileDataID": 1990283},
+    {"tableName": "ItemSparse", "tableHash": "919BE54E", "db2FileDataID": 1572924},
+    {"tableName": "Unshipped", "tableHash": "0000ABCD"},
+]
+
+
+def test_manifest_index_lookups():
+    index = ManifestIndex.from_manifest(MANIFEST)
+
+    assert index.hash_to_name["919BE54E"] == "ItemSparse"
+    assert index.name_to_hash["itemsparse"] == "919BE54E"
+    assert index.name_to_fdid["spellname"] == 1990283
+    assert index.fdid_to_name[1572924] == "ItemSparse"
+    assert "unshipped" in index.name_to_hash and "unshipped" not in index.name_to_fdid
+
+    with pytest.raises(TypeError):
+        index.hash_to_name["DEADBEEF"] = "Nope"  # type: ignore
+
+
+def test_manifest_index_is_reused_across_runs(tmp_path, monkeypatch):
+    path = str(tmp_path / "manifest-index.pickle")
+    raw_manifest = json.dumps(MANIFEST).encode()
+    first = load_manifest_index(raw_manifest, path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("manifest.json was parsed again")
+
+    with monkeypatch.context() as m:
+        m.setattr("hotfixes.manifestindex.json.loads", fail)
+        assert load_manifest_index(raw_manifest, path) == first
+
+    # a different manifest can't be served from the old index
+    changed = json.dumps(MANIFEST[:1]).encode()
+    assert len(load_manifest_index(changed, path).rows) == 1
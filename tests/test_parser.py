@@ -0,0 +1,337 @@
+import struct
+import random
+import dataclasses
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pycasclib")
+
+from hotfixes.dbdefs import DBDefs  # noqa: E402
+from hotfixes.decoder import RowDecoder  # noqa: E402
+from hotfixes.parser import Hotfix, HotfixCollection, ColumnarHotfixCollection, LazyHotfix  # noqa: E402
+from hotfixes.structures import RecordState  # noqa: E402
+
+from tests.test_decoder import TEST_DBD  # noqa: E402
+
+
+class CountingLoader:
+    def __init__(self, decoder):
+        self.decoder = decoder
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.decoder
+
+
+def make_lazy_hotfix(payload: bytes, loader: CountingLoader) -> LazyHotfix:
+    return LazyHotfix(1234, 1, "0AB1C2D3", "Test", RecordState.Valid, 42, memoryview(payload), loader)
+
+
+def test_lazy_hotfix_decodes_once_on_access():
+    decoder = RowDecoder.compile(DBDefs().parse_dbd(TEST_DBD), "0AB1C2D3")
+    loader = CountingLoader(decoder)
+    hotfix = make_lazy_hotfix(b"Turner\x00Keyboard\x00" + struct.pack("<3fHbb", 1, 2, 3, 4, 5, 6), loader)
+
+    assert (hotfix.PushID, hotfix.TableName, hotfix.RecordID, hotfix.Status) == (1234, "Test", 42, RecordState.Valid)
+    assert loader.calls == 0 and not hotfix.is_decoded
+
+    assert hotfix.Data["Name"] == "Turner"  # type: ignore
+    assert hotfix.Data["Counts"] == [5, 6]  # type: ignore
+    assert loader.calls == 1 and hotfix.is_decoded
+
+    assert dataclasses.asdict(hotfix)["Data"]["Flags"] == 4
+
+
+def test_lazy_hotfix_without_data():
+    loader = CountingLoader(None)
+    empty = make_lazy_hotfix(b"", loader)
+    assert empty.Data is None
+    assert loader.calls == 0
+
+    undecodable = make_lazy_hotfix(b"\x01\x02", loader)
+    assert undecodable.Data is None
+    assert loader.calls == 1
+
+
+def make_hotfixes(count: int) -> list[Hotfix]:
+    rng = random.Random(0)
+    tables = [("919BE54E", "ItemSparse"), ("3BA1AF8D", "SpellName"), ("DF2F53CF", "Map")]
+    hotfixes = []
+    for unique_id in range(count):
+        tbl_hash, tbl_name = rng.choice(tables)
+        status = rng.choice(list(RecordState))
+        data = {"ID": unique_id, "Name": f"Record {unique_id}", "Flags": [1, 2]} if status == RecordState.Valid else None
+        hotfixes.append(Hotfix(rng.randint(1, 10**6), unique_id, tbl_hash, tbl_name, status, rng.randint(1, 10**5), data))
+
+    return hotfixes
+
+
+def test_hotfixes_are_slotted():
+    hotfix = make_hotfixes(1)[0]
+    lazy = make_lazy_hotfix(b"", CountingLoader(None))
+
+    assert not hasattr(hotfix, "__dict__")
+    assert not hasattr(lazy, "__dict__")
+
+
+def test_columnar_collection_round_trip():
+    hotfixes = make_hotfixes(500)
+    columnar = ColumnarHotfixCollection.from_hotfixes(HotfixCollection(9, "XFTH", hotfixes, 55000))
+
+    assert len(columnar) == 500
+    assert (columnar.DBCacheVersion, columnar.HeaderMagic, columnar.BuildId) == (9, "XFTH", 55000)
+    assert [view.to_hotfix() for view in columnar] == hotfixes
+    assert columnar[-1].to_hotfix() == hotfixes[-1]
+    assert columnar[7].Status == hotfixes[7].Status and columnar[7].Data == hotfixes[7].Data
+    assert len(columnar.tables) == 3
+
+    with pytest.raises(IndexError):
+        columnar[500]
+
+
+def test_columnar_collection_pads_new_columns():
+    columnar = ColumnarHotfixCollection(9, "XFTH", 55000)
+    columnar.add(1, 1, "919BE54E", "ItemSparse", RecordState.Valid, 10, {"ID": 10})
+    columnar.add(2, 2, "919BE54E", "ItemSparse", RecordState.Valid, 11, {"ID": 11, "Name": "Thunderfury"})
+
+    assert columnar[0].Data == {"ID": 10, "Name": None}
+    assert columnar[1].Data == {"ID": 11, "Name": "Thunderfury"}
+
+
+def test_columnar_collection_is_smaller():
+    hotfixes = make_hotfixes(20_000)
+    collection = HotfixCollection(9, "XFTH", hotfixes, 55000)
+
+    tracemalloc.start()
+    columnar = ColumnarHotfixCollection.from_hotfixes(collection)
+    columnar_size = tracemalloc.get_traced_memory()[0]
+
+    before = tracemalloc.get_traced_memory()[0]
+    copied = [dataclasses.replace(hotfix, Data=dict(hotfix.Data) if hotfix.Data else None) for hotfix in hotfixes]
+    objects_size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    assert len(copied) == len(columnar)
+    assert columnar_size < objects_size / 2
+
+
+def make_synthetic_parser(tmp_path, monkeypatch, missing_definitions=()):
+    from hotfixes.dbdefs import Manifest
+    from hotfixes.parser import HotfixParser, Flavor
+    from hotfixes.structures import DBCACHE_V9
+    from tests.synthetic import FakeCasc, iter_table_entries, make_tables, write_game_install, write_table_checkout
+
+    monkeypatch.setattr("hotfixes.dbdefs.LAYOUT_CACHE_FILE", str(tmp_path / "layouts.json"))
+    monkeypatch.setattr(Manifest, "_Manifest__index", None)
+
+    tables = make_tables(8, seed=1)
+    write_table_checkout(str(tmp_path / "WoWDBDefs"), tables)
+    write_game_install(str(tmp_path / "game"), iter_table_entries(tables, 300, seed=1))
+    for tbl_name in missing_definitions:
+        (tmp_path / "WoWDBDefs" / "definitions" / f"{tbl_name}.dbd").unlink()
+
+    return HotfixParser(
+        str(tmp_path / "game"),
+        Flavor.Live,
+        DBCACHE_V9,
+        dbdefs_path=str(tmp_path / "WoWDBDefs"),
+        use_mmap=True,
+        offline=True,
+        casc_handle=FakeCasc(tables),  # type: ignore
+    )
+
+
+@pytest.fixture
+def synthetic_parser(tmp_path, monkeypatch):
+    return make_synthetic_parser(tmp_path, monkeypatch)
+
+
+def test_get_hotfixes_end_to_end(synthetic_parser):
+    hotfixes = synthetic_parser.get_hotfixes().Hotfixes
+    valid = [hotfix for hotfix in hotfixes if hotfix.Status == RecordState.Valid]
+
+    assert len(hotfixes) == 300
+    assert valid and all(hotfix.Data is not None for hotfix in valid)
+    assert all(hotfix.TableName.startswith("Synthetic") for hotfix in hotfixes)
+
+    lazy = synthetic_parser.get_hotfixes(lazy=True).Hotfixes
+    compact = synthetic_parser.get_compact_hotfixes()
+    assert [dataclasses.asdict(hotfix) for hotfix in lazy] == [dataclasses.asdict(hotfix) for hotfix in hotfixes]
+    assert [view.to_hotfix() for view in compact] == hotfixes
+
+
+def test_each_db2_is_opened_once_per_build(tmp_path, monkeypatch):
+    from collections import Counter
+
+    from tests.synthetic import make_tables
+
+    parser = make_synthetic_parser(tmp_path, monkeypatch)
+    parser.get_hotfixes()
+    parser.get_hotfixes(lazy=True)
+    parser.get_compact_hotfixes()
+
+    fdids = {table.name: table.db2_fdid for table in make_tables(8, seed=1)}
+    touched = {fdids[hotfix.TableName] for hotfix in parser.get_hotfixes().Hotfixes}
+    assert Counter(parser.casc.opened) == Counter(touched)
+
+    # another parser on the same build reads every layout from the cache file
+    again = make_synthetic_parser(tmp_path, monkeypatch)
+    again.get_hotfixes()
+    assert again.casc.opened == []
+
+
+def test_get_hotfixes_offline_with_a_definition_missing(tmp_path, monkeypatch):
+    from hotfixes.utils import LRUCache
+
+    # earlier tests leave the same synthetic tables' definitions and decoders in the module caches
+    monkeypatch.setattr("hotfixes.dbdefs.DBD_CACHE", {})
+    monkeypatch.setattr("hotfixes.dbdefs.PARSED_DBD_CACHE", LRUCache(1))
+    monkeypatch.setattr("hotfixes.decoder.DECODER_CACHE", {})
+    parser = make_synthetic_parser(tmp_path, monkeypatch, missing_definitions=["Synthetic000"])
+    hotfixes = parser.get_hotfixes().Hotfixes
+
+    assert len(hotfixes) == 300
+    assert all(hotfix.Data is None for hotfix in hotfixes if hotfix.TableName == "Synthetic000")
+    assert any(hotfix.Data for hotfix in hotfixes if hotfix.TableName != "Synthetic000")
+
+
+def test_compact_hotfixes_share_one_pool(synthetic_parser, monkeypatch):
+    import hotfixes.parser
+
+    created = []
+
+    def create_executor(backend, max_workers=None):
+        executor = hotfixes.decoder.create_executor(backend, max_workers)
+        created.append(executor)
+        return executor
+
+    monkeypatch.setattr(hotfixes.parser, "COMPACT_BATCH_SIZE", 50)
+    monkeypatch.setattr(hotfixes.parser, "create_executor", create_executor)
+
+    compact = synthetic_parser.get_compact_hotfixes()
+    assert [view.to_hotfix() for view in compact] == synthetic_parser.get_hotfixes().Hotfixes
+    assert len(created) == 1
+
+
+def test_filter_by_unknown_table(synthetic_parser):
+    from tests.synthetic import SyntheticEntry, iter_table_entries, make_tables, write_dbcache
+
+    entries = list(iter_table_entries(make_tables(8, seed=1), 300, seed=1))
+    unknown = [SyntheticEntry(1, 1000 + i, 0x7FFFFF00 + i, i, RecordState.Valid, b"\x01\x02") for i in range(3)]
+    write_dbcache(synthetic_parser.dbcache_path, entries + unknown, build_id=1)
+
+    hotfixes = synthetic_parser.get_hotfixes(filter="Unknown").Hotfixes
+    assert [hotfix.UniqueID for hotfix in hotfixes] == [1000, 1001, 1002]
+    assert all(hotfix.TableName == "Unknown" and hotfix.Data is None for hotfix in hotfixes)
+
+    mixed = synthetic_parser.get_hotfixes(filter=["Unknown", "Synthetic001"]).Hotfixes
+    assert {hotfix.TableName for hotfix in mixed} == {"Unknown", "Synthetic001"}
+    assert len(mixed) == 3 + sum(1 for hotfix in synthetic_parser.get_hotfixes().Hotfixes if hotfix.TableName == "Synthetic001")
+
+
+def test_get_hotfixes_with_column_projection(synthetic_parser):
+    full = synthetic_parser.get_hotfixes().Hotfixes
+    table = next(hotfix for hotfix in full if hotfix.Data).TableName
+    columns = {table: list(next(hotfix for hotfix in full if hotfix.Data and hotfix.TableName == table).Data)[-1:]}
+
+    def project(hotfix):
+        if hotfix.Data is None or hotfix.TableName != table:
+            return hotfix.Data
+        return {column: hotfix.Data[column] for column in columns[table]}
+
+    expected = [project(hotfix) for hotfix in full]
+    assert [hotfix.Data for hotfix in synthetic_parser.get_hotfixes(columns=columns).Hotfixes] == expected
+    assert [hotfix.Data for hotfix in synthetic_parser.get_hotfixes(lazy=True, columns=columns).Hotfixes] == expected
+    assert [hotfix.Data for hotfix in synthetic_parser.iter_hotfixes(columns=columns)] == expected
+    assert [view.Data for view in synthetic_parser.get_compact_hotfixes(columns=columns)] == expected
+
+
+def test_export_sqlite(synthetic_parser, tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "hotfixes.db")
+    hotfixes = synthetic_parser.get_hotfixes().Hotfixes
+
+    assert synthetic_parser.export_sqlite(path) == len({hotfix.UniqueID for hotfix in hotfixes})
+    assert synthetic_parser.export_sqlite(path) == 0
+
+    connection = sqlite3.connect(path)
+    valid = [hotfix for hotfix in hotfixes if hotfix.Data is not None]
+    tables = {hotfix.TableName for hotfix in valid}
+    assert sum(connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables) == len(valid)
+    connection.close()
+
+
+def test_resolve_hotfixes(synthetic_parser):
+    hotfixes = synthetic_parser.get_hotfixes().Hotfixes
+    resolver = synthetic_parser.resolve_hotfixes()
+
+    winners = {}
+    for hotfix in sorted(hotfixes, key=lambda hotfix: hotfix.PushID):  # stable, so file order breaks ties
+        winners[(hotfix.TableHash, hotfix.RecordID)] = hotfix
+
+    assert len(resolver) == len(winners)
+    for (tbl_hash, record_id), hotfix in winners.items():
+        assert dataclasses.asdict(resolver.get_winner(tbl_hash, record_id)) == dataclasses.asdict(hotfix)
+
+
+def test_diff_hotfixes(synthetic_parser, tmp_path):
+    from tests.synthetic import iter_table_entries, make_tables, write_dbcache
+
+    # the same tables and entries the fixture wrote
+    tables = make_tables(8, seed=1)
+    entries = list(iter_table_entries(tables, 300, seed=1))
+    columns = {table.table_hash: table for table in tables if table.columns}
+    valid = [i for i, entry in enumerate(entries) if entry.status == RecordState.Valid and entry.table_hash in columns]
+
+    old = [dataclasses.replace(entry) for entry in entries[:-5]]  # the last 5 are new
+    old.append(dataclasses.replace(entries[0], unique_id=10**6))  # removed since
+    old[valid[0]].data = columns[old[valid[0]].table_hash].make_payload(random.Random(99))  # changed since
+    write_dbcache(str(tmp_path / "old.bin"), old)
+
+    diff = synthetic_parser.diff_hotfixes(str(tmp_path / "old.bin"))
+    current = synthetic_parser.get_hotfixes().Hotfixes
+
+    assert [hotfix.UniqueID for hotfix in diff.added] == [entry.unique_id for entry in entries[-5:]]
+    assert [hotfix.UniqueID for hotfix in diff.removed] == [10**6]
+    assert len(diff.changed) == 1 and diff.unchanged == 294
+
+    change = diff.changed[0]
+    assert change.new == current[valid[0]]
+    assert change.fields and all(change.old.Data[column] != change.new.Data[column] for column in change.fields)
+
+
+def test_get_merged_table(synthetic_parser, tmp_path):
+    from tests.synthetic import build_wdc5, make_tables
+
+    hotfixes = synthetic_parser.get_hotfixes().Hotfixes
+    resolver = synthetic_parser.resolve_hotfixes()
+    tbl_name = next(hotfix.TableName for hotfix in hotfixes if hotfix.Status == RecordState.Valid and hotfix.Data)
+    table = next(table for table in make_tables(8, seed=1) if table.name == tbl_name)
+
+    rng = random.Random(5)
+    hotfixed = [record_id for record_id in resolver.get_records(tbl_name)]
+    rows = [(record_id, table.make_row(rng)) for record_id in [*hotfixed, 10**6, 10**6 + 1]]
+    path = tmp_path / f"{tbl_name}.db2"
+    path.write_bytes(build_wdc5(table, rows, section_count=2))
+
+    merged = synthetic_parser.get_merged_table(tbl_name, resolver, str(path))
+    for record_id, row in rows:
+        hotfix = resolver.lookup(tbl_name, record_id)
+        if hotfix is None:
+            assert merged[record_id] == row
+        elif hotfix.Status == RecordState.Valid:
+            assert merged[record_id] == hotfix.Data
+        else:
+            assert record_id not in merged
+
+    assert merged[10**6] == rows[-2][1]
+    assert synthetic_parser.get_merged_table(tbl_name, db2_path=str(path))[10**6] == rows[-2][1]
+
+
+def test_injected_casc_handle_is_left_open(synthetic_parser):
+    casc = synthetic_parser.casc
+    synthetic_parser.__del__()
+    assert not casc.closed
@@ -0,0 +1,38 @@
+import asyncio
+
+from collections import Counter
+
+import pytest
+
+from hotfixes.prefetch import DefinitionsPrefetcher, prefetch_definitions
+
+from tests.conftest import FakeGitHub
+
+DEFINITIONS = {f"Table{i}": f"COLUMNS\nint ID{i}\n" for i in range(20)}
+
+
+@pytest.fixture
+def server(make_server) -> FakeGitHub:
+    return make_server({f"/definitions/{tbl_name}.dbd": body.encode() for tbl_name, body in DEFINITIONS.items()}, delay=0.05)
+
+
+def test_prefetch_fetches_each_table_once_within_limit(server: FakeGitHub):
+    tbl_names = [*DEFINITIONS, "Table0", "Table1", "Missing"]
+
+    definitions = asyncio.run(prefetch_definitions(server.url, tbl_names, concurrency=4))
+
+    assert definitions == DEFINITIONS
+    assert all(count == 1 for count in server.requests.values())
+    assert len(server.requests) == len(DEFINITIONS) + 1
+    assert 1 < server.max_active <= 4
+
+
+def test_concurrent_fetches_share_one_request(server: FakeGitHub):
+    async def fetch_concurrently():
+        async with DefinitionsPrefetcher(server.url) as prefetcher:
+            return await asyncio.gather(*[prefetcher.fetch("Table3") for _ in range(10)])
+
+    results = asyncio.run(fetch_concurrently())
+
+    assert results == [DEFINITIONS["Table3"]] * 10
+    assert server.requests == Counter({"/definitions/Table3.dbd": 1})
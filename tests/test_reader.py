@@ -0,0 +1,191 @@
+import pytest
+
+from hotfixes.reader import (
+    RELEASE_INTERVAL,
+    DBCacheFilter,
+    DBCacheCheckpoint,
+    map_dbcache,
+    read_dbcache_mmap,
+    read_dbcache_since,
+    read_dbcache_header,
+    iter_dbcache_entries,
+)
+from hotfixes.structures import DBCACHE_V9, RecordState
+
+from tests.synthetic import (
+    SyntheticEntry,
+    random_entries,
+    iter_random_entries,
+    write_dbcache,
+    build_dbcache,
+    pack_dbcache_entry,
+)
+
+
+@pytest.fixture
+def dbcache_path(tmp_path):
+    path = tmp_path / "DBCache.bin"
+    write_dbcache(str(path), random_entries(200, [0x919BE54E, 0xDF2F53CF]))
+    return str(path)
+
+
+def test_mmap_reader_matches_construct(dbcache_path: str):
+    with open(dbcache_path, "rb") as f:
+        expected = DBCACHE_V9.STRUCT_DBCACHE_FILE.parse(f.read())
+
+    dbcache = read_dbcache_mmap(dbcache_path)
+
+    assert dbcache.header.build_id == expected.header.build_id
+    assert dbcache.header.verification_hash == list(expected.header.verification_hash)
+    assert len(dbcache.entries) == len(expected.entries)
+    for entry, expected_entry in zip(dbcache.entries, expected.entries):
+        assert isinstance(entry.data, memoryview)
+        assert (entry.push_id, entry.unique_id, entry.table_hash, entry.record_id) == (
+            expected_entry.push_id,
+            expected_entry.unique_id,
+            expected_entry.table_hash,
+            expected_entry.record_id,
+        )
+        assert entry.status == RecordState[expected_entry.status]
+        assert list(entry.data) == list(expected_entry.data)
+
+
+def test_mmap_reader_stops_at_truncated_entry(tmp_path):
+    entry = SyntheticEntry(1, 1, 0x919BE54E, 1, RecordState.Valid, b"\x01\x02\x03\x04")
+    path = tmp_path / "DBCache.bin"
+    path.write_bytes(build_dbcache([entry, entry])[:-2])
+
+    dbcache = read_dbcache_mmap(str(path))
+    assert len(dbcache.entries) == 1
+
+
+def test_mmap_reader_rejects_empty_file(tmp_path):
+    path = tmp_path / "DBCache.bin"
+    path.write_bytes(b"")
+
+    with pytest.raises(ValueError):
+        read_dbcache_header(b"")
+    with pytest.raises(ValueError):
+        read_dbcache_mmap(str(path))
+
+
+def test_streaming_peak_rss_is_bounded(tmp_path):
+    """Walks a synthetic 1M-entry DBCache (~40 MB) the way `HotfixParser.iter_hotfixes` does.
+
+    Materializing it with `read_dbcache_mmap` costs several hundred MB of entry objects, streaming
+    with `release_consumed` should stay within a couple of release intervals of where it started.
+    """
+    psutil = pytest.importorskip("psutil")
+
+    path = tmp_path / "DBCache.bin"
+    write_dbcache(str(path), iter_random_entries(1_000_000, [0x919BE54E, 0xDF2F53CF], max_data_size=48))
+
+    process = psutil.Process()
+    baseline_rss = process.memory_info().rss
+    peak_rss = baseline_rss
+
+    buffer = map_dbcache(str(path))
+    count = 0
+    for entry in iter_dbcache_entries(buffer, release_consumed=True):
+        count += 1
+        if count % 50_000 == 0:
+            peak_rss = max(peak_rss, process.memory_info().rss)
+
+    assert count == 1_000_000
+    assert peak_rss - baseline_rss < 3 * RELEASE_INTERVAL
+
+
+def test_read_since_only_returns_appended_entries(tmp_path):
+    path = str(tmp_path / "DBCache.bin")
+    entries = random_entries(30, [0x919BE54E])
+    write_dbcache(path, entries[:20])
+
+    dbcache, checkpoint, resumed = read_dbcache_since(path)
+    assert not resumed
+    assert [entry.unique_id for entry in dbcache.entries] == list(range(20))
+
+    # the client appends while it runs, including a half-written entry at the end
+    with open(path, "ab") as f:
+        for entry in entries[20:]:
+            f.write(pack_dbcache_entry(entry))
+        f.write(pack_dbcache_entry(entries[0])[:10])
+
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    checkpoint.save(checkpoint_path)
+    dbcache, checkpoint, resumed = read_dbcache_since(path, DBCacheCheckpoint.load(checkpoint_path))
+    assert resumed
+    assert [entry.unique_id for entry in dbcache.entries] == list(range(20, 30))
+
+    dbcache, _, resumed = read_dbcache_since(path, checkpoint)
+    assert resumed
+    assert dbcache.entries == []
+
+
+@pytest.mark.parametrize("rewrite", ["new_build", "truncated"])
+def test_read_since_falls_back_to_full_read(tmp_path, rewrite: str):
+    path = str(tmp_path / "DBCache.bin")
+    entries = random_entries(20, [0x919BE54E])
+    write_dbcache(path, entries)
+    _, checkpoint, _ = read_dbcache_since(path)
+
+    if rewrite == "new_build":
+        write_dbcache(path, entries[:5], build_id=55000)
+    else:
+        write_dbcache(path, entries[:5])
+
+    dbcache, _, resumed = read_dbcache_since(path, checkpoint)
+    assert not resumed
+    assert [entry.unique_id for entry in dbcache.entries] == list(range(5))
+
+
+def test_read_since_detects_a_rewrite_with_the_same_header(tmp_path):
+    path = str(tmp_path / "DBCache.bin")
+    entries = random_entries(20, [0x919BE54E])
+    write_dbcache(path, entries[:10])
+    _, checkpoint, _ = read_dbcache_since(path)
+
+    # same build and verification hash, no shorter, but different entries before the checkpoint
+    write_dbcache(path, entries[10:] + entries[:10])
+
+    dbcache, _, resumed = read_dbcache_since(path, checkpoint)
+    assert not resumed
+    assert [entry.unique_id for entry in dbcache.entries] == list(range(10, 20)) + list(range(10))
+
+
+def test_read_since_restarts_with_a_different_filter(tmp_path):
+    path = str(tmp_path / "DBCache.bin")
+    entries = random_entries(20, [0x919BE54E, 0xDF2F53CF])
+    write_dbcache(path, entries)
+    table_filter = DBCacheFilter(table_hashes={0x919BE54E})
+
+    _, checkpoint, _ = read_dbcache_since(path, entry_filter=table_filter)
+    _, _, resumed = read_dbcache_since(path, checkpoint, DBCacheFilter(table_hashes={0x919BE54E}))
+    assert resumed
+
+    other_filter = DBCacheFilter(table_hashes={0xDF2F53CF})
+    dbcache, _, resumed = read_dbcache_since(path, checkpoint, other_filter)
+    assert not resumed
+    assert [entry.unique_id for entry in dbcache.entries] == [entry.unique_id for entry in entries if entry.table_hash == 0xDF2F53CF]
+
+
+@pytest.mark.parametrize(
+    "entry_filter",
+    [
+        DBCacheFilter(table_hashes={0xDF2F53CF}),
+        DBCacheFilter(push_ids=[(1, 1000), (500_000, 600_000)]),
+        DBCacheFilter(record_ids={1, 2, 3, 250_000}, statuses={RecordState.Delete, RecordState.Valid}),
+        DBCacheFilter(table_hashes={0x919BE54E}, statuses={RecordState.Valid}, skip_cached=True),
+        DBCacheFilter(table_hashes=set()),
+    ],
+)
+def test_filter_pushdown_matches_post_filtering(dbcache_path: str, entry_filter: DBCacheFilter):
+    everything = read_dbcache_mmap(dbcache_path).entries
+    expected = [entry.unique_id for entry in everything if entry_filter.matches_entry(entry)]
+
+    filtered = read_dbcache_mmap(dbcache_path, entry_filter).entries
+    assert [entry.unique_id for entry in filtered] == expected
+
+    # skipped entries still count towards where the next incremental read resumes
+    _, checkpoint, _ = read_dbcache_since(dbcache_path, entry_filter=entry_filter)
+    _, full_checkpoint, _ = read_dbcache_since(dbcache_path)
+    assert checkpoint.offset == full_checkpoint.offset
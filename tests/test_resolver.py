@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from hotfixes.resolver import HotfixResolver
+from hotfixes.structures import RecordState
+
+
+@dataclass
+class FakeHotfix:
+    PushID: int
+    UniqueID: int
+    TableHash: str
+    TableName: str
+    Status: RecordState
+    RecordID: int
+    Data: Optional[dict[str, Any]] = None
+
+
+def make_hotfix(push_id: int, unique_id: int, record_id: int, status: RecordState = RecordState.Valid) -> FakeHotfix:
+    data = {"Name": f"push {push_id}"} if status == RecordState.Valid else None
+    return FakeHotfix(push_id, unique_id, "919BE54E", "ItemSparse", status, record_id, data)
+
+
+def test_highest_push_wins():
+    resolver = HotfixResolver([make_hotfix(10, 1, 100), make_hotfix(12, 2, 100), make_hotfix(11, 3, 100)])
+
+    assert resolver.lookup("919BE54E", 100).PushID == 12
+    assert resolver.get_data("ItemSparse", 100) == {"Name": "push 12"}
+    assert len(resolver) == 1
+    assert resolver.tables == ["919BE54E"]
+
+
+def test_same_push_takes_the_last_entry():
+    resolver = HotfixResolver([make_hotfix(10, 1, 100), make_hotfix(10, 2, 100, RecordState.Delete)])
+
+    assert resolver.is_deleted("ItemSparse", 100)
+    assert resolver.get_data("ItemSparse", 100) is None
+
+
+def test_cached_entries_lose_to_pushes():
+    resolver = HotfixResolver([make_hotfix(5, 1, 100), make_hotfix(-1, 2, 100)])
+    assert resolver.lookup("ItemSparse", 100).PushID == 5
+
+
+def test_invalid_and_not_public_revert_to_source():
+    resolver = HotfixResolver([make_hotfix(10, 1, 100), make_hotfix(11, 2, 100, RecordState.Invalid)])
+    resolver.update([make_hotfix(10, 3, 101), make_hotfix(11, 4, 101, RecordState.NotPublic)])
+
+    for record_id in (100, 101):
+        assert resolver.lookup("ItemSparse", record_id) is None
+        assert resolver.get_winner("ItemSparse", record_id).PushID == 11
+        assert not resolver.is_deleted("ItemSparse", record_id)
+    assert list(resolver.iter_table("ItemSparse")) == []
+
+
+def test_incremental_updates():
+    resolver = HotfixResolver([make_hotfix(10, 1, 100), make_hotfix(10, 2, 101)])
+
+    assert resolver.update([make_hotfix(9, 3, 100), make_hotfix(13, 4, 101), make_hotfix(13, 5, 102)]) == 2
+    assert [hotfix.UniqueID for hotfix in resolver.iter_table("919BE54E")] == [1, 4, 5]
+    assert resolver.lookup("Unknown", 100) is None
@@ -0,0 +1,114 @@
+import os
+import json
+import pytest
+
+from hotfixes.manifestindex import ManifestIndex
+from hotfixes.schemastore import SCHEMA_STORES, SchemaStore, open_schema_store
+
+MANIFEST = [{"tableName": "SpellName", "tableHash": "3BA1AF8D", "db2FileDataID": 1990283}]
+
+
+class CountingParser:
+    def __init__(self):
+        self.parsed: list[str] = []
+
+    def __call__(self, dbd: str) -> dict[str, str]:
+        self.parsed.append(dbd)
+        return {"text": dbd}
+
+
+def make_checkout(path) -> str:
+    definitions = path / "definitions"
+    definitions.mkdir(parents=True)
+    (definitions / "SpellName.dbd").write_text("COLUMNS\nint ID\n")
+    (definitions / "Map.dbd").write_text("COLUMNS\nint ID\nstring Directory\n")
+    (definitions / "README.md").write_text("not a definition")
+    (path / "manifest.json").write_text(json.dumps(MANIFEST))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def clear_stores():
+    yield
+    for store in SCHEMA_STORES.values():
+        store.close()
+    SCHEMA_STORES.clear()
+
+
+def test_schema_store_round_trip(tmp_path):
+    checkout = make_checkout(tmp_path / "WoWDBDefs")
+    store = open_schema_store(checkout, CountingParser(), str(tmp_path / "schema.bin"))
+
+    assert len(store) == 2
+    assert sorted(store.table_names) == ["Map", "SpellName"]
+    assert "Map" in store and "README" not in store
+    assert store.get("SpellName") == {"text": "COLUMNS\nint ID\n"}
+    assert store.get("Missing") is None
+    assert store.manifest_index == ManifestIndex.from_manifest(MANIFEST)
+    assert store.manifest_index.name_to_fdid["spellname"] == 1990283
+
+
+def test_schema_store_manifest_index_is_loaded_not_rebuilt(tmp_path, monkeypatch):
+    checkout = make_checkout(tmp_path / "WoWDBDefs")
+    path = str(tmp_path / "schema.bin")
+    open_schema_store(checkout, CountingParser(), path)
+    SCHEMA_STORES.pop(path).close()
+
+    def fail(*args):
+        raise AssertionError("manifest index was rebuilt")
+
+    monkeypatch.setattr(ManifestIndex, "from_rows", fail)
+    monkeypatch.setattr(ManifestIndex, "from_manifest", fail)
+    store = SchemaStore(path)
+    assert store.manifest_index.hash_to_name["3BA1AF8D"] == "SpellName"
+    store.close()
+
+
+def test_schema_store_is_reused_until_checkout_changes(tmp_path):
+    checkout = make_checkout(tmp_path / "WoWDBDefs")
+    path = str(tmp_path / "schema.bin")
+
+    parser = CountingParser()
+    open_schema_store(checkout, parser, path)
+    assert len(parser.parsed) == 2
+
+    # a fresh process only has the file on disk
+    SCHEMA_STORES.pop(path).close()
+    open_schema_store(checkout, parser, path)
+    assert len(parser.parsed) == 2
+
+    map_path = os.path.join(checkout, "definitions", "Map.dbd")
+    with open(map_path, "a") as f:
+        f.write("locstring MapName_lang\n")
+
+    store = open_schema_store(checkout, parser, path)
+    assert len(parser.parsed) == 4
+    assert store.get("Map")["text"].endswith("locstring MapName_lang\n")  # type: ignore
+
+
+def test_schema_store_rejects_foreign_files(tmp_path):
+    path = tmp_path / "schema.bin"
+    path.write_bytes(b"NOPE" + bytes(60))
+
+    with pytest.raises(ValueError):
+        SchemaStore(str(path))
+
+    # a bad file on disk is just recompiled over
+    checkout = make_checkout(tmp_path / "WoWDBDefs")
+    store = open_schema_store(checkout, CountingParser(), str(path))
+    assert len(store) == 2
+
+
+def test_schema_store_leaves_out_malformed_definitions(tmp_path):
+    checkout = make_checkout(tmp_path / "WoWDBDefs")
+    (tmp_path / "WoWDBDefs" / "definitions" / "Broken.dbd").write_text("LAYOUT")
+
+    def parse_dbd(dbd: str) -> dict[str, str]:
+        if not dbd.startswith("COLUMNS"):
+            raise ValueError("no columns")
+        return {"text": dbd}
+
+    store = open_schema_store(checkout, parse_dbd, str(tmp_path / "schema.bin"))
+
+    assert sorted(store.table_names) == ["Map", "SpellName"]
+    assert "Broken" not in store
@@ -0,0 +1,84 @@
+import struct
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pycasclib")
+
+from hotfixes.dbdefs import DBDefs  # noqa: E402
+from hotfixes.decoder import RowDecoder  # noqa: E402
+from hotfixes.parser import Hotfix, LazyHotfix  # noqa: E402
+from hotfixes.sqlitesink import SQLiteSink, get_sql_columns  # noqa: E402
+from hotfixes.structures import RecordState  # noqa: E402
+
+from tests.test_decoder import TEST_DBD  # noqa: E402
+
+
+@pytest.fixture
+def decoder():
+    return RowDecoder.compile(DBDefs().parse_dbd(TEST_DBD), "0AB1C2D3")
+
+
+def make_hotfix(decoder: RowDecoder, unique_id: int, status: RecordState = RecordState.Valid) -> Hotfix:
+    data = None
+    if status == RecordState.Valid:
+        data = decoder.decode(f"Name{unique_id}\x00Desc\x00".encode() + struct.pack("<3fHbb", 1.5, 2, 3, unique_id, -1, 2))
+    return Hotfix(1000 + unique_id, unique_id, "0AB1C2D3", "Test", status, 10 + unique_id, data)
+
+
+def test_sql_columns_follow_layout(decoder):
+    columns = [(column.name, column.type) for column in get_sql_columns(decoder)]
+
+    assert columns == [
+        ("Name", "TEXT"),
+        ("Description_lang", "TEXT"),
+        ("Position_0", "REAL"),
+        ("Position_1", "REAL"),
+        ("Position_2", "REAL"),
+        ("Flags", "INTEGER"),
+        ("Counts_0", "INTEGER"),
+        ("Counts_1", "INTEGER"),
+    ]
+
+
+def test_write_and_upsert(tmp_path, decoder):
+    path = str(tmp_path / "hotfixes.db")
+    first = [make_hotfix(decoder, i) for i in range(5)] + [make_hotfix(decoder, 5, RecordState.Delete)]
+
+    with SQLiteSink(path, batch_size=2) as sink:
+        assert sink.write(first, lambda tbl_hash, tbl_name: decoder) == 6
+
+    second = first + [make_hotfix(decoder, 6)]
+    # already written entries must not be decoded again
+    second.append(LazyHotfix(1, 3, "0AB1C2D3", "Test", RecordState.Valid, 13, memoryview(b"x"), pytest.fail))
+    with SQLiteSink(path) as sink:
+        assert sink.write(second, lambda tbl_hash, tbl_name: decoder) == 1
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("SELECT COUNT(*) FROM hotfixes").fetchone()[0] == 7
+    assert connection.execute("SELECT status FROM hotfixes WHERE unique_id = 5").fetchone()[0] == RecordState.Delete
+    assert connection.execute('SELECT Name, Position_0, Flags, Counts_0 FROM "Test" WHERE record_id = 16').fetchone() == (
+        "Name6",
+        1.5,
+        6,
+        -1,
+    )
+    assert connection.execute('SELECT COUNT(*) FROM "Test"').fetchone()[0] == 6
+
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"hotfixes_key", "hotfixes_record", "Test_record_id"} <= indexes
+    connection.close()
+
+
+def test_write_rolls_back_on_error(tmp_path, decoder):
+    path = str(tmp_path / "hotfixes.db")
+
+    def failing():
+        yield make_hotfix(decoder, 1)
+        raise RuntimeError("read failed")
+
+    with SQLiteSink(path) as sink:
+        with pytest.raises(RuntimeError):
+            sink.write(failing(), lambda tbl_hash, tbl_name: decoder)
+        assert sink.write([make_hotfix(decoder, 1)], lambda tbl_hash, tbl_name: decoder) == 1
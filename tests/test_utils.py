@@ -0,0 +1,37 @@
+import time
+import threading
+
+from hotfixes.utils import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: 0)  # touch a, b is now the oldest
+    cache.get_or_load("c", lambda: 3)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru_cache_shares_concurrent_misses():
+    cache: LRUCache[str, int] = LRUCache()
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        time.sleep(0.05)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("ItemSparse", slow_load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 8
+    assert len(loads) == 1
+    assert (cache.hits, cache.misses) == (7, 1)